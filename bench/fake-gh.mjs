@@ -0,0 +1,142 @@
+// ベンチマーク用の gh コマンドの代替
+// CliClient が使うサブコマンド (auth status / auth token / api) のみを実装し、
+// FAKE_GH_API_URL（未設定の場合は GITHUB_API_URL）の代替サーバーへ転送する
+// ログイン済みのホストは FAKE_GH_HOST（既定は github.com）のみで、それ以外のホストは本物の gh と同様に拒否する
+
+const DEFAULT_TOKEN = 'bench-cli-token';
+const DEFAULT_HOST = 'github.com';
+
+/**
+ * 対象ホストを取得（--hostname、GH_HOST の順）
+ * 本物の gh と同様、どちらも無い場合はログイン済みのホストを既定とする
+ */
+function targetHost(argv, loggedInHost) {
+  const index = argv.indexOf('--hostname');
+  return (index >= 0 ? argv[index + 1] : null) || process.env.GH_HOST || loggedInHost;
+}
+
+async function main(argv) {
+  const [command, subcommand] = argv;
+
+  const loggedInHost = process.env.FAKE_GH_HOST || DEFAULT_HOST;
+  const host = targetHost(argv, loggedInHost);
+  if (host !== loggedInHost) {
+    process.stderr.write(`fake gh: not logged in to ${host} (logged in to ${loggedInHost}); run gh auth login --hostname ${host}\n`);
+    return 1;
+  }
+
+  if (command === 'auth' && subcommand === 'status') {
+    process.stderr.write(`Logged in to ${host} as bench-user\n`);
+    return 0;
+  }
+
+  if (command === 'auth' && subcommand === 'token') {
+    // トークンを取得できない環境（subprocess 方式へのフォールバック）を再現
+    if (process.env.FAKE_GH_NO_TOKEN === '1') {
+      process.stderr.write('no oauth token found\n');
+      return 1;
+    }
+    process.stdout.write(`${process.env.FAKE_GH_TOKEN || DEFAULT_TOKEN}\n`);
+    return 0;
+  }
+
+  if (command === 'api') {
+    return await api(argv.slice(1));
+  }
+
+  process.stderr.write(`fake gh: unsupported command: ${argv.join(' ')}\n`);
+  return 1;
+}
+
+async function api(args) {
+  let endpoint = null;
+  let method = null;
+  let include = false;
+  let input = null;
+  const headers = {};
+
+  for (let i = 0; i < args.length; i++) {
+    const arg = args[i];
+    if (arg === '--method' || arg === '-X') {
+      method = args[++i];
+    } else if (arg === '--include' || arg === '-i') {
+      include = true;
+    } else if (arg === '--header' || arg === '-H') {
+      const header = args[++i];
+      const colon = header.indexOf(':');
+      headers[header.slice(0, colon).trim().toLowerCase()] = header.slice(colon + 1).trim();
+    } else if (arg === '--input') {
+      input = args[++i];
+    } else if (arg === '--hostname') {
+      i++;
+    } else if (endpoint === null) {
+      endpoint = arg;
+    }
+  }
+
+  const baseUrl = (process.env.FAKE_GH_API_URL || process.env.GITHUB_API_URL || '').replace(/\/+$/, '');
+  if (!baseUrl) {
+    process.stderr.write('fake gh: neither FAKE_GH_API_URL nor GITHUB_API_URL is set\n');
+    return 1;
+  }
+
+  let body;
+  if (input === '-') {
+    const chunks = [];
+    for await (const chunk of process.stdin) {
+      chunks.push(chunk);
+    }
+    body = Buffer.concat(chunks);
+  }
+
+  // 本物の gh と同様、"graphql" は REST のベースURLではなくホストの GraphQL エンドポイントに送る
+  const url = endpoint === 'graphql'
+    ? (/\/api\/v3$/.test(baseUrl) ? baseUrl.replace(/\/api\/v3$/, '/api/graphql') : `${baseUrl}/graphql`)
+    : `${baseUrl}${endpoint.startsWith('/') ? endpoint : `/${endpoint}`}`;
+  const response = await fetch(url, {
+    method: method || (body ? 'POST' : 'GET'),
+    headers: {
+      accept: 'application/vnd.github+json',
+      ...headers,
+      authorization: `token ${process.env.FAKE_GH_TOKEN || DEFAULT_TOKEN}`,
+      ...(body ? { 'content-type': 'application/json' } : {}),
+    },
+    body,
+  });
+  const text = Buffer.from(await response.arrayBuffer());
+
+  if (include) {
+    // 本物の gh と同様、展開済みの本文に合わせて圧縮関連のヘッダーは出力しない
+    const lines = [`HTTP/1.1 ${response.status} ${response.statusText}`];
+    response.headers.forEach((value, name) => {
+      if (name !== 'content-encoding' && name !== 'content-length') {
+        lines.push(`${name}: ${value}`);
+      }
+    });
+    process.stdout.write(`${lines.join('\r\n')}\r\n\r\n`);
+  }
+  await new Promise((resolve) => process.stdout.write(text, resolve));
+
+  // 本物の gh は 2xx 以外（304 を含む）で非0終了する
+  if (response.status >= 300) {
+    let message = response.statusText;
+    try {
+      message = JSON.parse(text.toString('utf8')).message || message;
+    } catch {
+      // JSON 以外の本文はそのまま
+    }
+    process.stderr.write(`gh: ${message} (HTTP ${response.status})\n`);
+    return 1;
+  }
+  return 0;
+}
+
+main(process.argv.slice(2)).then(
+  (code) => {
+    process.exitCode = code;
+  },
+  (error) => {
+    process.stderr.write(`fake gh: ${error?.stack || error}\n`);
+    process.exitCode = 1;
+  }
+);
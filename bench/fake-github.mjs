@@ -0,0 +1,475 @@
+// ベンチマーク用の GitHub REST / GraphQL API の代替サーバー
+// 大きな diff、ページ分割されたリスト、レート制限ヘッダー、ETag による 304 応答を再現する
+
+import http from 'node:http';
+import { createHash } from 'node:crypto';
+import { gzipSync } from 'node:zlib';
+
+const DEFAULT_OPTIONS = {
+  // 1 PR あたりの変更ファイル数
+  files: 300,
+  // 1 ファイルあたりのパッチ行数
+  linesPerFile: 400,
+  // リポジトリごとのオープンな PR 数
+  openPullRequests: 250,
+  // PR ごとの会話コメント数とレビューコメント数
+  comments: 150,
+  // N 件ごとに二次レート制限 (403 + Retry-After: 0) を返す（0 で無効）
+  secondaryLimitEvery: 0,
+};
+
+const RATE_LIMIT = 5000;
+
+/**
+ * 代替サーバーを起動
+ * 戻り値の stats() で受信したリクエスト数と送受信バイト数を取得できる
+ */
+export async function startFakeGitHub(options = {}) {
+  const config = { ...DEFAULT_OPTIONS, ...options };
+  const dataset = createDataset(config);
+  const stats = createStats();
+  const gzipCache = new Map();
+  let requestCount = 0;
+
+  const server = http.createServer(async (req, res) => {
+    const url = new URL(req.url, `http://${req.headers.host}`);
+
+    // 計測用の管理エンドポイント（統計には含めない）
+    if (url.pathname === '/__bench/stats') {
+      return sendRaw(res, 200, { 'content-type': 'application/json' }, JSON.stringify(stats.snapshot()));
+    }
+    if (url.pathname === '/__bench/reset') {
+      stats.reset();
+      return sendRaw(res, 204, {}, '');
+    }
+
+    const body = await readBody(req);
+    requestCount++;
+    const route = `${req.method} ${normalizeRoute(url.pathname)}`;
+    stats.record(route, body.length);
+
+    const resource = url.pathname === '/graphql' ? 'graphql' : 'core';
+    const headers = {
+      'x-ratelimit-limit': String(RATE_LIMIT),
+      // 予備分を下回って待機が発生しないよう、一定範囲で循環させる
+      'x-ratelimit-remaining': String(RATE_LIMIT - (requestCount % (RATE_LIMIT - 100))),
+      'x-ratelimit-used': String(requestCount % (RATE_LIMIT - 100)),
+      'x-ratelimit-reset': String(Math.floor(Date.now() / 1000) + 3600),
+      'x-ratelimit-resource': resource,
+    };
+
+    if (config.secondaryLimitEvery > 0 && requestCount % config.secondaryLimitEvery === 0) {
+      return send(res, 403, { ...headers, 'retry-after': '0' }, {
+        message: 'You have exceeded a secondary rate limit. Please wait a few minutes before you try again.',
+      });
+    }
+
+    if (!req.headers.authorization) {
+      return send(res, 401, headers, { message: 'Requires authentication' });
+    }
+
+    let result;
+    try {
+      result = handle(dataset, req.method, url, req.headers, body);
+    } catch (error) {
+      result = { status: 400, body: { message: String(error?.message || error) } };
+    }
+    if (!result) {
+      return send(res, 404, headers, { message: 'Not Found' });
+    }
+
+    const isText = typeof result.body === 'string';
+    const payload = isText ? result.body : JSON.stringify(result.body);
+    const contentType = isText ? 'text/plain; charset=utf-8' : 'application/json; charset=utf-8';
+    Object.assign(headers, result.headers || {});
+
+    // GET は ETag を付与し、If-None-Match が一致すれば 304 を返す
+    if (req.method === 'GET' && result.status === 200) {
+      const etag = `W/"${createHash('sha1').update(payload).digest('hex')}"`;
+      headers.etag = etag;
+      if (req.headers['if-none-match'] === etag) {
+        return sendRaw(res, 304, headers, '');
+      }
+    }
+
+    // 実際の GitHub と同様、gzip を受け付けるクライアントには圧縮して返す
+    let buffer = Buffer.from(payload);
+    if (/\bgzip\b/.test(req.headers['accept-encoding'] || '') && buffer.length > 1024) {
+      const key = headers.etag || null;
+      const compressed = (key && gzipCache.get(key)) || gzipSync(buffer, { level: 1 });
+      if (key) {
+        gzipCache.set(key, compressed);
+      }
+      buffer = compressed;
+      headers['content-encoding'] = 'gzip';
+    }
+
+    headers['content-type'] = contentType;
+    sendRaw(res, result.status, headers, buffer);
+  });
+
+  function send(res, status, headers, body) {
+    sendRaw(res, status, { ...headers, 'content-type': 'application/json; charset=utf-8' }, JSON.stringify(body));
+  }
+
+  function sendRaw(res, status, headers, payload) {
+    const buffer = Buffer.isBuffer(payload) ? payload : Buffer.from(payload);
+    if (!res.req.url.startsWith('/__bench/')) {
+      stats.addBytesOut(buffer.length);
+    }
+    res.writeHead(status, { ...headers, 'content-length': String(buffer.length) });
+    res.end(buffer);
+  }
+
+  await new Promise((resolve) => server.listen(config.port || 0, '127.0.0.1', resolve));
+  const { port } = server.address();
+
+  return {
+    url: `http://127.0.0.1:${port}`,
+    config,
+    stats: () => stats.snapshot(),
+    reset: () => stats.reset(),
+    close: () => new Promise((resolve) => {
+      server.closeAllConnections?.();
+      server.close(resolve);
+    }),
+  };
+}
+
+function createStats() {
+  let requests = 0;
+  let bytesIn = 0;
+  let bytesOut = 0;
+  let byRoute = {};
+
+  return {
+    record(route, length) {
+      requests++;
+      bytesIn += length;
+      byRoute[route] = (byRoute[route] || 0) + 1;
+    },
+    addBytesOut(length) {
+      bytesOut += length;
+    },
+    snapshot() {
+      return { requests, bytesIn, bytesOut, byRoute: { ...byRoute } };
+    },
+    reset() {
+      requests = 0;
+      bytesIn = 0;
+      bytesOut = 0;
+      byRoute = {};
+    },
+  };
+}
+
+function readBody(req) {
+  return new Promise((resolve, reject) => {
+    const chunks = [];
+    req.on('data', (chunk) => chunks.push(chunk));
+    req.on('end', () => resolve(Buffer.concat(chunks)));
+    req.on('error', reject);
+  });
+}
+
+function normalizeRoute(pathname) {
+  return pathname
+    .replace(/^\/repos\/[^/]+\/[^/]+/, '/repos/:owner/:repo')
+    .replace(/\/\d+(?=\/|$)/g, '/:number');
+}
+
+/**
+ * 決定的なテストデータを生成（PR 番号・リポジトリに関係なく同じファイル構成）
+ */
+function createDataset(config) {
+  const files = [];
+  const diffParts = [];
+
+  for (let i = 0; i < config.files; i++) {
+    const filename = `src/module${i}/file${i}.ts`;
+    const lines = [];
+    let oldCount = 0;
+    let newCount = 0;
+    let additions = 0;
+    let deletions = 0;
+
+    for (let k = 0; k < config.linesPerFile; k++) {
+      const text = `  const value${k} = compute(${k}, "${filename}");`;
+      switch (k % 4) {
+        case 0:
+          lines.push(` ${text}`);
+          oldCount++;
+          newCount++;
+          break;
+        case 1:
+          lines.push(`-${text}`);
+          oldCount++;
+          deletions++;
+          break;
+        default:
+          lines.push(`+${text}`);
+          newCount++;
+          additions++;
+      }
+    }
+
+    const patch = [`@@ -1,${oldCount} +1,${newCount} @@ export function module${i}() {`, ...lines].join('\n');
+    files.push({
+      sha: createHash('sha1').update(filename).digest('hex'),
+      filename,
+      status: 'modified',
+      additions,
+      deletions,
+      changes: additions + deletions,
+      patch,
+    });
+    diffParts.push(`diff --git a/${filename} b/${filename}\nindex 1111111..2222222 100644\n--- a/${filename}\n+++ b/${filename}\n${patch}\n`);
+  }
+
+  return { config, files, diff: diffParts.join('') };
+}
+
+function user(login) {
+  return { login, id: login.length, type: 'User' };
+}
+
+function pullRequest(owner, repo, number, overrides = {}) {
+  const created = new Date(Date.UTC(2025, 0, 1) + number * 3600_000).toISOString();
+  return {
+    number,
+    title: `Benchmark pull request #${number}`,
+    body: `Generated pull request ${number} for benchmarking.`,
+    state: 'open',
+    draft: false,
+    html_url: `https://github.com/${owner}/${repo}/pull/${number}`,
+    user: user(`author${number % 7}`),
+    created_at: created,
+    updated_at: created,
+    requested_reviewers: [user('alice'), user('bob')],
+    head: { ref: `feature-${number}`, label: `${owner}:feature-${number}`, sha: `${'a'.repeat(32)}${String(number).padStart(8, '0')}` },
+    base: { ref: 'main', label: `${owner}:main` },
+    ...overrides,
+  };
+}
+
+function comment(owner, repo, number, index, review) {
+  const base = {
+    id: index + 1,
+    body: `Comment ${index} on #${number}`,
+    user: user(`reviewer${index % 5}`),
+    created_at: new Date(Date.UTC(2025, 0, 2) + index * 60_000).toISOString(),
+    html_url: `https://github.com/${owner}/${repo}/pull/${number}#comment-${index}`,
+  };
+  return review
+    ? { ...base, path: `src/module${index % 10}/file${index % 10}.ts`, position: 2, commit_id: 'a'.repeat(40) }
+    : base;
+}
+
+/**
+ * per_page / page によるページ分割と Link ヘッダー
+ */
+function paginate(url, total, build) {
+  const perPage = Math.min(parseInt(url.searchParams.get('per_page') || '30', 10), 100);
+  const page = Math.max(parseInt(url.searchParams.get('page') || '1', 10), 1);
+  const lastPage = Math.max(Math.ceil(total / perPage), 1);
+  const items = [];
+  for (let i = (page - 1) * perPage; i < Math.min(page * perPage, total); i++) {
+    items.push(build(i));
+  }
+
+  const link = (p) => {
+    const target = new URL(url);
+    target.searchParams.set('per_page', String(perPage));
+    target.searchParams.set('page', String(p));
+    return target.toString();
+  };
+  const links = [];
+  if (page < lastPage) {
+    links.push(`<${link(page + 1)}>; rel="next"`, `<${link(lastPage)}>; rel="last"`);
+  }
+  if (page > 1) {
+    links.push(`<${link(1)}>; rel="first"`, `<${link(page - 1)}>; rel="prev"`);
+  }
+
+  return { status: 200, body: items, headers: links.length > 0 ? { link: links.join(', ') } : {} };
+}
+
+function handle(dataset, method, url, headers, rawBody) {
+  const { config, files } = dataset;
+  const body = rawBody.length > 0 ? JSON.parse(rawBody.toString('utf8')) : {};
+  const path = url.pathname;
+
+  if (method === 'GET' && path === '/user') {
+    return { status: 200, body: user('bench-user') };
+  }
+
+  if (method === 'POST' && path === '/graphql') {
+    return handleGraphQL(dataset, body);
+  }
+
+  const match = path.match(/^\/repos\/([^/]+)\/([^/]+)\/(pulls|issues)(?:\/(\d+))?(?:\/([a-z_]+))?$/);
+  if (!match) {
+    return null;
+  }
+  const [, owner, repo, kind, numberText, sub] = match;
+  const number = numberText ? parseInt(numberText, 10) : null;
+
+  if (kind === 'pulls' && number === null) {
+    if (method === 'GET') {
+      return paginate(url, config.openPullRequests, (i) => pullRequest(owner, repo, config.openPullRequests - i));
+    }
+    if (method === 'POST') {
+      return { status: 201, body: pullRequest(owner, repo, config.openPullRequests + 1, { title: body.title, body: body.body, draft: Boolean(body.draft) }) };
+    }
+  }
+
+  if (kind === 'pulls' && number !== null && !sub) {
+    if (method === 'GET') {
+      if ((headers.accept || '').includes('diff')) {
+        return { status: 200, body: dataset.diff };
+      }
+      return { status: 200, body: pullRequest(owner, repo, number) };
+    }
+    if (method === 'PATCH') {
+      return { status: 200, body: pullRequest(owner, repo, number, body) };
+    }
+  }
+
+  if (kind === 'pulls' && sub === 'files' && method === 'GET') {
+    return paginate(url, files.length, (i) => files[i]);
+  }
+
+  if (kind === 'pulls' && sub === 'comments') {
+    if (method === 'GET') {
+      return paginate(url, config.comments, (i) => comment(owner, repo, number, i, true));
+    }
+    if (method === 'POST') {
+      return { status: 201, body: { ...comment(owner, repo, number, config.comments, true), body: body.body, path: body.path } };
+    }
+  }
+
+  if (kind === 'pulls' && sub === 'reviews' && method === 'POST') {
+    return { status: 200, body: { id: 1, state: body.event === 'COMMENT' ? 'COMMENTED' : body.event, html_url: `https://github.com/${owner}/${repo}/pull/${number}#pullrequestreview-1` } };
+  }
+
+  if (kind === 'pulls' && sub === 'requested_reviewers' && method === 'POST') {
+    return { status: 201, body: pullRequest(owner, repo, number, { requested_reviewers: (body.reviewers || []).map(user) }) };
+  }
+
+  if (kind === 'issues' && sub === 'comments') {
+    if (method === 'GET') {
+      return paginate(url, config.comments, (i) => comment(owner, repo, number, i, false));
+    }
+    if (method === 'POST') {
+      return { status: 201, body: { ...comment(owner, repo, number, config.comments, false), body: body.body } };
+    }
+  }
+
+  return null;
+}
+
+/**
+ * カーソル（base64 のオフセット）によるコネクションを作成
+ */
+function connection(total, first, after, build) {
+  const start = after ? parseInt(Buffer.from(after, 'base64').toString('utf8'), 10) : 0;
+  const end = Math.min(start + first, total);
+  const nodes = [];
+  for (let i = start; i < end; i++) {
+    nodes.push(build(i));
+  }
+  return {
+    totalCount: total,
+    pageInfo: { hasNextPage: end < total, endCursor: end > start ? Buffer.from(String(end)).toString('base64') : null },
+    nodes,
+  };
+}
+
+function handleGraphQL(dataset, { query = '', variables = {} }) {
+  const { config, files } = dataset;
+
+  if (query.includes('query PullRequestOverview')) {
+    const { owner, repo, number, pageSize } = variables;
+    const rest = pullRequest(owner, repo, number);
+    const graphComment = (i) => ({
+      author: { login: `reviewer${i % 5}` },
+      body: `Comment ${i} on #${number}`,
+      createdAt: new Date(Date.UTC(2025, 0, 2) + i * 60_000).toISOString(),
+      url: `https://github.com/${owner}/${repo}/pull/${number}#comment-${i}`,
+    });
+    const pr = {
+      number,
+      title: rest.title,
+      body: rest.body,
+      state: 'OPEN',
+      isDraft: false,
+      url: rest.html_url,
+      createdAt: rest.created_at,
+      updatedAt: rest.updated_at,
+      author: { login: rest.user.login },
+      headRefName: rest.head.ref,
+      headRefOid: rest.head.sha,
+      baseRefName: rest.base.ref,
+      additions: files.reduce((sum, file) => sum + file.additions, 0),
+      deletions: files.reduce((sum, file) => sum + file.deletions, 0),
+      changedFiles: files.length,
+      reviewDecision: 'REVIEW_REQUIRED',
+      reviewRequests: { nodes: [{ requestedReviewer: { login: 'alice' } }, { requestedReviewer: { slug: 'core' } }] },
+      latestReviews: { nodes: [{ author: { login: 'bob' }, state: 'COMMENTED', submittedAt: rest.updated_at }] },
+    };
+    if (variables.includeFiles) {
+      pr.files = connection(files.length, pageSize, variables.filesCursor, (i) => ({
+        path: files[i].filename,
+        additions: files[i].additions,
+        deletions: files[i].deletions,
+        changeType: 'MODIFIED',
+      }));
+    }
+    if (variables.includeComments) {
+      pr.comments = connection(config.comments, pageSize, variables.commentsCursor, graphComment);
+    }
+    if (variables.includeThreads) {
+      pr.reviewThreads = connection(Math.ceil(config.comments / 3), pageSize, variables.threadsCursor, (i) => ({
+        path: files[i % files.length].filename,
+        line: 3,
+        isResolved: i % 4 === 0,
+        isOutdated: false,
+        comments: { totalCount: 3, nodes: [0, 1, 2].map((k) => graphComment(i * 3 + k)) },
+      }));
+    }
+    return { status: 200, body: { data: { repository: { pullRequest: pr } } } };
+  }
+
+  if (query.includes('query OpenPullRequests')) {
+    const data = {};
+    const errors = [];
+    for (let i = 0; `owner${i}` in variables; i++) {
+      const owner = variables[`owner${i}`];
+      const repo = variables[`name${i}`];
+      if (repo === 'missing') {
+        data[`r${i}`] = null;
+        errors.push({ type: 'NOT_FOUND', path: [`r${i}`], message: `Could not resolve to a Repository with the name '${owner}/${repo}'.` });
+        continue;
+      }
+      data[`r${i}`] = {
+        pullRequests: connection(config.openPullRequests, variables.limit, null, (k) => {
+          const rest = pullRequest(owner, repo, config.openPullRequests - k);
+          return {
+            number: rest.number,
+            title: rest.title,
+            url: rest.html_url,
+            createdAt: rest.created_at,
+            author: { login: rest.user.login },
+            headRefName: rest.head.ref,
+            baseRefName: rest.base.ref,
+            headRepositoryOwner: { login: owner },
+            reviewRequests: { nodes: [{ requestedReviewer: { login: 'alice' } }] },
+          };
+        }),
+      };
+    }
+    return { status: 200, body: errors.length > 0 ? { data, errors } : { data } };
+  }
+
+  return { status: 200, body: { data: null, errors: [{ message: 'Unsupported query in benchmark server' }] } };
+}
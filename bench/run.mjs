@@ -0,0 +1,249 @@
+// MCP サーバーのベンチマーク
+// build/index.js を stdio で起動し、登録済みの全ツールを代替 GitHub サーバーに対して実行する
+//
+// 使い方: npm run bench -- [--iterations 20] [--modes pat,cli,cli-subprocess] [--out bench_output.txt]
+// 結果は JSON で標準出力（--out 指定時はファイルにも）に出力する
+
+import { existsSync, writeFileSync } from 'node:fs';
+import { dirname, join, resolve } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { performance } from 'node:perf_hooks';
+import { Client } from '@modelcontextprotocol/sdk/client/index.js';
+import { StdioClientTransport } from '@modelcontextprotocol/sdk/client/stdio.js';
+import { startFakeGitHub } from './fake-github.mjs';
+
+const BENCH_DIR = dirname(fileURLToPath(import.meta.url));
+const SERVER_ENTRY = resolve(BENCH_DIR, '../build/index.js');
+const OWNER = 'bench';
+const REPO = 'app';
+const PR_NUMBER = 1;
+
+/**
+ * 認証方式ごとのサーバー起動設定
+ * - pat: Personal Access Token で直接 HTTP 送信
+ * - cli: gh auth token で取得したトークンで HTTP 送信
+ * - cli-subprocess: リクエストごとに gh api を起動
+ */
+const MODES = {
+  pat: () => ({ GITHUB_PERSONAL_ACCESS_TOKEN: 'bench-pat-token' }),
+  cli: () => ({ GITHUB_CLI_TRANSPORT: 'http' }),
+  'cli-subprocess': () => ({ GITHUB_CLI_TRANSPORT: 'subprocess' }),
+};
+
+/**
+ * ツールごとのシナリオ（1ツールに複数のシナリオを登録可能）
+ * 登録済みのツールにシナリオが無い場合はエラーにする
+ */
+const SCENARIOS = [
+  { tool: 'create_pull_request', args: { owner: OWNER, repo: REPO, title: 'Benchmark', body: 'Benchmark body', head: 'feature', base: 'main' } },
+  { tool: 'update_pull_request', args: { owner: OWNER, repo: REPO, pr_number: PR_NUMBER, title: 'Updated title' } },
+  { tool: 'list_open_pull_requests', args: { owner: OWNER, repo: REPO, limit: 200 } },
+  { tool: 'list_open_pull_requests_across_repos', args: { repositories: [`${OWNER}/app`, `${OWNER}/api`, `${OWNER}/web`, `${OWNER}/missing`], limit: 20 } },
+  { tool: 'get_pull_request_overview', args: { owner: OWNER, repo: REPO, pr_number: PR_NUMBER } },
+  { tool: 'get_pull_request', args: { owner: OWNER, repo: REPO, pr_number: PR_NUMBER } },
+  { tool: 'get_pull_request_diff', args: { owner: OWNER, repo: REPO, pr_number: PR_NUMBER } },
+  { tool: 'get_pull_request_diff', label: 'get_pull_request_diff:summary_only', args: { owner: OWNER, repo: REPO, pr_number: PR_NUMBER, summary_only: true } },
+  // 末尾のファイルのみを選択し、diff 全体を読み飛ばす経路を計測
+  { tool: 'get_pull_request_diff', label: 'get_pull_request_diff:last_file', args: { owner: OWNER, repo: REPO, pr_number: PR_NUMBER, include: ['src/module299/**'] } },
+  { tool: 'request_reviewers', args: { owner: OWNER, repo: REPO, pr_number: PR_NUMBER, reviewers: ['alice', 'bob'] } },
+  { tool: 'add_pr_comment', args: { owner: OWNER, repo: REPO, pr_number: PR_NUMBER, body: 'Benchmark comment' } },
+  { tool: 'add_review_comment', args: { owner: OWNER, repo: REPO, pr_number: PR_NUMBER, body: 'Benchmark review comment', path: 'src/module0/file0.ts', line: 3 } },
+  {
+    tool: 'submit_pr_review',
+    args: {
+      owner: OWNER,
+      repo: REPO,
+      pr_number: PR_NUMBER,
+      event: 'COMMENT',
+      comments: Array.from({ length: 20 }, (_, i) => ({ path: `src/module${i}/file${i}.ts`, line: 3, body: `Review comment ${i}` })),
+    },
+  },
+  { tool: 'get_pr_comments', args: { owner: OWNER, repo: REPO, pr_number: PR_NUMBER } },
+  { tool: 'get_pr_changes_for_commenting', args: { owner: OWNER, repo: REPO, pr_number: PR_NUMBER } },
+];
+
+function parseArgs(argv) {
+  const options = {
+    iterations: parseInt(process.env.BENCH_ITERATIONS || '20', 10),
+    modes: Object.keys(MODES),
+    out: null,
+  };
+  for (let i = 0; i < argv.length; i++) {
+    if (argv[i] === '--iterations') {
+      options.iterations = parseInt(argv[++i], 10);
+    } else if (argv[i] === '--modes') {
+      options.modes = argv[++i].split(',').map((mode) => mode.trim()).filter(Boolean);
+    } else if (argv[i] === '--out') {
+      options.out = argv[++i];
+    } else {
+      throw new Error(`Unknown option: ${argv[i]}`);
+    }
+  }
+  for (const mode of options.modes) {
+    if (!MODES[mode]) {
+      throw new Error(`Unknown mode: ${mode} (available: ${Object.keys(MODES).join(', ')})`);
+    }
+  }
+  if (!Number.isInteger(options.iterations) || options.iterations < 1) {
+    throw new Error('--iterations must be a positive integer');
+  }
+  return options;
+}
+
+/**
+ * ソート済みの配列から最近傍順位法でパーセンタイルを取得（src/utils/metrics.ts と同じ定義）
+ */
+function percentile(sorted, ratio) {
+  if (sorted.length === 0) {
+    return 0;
+  }
+  const rank = Math.ceil(ratio * sorted.length) - 1;
+  return sorted[Math.min(Math.max(rank, 0), sorted.length - 1)];
+}
+
+function round(value) {
+  return Math.round(value * 100) / 100;
+}
+
+async function readMetrics(client) {
+  const result = await client.readResource({ uri: 'github://server/metrics' });
+  return JSON.parse(result.contents[0].text);
+}
+
+/**
+ * 1つの認証方式でサーバーを起動し、全シナリオを実行
+ */
+async function runMode(mode, fakeGitHub, iterations) {
+  const env = { ...process.env };
+  delete env.GITHUB_PERSONAL_ACCESS_TOKEN;
+  delete env.GH_HOST;
+  Object.assign(env, MODES[mode](), {
+    GITHUB_API_URL: fakeGitHub.url,
+    // 代替の gh は代替サーバーのホストにのみログイン済みとして振る舞う（--hostname の受け渡しを検証）
+    FAKE_GH_HOST: new URL(fakeGitHub.url).host,
+    // 代替の gh を優先して使用
+    PATH: `${join(BENCH_DIR, 'bin')}${process.platform === 'win32' ? ';' : ':'}${process.env.PATH || ''}`,
+    LOG_LEVEL: process.env.LOG_LEVEL || '2',
+    LOG_FORMAT: 'json',
+  });
+
+  const transport = new StdioClientTransport({
+    command: process.execPath,
+    args: [SERVER_ENTRY],
+    env,
+    stderr: process.env.BENCH_VERBOSE === '1' ? 'inherit' : 'ignore',
+  });
+  const client = new Client({ name: 'mcp-gh-pr-mini-bench', version: '1.0.0' });
+  await client.connect(transport);
+
+  try {
+    const { tools } = await client.listTools();
+    const missing = tools.map((tool) => tool.name).filter((name) => !SCENARIOS.some((scenario) => scenario.tool === name));
+    if (missing.length > 0) {
+      throw new Error(`No benchmark scenario for tools: ${missing.join(', ')}`);
+    }
+
+    const results = {};
+    for (const scenario of SCENARIOS) {
+      const label = scenario.label || scenario.tool;
+      const durations = [];
+      let errors = 0;
+      let firstCallMs = 0;
+      let sampleError = null;
+      const before = fakeGitHub.stats();
+
+      for (let i = 0; i < iterations; i++) {
+        const start = performance.now();
+        const result = await client.callTool({ name: scenario.tool, arguments: scenario.args });
+        const durationMs = performance.now() - start;
+        durations.push(durationMs);
+        if (i === 0) {
+          firstCallMs = durationMs;
+        }
+
+        const text = result.content?.[0]?.text || '';
+        if (result.isError || text.startsWith('Failed to ')) {
+          errors++;
+          sampleError = sampleError || text.slice(0, 200);
+        }
+      }
+
+      const after = fakeGitHub.stats();
+      const serverMetrics = await readMetrics(client);
+      const sorted = [...durations].sort((a, b) => a - b);
+      const upstreamRequests = after.requests - before.requests;
+
+      results[label] = {
+        tool: scenario.tool,
+        iterations,
+        errors,
+        ...(sampleError ? { sampleError } : {}),
+        firstCallMs: round(firstCallMs),
+        p50Ms: round(percentile(sorted, 0.5)),
+        p99Ms: round(percentile(sorted, 0.99)),
+        meanMs: round(durations.reduce((sum, value) => sum + value, 0) / iterations),
+        upstreamRequests,
+        upstreamRequestsPerCall: round(upstreamRequests / iterations),
+        bytesSent: after.bytesIn - before.bytesIn,
+        bytesReceived: after.bytesOut - before.bytesOut,
+        // プロセス開始からの最大値（このシナリオ終了時点）
+        peakRssBytes: serverMetrics.memory.peakRssBytes,
+      };
+      process.stderr.write(`[${mode}] ${label}: p50=${results[label].p50Ms}ms p99=${results[label].p99Ms}ms upstream=${upstreamRequests} errors=${errors}\n`);
+    }
+
+    return { tools: results, server: await readMetrics(client) };
+  } finally {
+    await client.close();
+  }
+}
+
+async function main() {
+  const options = parseArgs(process.argv.slice(2));
+  if (!existsSync(SERVER_ENTRY)) {
+    throw new Error(`${SERVER_ENTRY} not found. Run \`npm run build\` first`);
+  }
+
+  const fakeGitHub = await startFakeGitHub({
+    files: parseInt(process.env.BENCH_FILES || '300', 10),
+    linesPerFile: parseInt(process.env.BENCH_LINES_PER_FILE || '400', 10),
+    openPullRequests: parseInt(process.env.BENCH_OPEN_PRS || '250', 10),
+    comments: parseInt(process.env.BENCH_COMMENTS || '150', 10),
+    secondaryLimitEvery: parseInt(process.env.BENCH_SECONDARY_LIMIT_EVERY || '0', 10),
+  });
+
+  const report = {
+    meta: {
+      timestamp: new Date().toISOString(),
+      node: process.version,
+      platform: `${process.platform}-${process.arch}`,
+      iterations: options.iterations,
+      dataset: fakeGitHub.config,
+    },
+    modes: {},
+  };
+
+  try {
+    for (const mode of options.modes) {
+      report.modes[mode] = await runMode(mode, fakeGitHub, options.iterations);
+    }
+  } finally {
+    await fakeGitHub.close();
+  }
+
+  const output = JSON.stringify(report, null, 2);
+  process.stdout.write(`${output}\n`);
+  if (options.out) {
+    writeFileSync(options.out, `${output}\n`);
+  }
+
+  const failed = Object.values(report.modes).some((mode) => Object.values(mode.tools).some((tool) => tool.errors > 0));
+  if (failed) {
+    process.exitCode = 1;
+  }
+}
+
+main().catch((error) => {
+  process.stderr.write(`${error?.stack || error}\n`);
+  process.exitCode = 1;
+});
@@ -1,99 +1,386 @@
 // GitHub API抽象化レイヤー
 
+import { Readable } from 'stream';
 import { githubAuth } from '../auth/github-auth.js';
 import { CliClient } from '../auth/cli-client.js';
-import { AuthMethod, RequestOptions, GitHubError } from './types.js';
-import { logger } from '../utils/logger.js';
+import {
+  AuthMethod,
+  RequestOptions,
+  GitHubError,
+  GitHubApiResponse,
+  PullRequestFile,
+  ReviewEvent,
+  DiffSide,
+  GraphQLError,
+  GraphQLResponse,
+  PullRequestOverview,
+  PullRequestOverviewCursors,
+  OpenPullRequestSummary,
+  GraphQLConnection,
+  RepositoryPullRequests
+} from './types.js';
+import { ResponseCache, ResponseCacheStats } from './response-cache.js';
+import { httpClient, HttpResponse } from './http-client.js';
+import { RequestScheduler, SchedulerStatus } from './request-scheduler.js';
+import { PULL_REQUEST_OVERVIEW_QUERY, buildOpenPullRequestsQuery } from './graphql-queries.js';
+import { DiffIndex, DiffIndexCache } from '../utils/diff-index.js';
+import { logger, LogLevel } from '../utils/logger.js';
+import { metrics, normalizeRoute } from '../utils/metrics.js';
+import { getApiBaseUrl, getGraphQLUrl, parseLinkHeader, readPositiveIntEnv } from '../utils/helpers.js';
+
+const DEFAULT_ACCEPT = 'application/vnd.github.v3+json';
+const DIFF_ACCEPT = 'application/vnd.github.v3.diff';
+// GitHub REST API の per_page 上限、GraphQL の first 上限
+const MAX_PER_PAGE = 100;
+// GraphQL リクエストの内部的なパス（キャッシュキー・メトリクス・レート制限リソースの判定に使用）
+const GRAPHQL_PATH = '/graphql';
 
 export class GitHubApi {
-  private readonly baseUrl: string = 'https://api.github.com';
+  private readonly baseUrl: string = getApiBaseUrl();
+  private readonly graphqlUrl: string = getGraphQLUrl();
+  private readonly cache: ResponseCache;
+  private readonly scheduler: RequestScheduler;
+  private readonly pageConcurrency: number;
+  // head SHA ごとのファイル別差分インデックス
+  readonly diffIndexes: DiffIndexCache;
 
   constructor() {
     // 認証初期化は必要時に行う
+    this.cache = new ResponseCache(
+      readPositiveIntEnv('GITHUB_CACHE_MAX_ENTRIES', 500),
+      process.env.GITHUB_CACHE_DIR || undefined
+    );
+    const maxRetries = parseInt(process.env.GITHUB_MAX_RETRIES ?? '', 10);
+    this.scheduler = new RequestScheduler(
+      readPositiveIntEnv('GITHUB_MAX_CONCURRENCY', 8),
+      Number.isFinite(maxRetries) && maxRetries >= 0 ? maxRetries : 3,
+      readPositiveIntEnv('GITHUB_RATE_LIMIT_RESERVE', 10)
+    );
+    this.pageConcurrency = readPositiveIntEnv('GITHUB_PAGE_CONCURRENCY', 4);
+    this.diffIndexes = new DiffIndexCache(readPositiveIntEnv('GITHUB_DIFF_INDEX_MAX_PRS', 20));
   }
 
   /**
-   * 認証が初期化されているか確認し、必要に応じて初期化
+   * 認証セッションを確保（検証済みなら追加のリクエストは発生しない）
    */
   private async ensureAuthenticated(): Promise<void> {
-    if (!await githubAuth.isAuthenticated()) {
-      await githubAuth.initialize();
+    await githubAuth.ensureSession();
+  }
+
+  /**
+   * 認証エラー（401/403）を受けた場合のみセッションを再検証して1回だけ再試行
+   */
+  private async withAuthRetry<T>(fn: () => Promise<T>): Promise<T> {
+    await this.ensureAuthenticated();
+    const generation = githubAuth.getSessionGeneration();
+
+    try {
+      return await fn();
+    } catch (error) {
+      if (!this.isAuthError(error)) {
+        throw error;
+      }
+
+      logger.warn('GitHub API returned an authentication error, re-validating credentials...');
+      githubAuth.invalidateSession(generation);
+      await this.ensureAuthenticated();
+      return await fn();
     }
   }
 
+  /**
+   * 認証情報の再検証が必要なエラーか判定
+   * レート制限による403は認証エラーとして扱わない
+   */
+  private isAuthError(error: unknown): boolean {
+    const status = (error as Partial<GitHubError> | undefined)?.status;
+    if (status === 401) {
+      return true;
+    }
+    if (status === 403) {
+      const message = error instanceof Error ? error.message : String(error);
+      return !/rate limit/i.test(message);
+    }
+    return false;
+  }
+
   /**
    * GitHub API リクエストを実行
    */
   async request<T>(endpoint: string, options: RequestOptions = {}): Promise<T> {
-    await this.ensureAuthenticated();
-    
-    const config = githubAuth.getConfig();
-    
-    // CLI認証の場合はgh コマンド経由でリクエスト
-    if (config.method === AuthMethod.CLI) {
-      return await this.requestViaCli<T>(endpoint, options);
+    const response = await this.requestWithResponse<T>(endpoint, options);
+    return response.data;
+  }
+
+  /**
+   * GitHub API リクエストを実行し、ステータスとヘッダーも含めて返す
+   * GET リクエストは ETag / Last-Modified による条件付きリクエストでキャッシュし、
+   * 同時に発生した同一の GET は1回のリクエストにまとめる
+   */
+  async requestWithResponse<T>(endpoint: string, options: RequestOptions = {}): Promise<GitHubApiResponse<T>> {
+    const method = (options.method || 'GET').toUpperCase();
+    const path = this.toPath(endpoint);
+    const accept = options.headers?.['Accept'] || DEFAULT_ACCEPT;
+    const cacheKey = method === 'GET' ? ResponseCache.key(method, path, accept) : null;
+    const runOptions = {
+      resource: path === GRAPHQL_PATH ? 'graphql' : 'core',
+      idempotent: options.idempotent ?? (method === 'GET' || method === 'HEAD'),
+    };
+    const route = normalizeRoute(path);
+    const endSpan = metrics.startSpan(`api ${method} ${route}`);
+    metrics.increment('api.requests');
+
+    try {
+      const response = await this.requestOnce<T>(path, options, method, cacheKey, runOptions);
+      const durationMs = endSpan();
+      logger.event('api.request', { method, route, status: response.status, durationMs: Math.round(durationMs) }, LogLevel.DEBUG);
+      return response;
+    } catch (error) {
+      const durationMs = endSpan(true);
+      metrics.increment('api.errors');
+      logger.event('api.request', {
+        method,
+        route,
+        status: (error as Partial<GitHubError>).status,
+        durationMs: Math.round(durationMs),
+        error: error instanceof Error ? error.message : String(error),
+      }, LogLevel.DEBUG);
+      throw error;
+    }
+  }
+
+  /**
+   * キャッシュ・single-flight・認証の再試行を適用してリクエストを1件処理
+   */
+  private async requestOnce<T>(
+    path: string,
+    options: RequestOptions,
+    method: string,
+    cacheKey: string | null,
+    runOptions: { resource: string; idempotent: boolean }
+  ): Promise<GitHubApiResponse<T>> {
+    return await this.scheduler.singleFlight(cacheKey, () => this.withAuthRetry(async () => {
+      const cached = cacheKey ? this.cache.get(cacheKey) : undefined;
+      const headers = { ...options.headers, ...ResponseCache.conditionalHeaders(cached) };
+      const response = await this.scheduler.run(
+        () => this.send(path, { ...options, method, headers }),
+        runOptions
+      );
+
+      if (response.status === 304 && cacheKey && cached) {
+        logger.debug(`Not modified, serving cached response: ${method} ${path}`);
+        this.cache.recordNotModified(cacheKey);
+        metrics.increment('api.not_modified');
+        return { data: cached.body as T, status: 200, headers: response.headers };
+      }
+
+      if (response.status < 200 || response.status >= 300) {
+        throw this.createApiError(response.status, response.data);
+      }
+
+      if (cacheKey) {
+        this.cache.store(cacheKey, path, response.headers, response.data);
+      }
+
+      return response as GitHubApiResponse<T>;
+    }));
+  }
+
+  /**
+   * 認証方式に応じてリクエストを送信（ステータスによる例外は投げない）
+   */
+  private async send(path: string, options: RequestOptions): Promise<GitHubApiResponse<unknown>> {
+    metrics.increment('api.upstream_requests');
+
+    // CLI認証でトークンが取得できない場合のみ gh コマンド経由でリクエスト
+    if (await this.useCliSubprocess()) {
+      metrics.increment('api.upstream_requests.cli');
+      return await this.requestViaCli(path, options);
     } else {
-      return await this.requestViaFetch<T>(endpoint, options);
+      return await this.requestViaHttp(path, options);
     }
   }
 
   /**
-   * fetch を使用したAPIリクエスト (PAT認証用)
+   * gh サブプロセス経由で送信すべきか判定
+   * CLI認証でも `gh auth token` でトークンが取得できれば PAT と同じ HTTP 経路を使う
    */
-  private async requestViaFetch<T>(endpoint: string, options: RequestOptions = {}): Promise<T> {
-    const url = endpoint.startsWith('http') ? endpoint : `${this.baseUrl}${endpoint}`;
+  private async useCliSubprocess(): Promise<boolean> {
+    const config = githubAuth.getConfig();
+    if (config.method !== AuthMethod.CLI) {
+      return false;
+    }
+
+    const client = githubAuth.getClient() as CliClient;
+    return (await client.resolveToken()) === null;
+  }
+
+  /**
+   * 完全なURLをAPIパスに変換
+   */
+  private toPath(endpoint: string): string {
+    return endpoint.startsWith(this.baseUrl) ? endpoint.slice(this.baseUrl.length) : endpoint;
+  }
+
+  /**
+   * Keep-Alive 接続プールを使用したAPIリクエスト (PAT認証 / CLIトークン用)
+   */
+  private async requestViaHttp(path: string, options: RequestOptions = {}): Promise<GitHubApiResponse<unknown>> {
+    // GraphQL は REST のベースURLの配下とは限らない（GHES では /api/graphql）
+    const url = path === GRAPHQL_PATH ? this.graphqlUrl : `${this.baseUrl}${path}`;
     const headers = await githubAuth.getAuthHeaders();
     
     // オプションのヘッダーをマージ
     const finalHeaders = { ...headers, ...options.headers };
     
-    logger.debug(`API Request (fetch): ${options.method || 'GET'} ${url}`);
+    logger.debug(`API Request (http): ${options.method || 'GET'} ${url}`);
     
-    const response = await fetch(url, {
+    const body = options.body ? JSON.stringify(options.body) : undefined;
+    const response = await httpClient.request(url, {
       method: options.method || 'GET',
       headers: finalHeaders,
-      body: options.body ? JSON.stringify(options.body) : undefined,
+      body,
     });
+    metrics.increment('http.bytes_sent', body ? Buffer.byteLength(body) : 0);
+    metrics.increment('http.bytes_received', response.body.length);
 
-    const responseBody = await this.parseResponseBody(response);
+    const responseBody = response.status === 304 ? null : this.parseResponseBody(response);
 
-    if (!response.ok) {
-      throw this.createApiError(response.status, responseBody);
-    }
-
-    return responseBody as T;
+    return { data: responseBody, status: response.status, headers: response.headers };
   }
 
   /**
    * GitHub CLI を使用したAPIリクエスト
    */
-  private async requestViaCli<T>(endpoint: string, options: RequestOptions = {}): Promise<T> {
+  private async requestViaCli(path: string, options: RequestOptions = {}): Promise<GitHubApiResponse<unknown>> {
     const client = githubAuth.getClient() as CliClient;
     const method = options.method || 'GET';
     
-    // エンドポイントから '/api/v1' などのプレフィックスを除去
-    const cleanEndpoint = endpoint.replace(/^https:\/\/api\.github\.com/, '');
-    
-    logger.debug(`API Request (CLI): ${method} ${cleanEndpoint}`);
+    logger.debug(`API Request (CLI): ${method} ${path}`);
     
     try {
-      return await client.apiRequest(method, cleanEndpoint, options.body);
+      // gh api は "graphql" を認証先ホストの GraphQL エンドポイントとして扱う
+      const endpoint = path === GRAPHQL_PATH ? 'graphql' : path;
+      const response = await client.apiRequest(method, endpoint, options.body, options.headers);
+      return { data: response.body, status: response.status, headers: response.headers };
     } catch (error) {
       logger.error(`GitHub CLI API request failed:`, error);
-      throw new Error(`GitHub CLI API request failed: ${error}`);
+      const wrapped = new Error(`GitHub CLI API request failed: ${error}`) as Error & Partial<GitHubError>;
+      wrapped.status = (error as Partial<GitHubError>).status;
+      throw wrapped;
+    }
+  }
+
+  /**
+   * ページ分割されたリストをページ単位で取得
+   * Link ヘッダーで最終ページが分かる場合は残りのページを並列取得し、順番通りに返す
+   */
+  async *paginate<T>(endpoint: string, maxItems?: number): AsyncGenerator<T[], void, undefined> {
+    const perPage = maxItems !== undefined ? Math.min(Math.max(maxItems, 1), MAX_PER_PAGE) : MAX_PER_PAGE;
+    const separator = endpoint.includes('?') ? '&' : '?';
+    const first = await this.requestWithResponse<T[]>(`${endpoint}${separator}per_page=${perPage}`);
+
+    let remaining = maxItems ?? Infinity;
+    const take = (items: T[]): T[] => {
+      const page = items.length > remaining ? items.slice(0, remaining) : items;
+      remaining -= page.length;
+      return page;
+    };
+
+    yield take(first.data);
+
+    const links = parseLinkHeader(first.headers['link']);
+    const lastPage = links.last ? parseInt(new URL(links.last).searchParams.get('page') || '', 10) : NaN;
+
+    if (Number.isFinite(lastPage)) {
+      // 総ページ数が分かる場合は上限付きで並列取得
+      const neededPages = Math.min(lastPage, Math.ceil((maxItems ?? Infinity) / perPage));
+      const pageUrls: string[] = [];
+      for (let page = 2; page <= neededPages; page++) {
+        const url = new URL(links.last);
+        url.searchParams.set('page', String(page));
+        pageUrls.push(this.toPath(url.toString()));
+      }
+
+      const inFlight: Array<Promise<GitHubApiResponse<T[]>>> = [];
+      let nextIndex = 0;
+      const launch = () => {
+        const promise = this.requestWithResponse<T[]>(pageUrls[nextIndex++]);
+        // 途中で反復を打ち切った場合に未処理の拒否とならないようにする
+        promise.catch(() => undefined);
+        inFlight.push(promise);
+      };
+
+      while (inFlight.length < this.pageConcurrency && nextIndex < pageUrls.length) {
+        launch();
+      }
+
+      while (inFlight.length > 0 && remaining > 0) {
+        const response = await inFlight.shift()!;
+        if (nextIndex < pageUrls.length) {
+          launch();
+        }
+        yield take(response.data);
+      }
+    } else {
+      // 総ページ数が不明な場合は next リンクを順にたどる
+      let nextUrl = links.next;
+      while (nextUrl && remaining > 0) {
+        const response = await this.requestWithResponse<T[]>(this.toPath(nextUrl));
+        yield take(response.data);
+        nextUrl = parseLinkHeader(response.headers['link']).next;
+      }
+    }
+  }
+
+  /**
+   * 全ページを取得して1つの配列にまとめる
+   */
+  private async collectPages<T>(endpoint: string, maxItems?: number): Promise<T[]> {
+    const items: T[] = [];
+    for await (const page of this.paginate<T>(endpoint, maxItems)) {
+      items.push(...page);
     }
+    return items;
+  }
+
+  /**
+   * 書き込み操作後にプルリクエスト関連のキャッシュを無効化
+   */
+  private invalidatePullRequestCache(owner: string, repo: string, prNumber?: number): void {
+    // 一覧はPRの作成・更新で内容が変わる
+    this.cache.invalidate(`/repos/${owner}/${repo}/pulls`);
+    if (prNumber !== undefined) {
+      this.cache.invalidate(`/repos/${owner}/${repo}/pulls/${prNumber}`, true);
+      this.cache.invalidate(`/repos/${owner}/${repo}/issues/${prNumber}/comments`);
+    }
+  }
+
+  /**
+   * レスポンスキャッシュの統計情報を取得
+   */
+  getCacheStats(): ResponseCacheStats {
+    return this.cache.getStats();
+  }
+
+  /**
+   * レート制限の残量と待ち行列の状態を取得
+   */
+  getSchedulerStatus(): SchedulerStatus {
+    return this.scheduler.getStatus();
   }
 
   /**
    * レスポンス本文をパース
    */
-  private async parseResponseBody(response: Response): Promise<unknown> {
-    const contentType = response.headers.get('content-type') || '';
+  private parseResponseBody(response: HttpResponse): unknown {
+    const contentType = response.headers['content-type'] || '';
+    const text = response.body.toString('utf8');
     
-    if (contentType.includes('application/json')) {
-      return await response.json();
+    if (contentType.includes('application/json') && text !== '') {
+      return JSON.parse(text);
     } else {
-      return await response.text();
+      return text;
     }
   }
 
@@ -105,13 +392,44 @@ export class GitHubApi {
       ? responseBody 
       : JSON.stringify(responseBody);
     
-    const error: GitHubError = {
-      message: `GitHub API error! Status: ${status}, Message: ${message}`,
-      status,
-      response: responseBody
-    };
+    const error = new Error(`GitHub API error! Status: ${status}, Message: ${message}`) as Error & GitHubError;
+    error.status = status;
+    error.response = responseBody;
     
-    return new Error(error.message) as Error & GitHubError;
+    return error;
+  }
+
+  /**
+   * GraphQL エラーを作成
+   */
+  private createGraphQLError(errors: GraphQLError[]): Error {
+    const messages = errors.map(error => error.message).join('; ') || 'response contained no data';
+    return new Error(`GitHub GraphQL error: ${messages}`);
+  }
+
+  /**
+   * GraphQL クエリを実行し、errors を含むレスポンス全体を返す
+   * 認証方式に応じて HTTP または `gh api graphql` で送信する
+   * HTTP 200 で返る RATE_LIMITED エラーはスケジューラーが検出し、他のレート制限と同様に待機・再試行する
+   */
+  async graphqlRequest<T>(query: string, variables: Record<string, unknown> = {}): Promise<GraphQLResponse<T>> {
+    return await this.request<GraphQLResponse<T>>(GRAPHQL_PATH, {
+      method: 'POST',
+      body: { query, variables },
+      // クエリは副作用が無いため 5xx でも再試行してよい
+      idempotent: !/^\s*mutation\b/.test(query)
+    });
+  }
+
+  /**
+   * GraphQL クエリを実行（errors が含まれる場合は例外を投げる）
+   */
+  async graphql<T>(query: string, variables: Record<string, unknown> = {}): Promise<T> {
+    const response = await this.graphqlRequest<T>(query, variables);
+    if (response.errors?.length || !response.data) {
+      throw this.createGraphQLError(response.errors || []);
+    }
+    return response.data;
   }
 
   /**
@@ -124,17 +442,19 @@ export class GitHubApi {
     base: string;
     draft?: boolean;
   }) {
-    return await this.request(`/repos/${owner}/${repo}/pulls`, {
+    const result = await this.request(`/repos/${owner}/${repo}/pulls`, {
       method: 'POST',
       body: data
     });
+    this.invalidatePullRequestCache(owner, repo);
+    return result;
   }
 
   /**
    * オープンなプルリクエストを一覧取得
    */
-  async listOpenPullRequests(owner: string, repo: string, perPage: number = 10) {
-    return await this.request(`/repos/${owner}/${repo}/pulls?state=open&per_page=${perPage}`);
+  async listOpenPullRequests(owner: string, repo: string, limit: number = 10) {
+    return await this.collectPages(`/repos/${owner}/${repo}/pulls?state=open`, limit);
   }
 
   /**
@@ -153,71 +473,94 @@ export class GitHubApi {
     state?: 'open' | 'closed';
     base?: string;
   }) {
-    return await this.request(`/repos/${owner}/${repo}/pulls/${prNumber}`, {
+    const result = await this.request(`/repos/${owner}/${repo}/pulls/${prNumber}`, {
       method: 'PATCH',
       body: data
     });
+    this.invalidatePullRequestCache(owner, repo, prNumber);
+    return result;
   }
 
   /**
-   * プルリクエストのdiffを取得
+   * プルリクエストのdiffをストリームとして取得
+   * diff全体をメモリに展開せず、届いた順に処理するために使用する
    */
-  async getPullRequestDiff(owner: string, repo: string, prNumber: number): Promise<string> {
-    await this.ensureAuthenticated();
-    
-    const config = githubAuth.getConfig();
-    const url = `${this.baseUrl}/repos/${owner}/${repo}/pulls/${prNumber}`;
+  async streamPullRequestDiff(owner: string, repo: string, prNumber: number): Promise<Readable> {
+    return await this.withAuthRetry(() => this.openPullRequestDiffStream(owner, repo, prNumber));
+  }
+
+  /**
+   * 認証方式に応じてdiffのストリームを開く
+   */
+  private async openPullRequestDiffStream(owner: string, repo: string, prNumber: number): Promise<Readable> {
+    const path = `/repos/${owner}/${repo}/pulls/${prNumber}`;
     
-    if (config.method === AuthMethod.CLI) {
-      // CLI経由でdiffを取得
-      const client = githubAuth.getClient() as CliClient;
-      const result = await client.executeCommand([
-        'api', `/repos/${owner}/${repo}/pulls/${prNumber}`,
-        '--header', 'Accept: application/vnd.github.v3.diff'
-      ]);
-      
-      if (!result.success) {
-        throw new Error(`Failed to get PR diff via CLI: ${result.stderr}`);
+    metrics.increment('api.upstream_requests');
+
+    // CLI経由の場合も --include でヘッダーを読み取り、HTTP経由と同じくレート制限を記録・再試行する
+    const useCli = await this.useCliSubprocess();
+    if (useCli) {
+      metrics.increment('api.upstream_requests.cli');
+    }
+    const headers = useCli ? {} : await githubAuth.getAuthHeaders();
+
+    // 本文を読み終わるか破棄されるまで同時実行数の枠を保持する
+    const response = await this.scheduler.runStream(async () => {
+      const streamResponse = useCli
+        ? await (githubAuth.getClient() as CliClient).streamApiRequest(path, { 'Accept': DIFF_ACCEPT })
+        : await httpClient.stream(`${this.baseUrl}${path}`, {
+          headers: {
+            ...headers,
+            'Accept': DIFF_ACCEPT
+          }
+        });
+
+      if (streamResponse.status >= 200 && streamResponse.status < 300) {
+        return { ...streamResponse, data: undefined as string | undefined };
       }
-      
-      return result.stdout;
-    } else {
-      // fetch経由でdiffを取得
-      const headers = await githubAuth.getAuthHeaders();
-      const response = await fetch(url, {
-        headers: {
-          ...headers,
-          'Accept': 'application/vnd.github.v3.diff'
+
+      // エラー時は本文を読み切って接続（または gh プロセス）を解放
+      // gh は 2xx 以外で非0終了するため、本文の読み込みエラーは無視する
+      const chunks: Buffer[] = [];
+      try {
+        for await (const chunk of streamResponse.body) {
+          chunks.push(chunk as Buffer);
         }
-      });
-      
-      if (!response.ok) {
-        const errorBody = await response.text();
-        throw this.createApiError(response.status, errorBody);
+      } catch (error) {
+        logger.debug('Error response body ended early:', error);
       }
-      
-      return await response.text();
+      return { ...streamResponse, data: Buffer.concat(chunks).toString('utf8') as string | undefined };
+    });
+    
+    if (response.status < 200 || response.status >= 300) {
+      throw this.createApiError(response.status, response.data);
     }
+    
+    return response.body;
   }
 
   /**
    * プルリクエストにレビュアーをリクエスト
    */
   async requestReviewers(owner: string, repo: string, prNumber: number, reviewers: string[]) {
-    return await this.request(`/repos/${owner}/${repo}/pulls/${prNumber}/requested_reviewers`, {
+    const result = await this.request(`/repos/${owner}/${repo}/pulls/${prNumber}/requested_reviewers`, {
       method: 'POST',
       body: { reviewers }
     });
+    this.invalidatePullRequestCache(owner, repo, prNumber);
+    return result;
   }
 
   /**
    * プルリクエストにコメントを追加
    */
   async addComment(owner: string, repo: string, prNumber: number, body: string) {
-    return await this.request(`/repos/${owner}/${repo}/issues/${prNumber}/comments`, {
+    const result = await this.request(`/repos/${owner}/${repo}/issues/${prNumber}/comments`, {
       method: 'POST',
       body: { body }
     });
+    this.cache.invalidate(`/repos/${owner}/${repo}/issues/${prNumber}/comments`);
+    return result;
   }
 
   /**
@@ -227,12 +570,39 @@ export class GitHubApi {
     body: string;
     commit_id: string;
     path: string;
-    position: number;
+    position?: number;
+    line?: number;
+    side?: DiffSide;
   }) {
-    return await this.request(`/repos/${owner}/${repo}/pulls/${prNumber}/comments`, {
+    const result = await this.request(`/repos/${owner}/${repo}/pulls/${prNumber}/comments`, {
       method: 'POST',
       body: data
     });
+    this.cache.invalidate(`/repos/${owner}/${repo}/pulls/${prNumber}/comments`);
+    return result;
+  }
+
+  /**
+   * 複数の行コメントを1つのレビューとしてまとめて投稿
+   */
+  async createReview(owner: string, repo: string, prNumber: number, data: {
+    commit_id: string;
+    event: ReviewEvent;
+    body?: string;
+    comments: Array<{
+      path: string;
+      body: string;
+      position?: number;
+      line?: number;
+      side?: DiffSide;
+    }>;
+  }) {
+    const result = await this.request(`/repos/${owner}/${repo}/pulls/${prNumber}/reviews`, {
+      method: 'POST',
+      body: data
+    });
+    this.invalidatePullRequestCache(owner, repo, prNumber);
+    return result;
   }
 
   /**
@@ -240,18 +610,121 @@ export class GitHubApi {
    */
   async getComments(owner: string, repo: string, prNumber: number) {
     const [issueComments, reviewComments] = await Promise.all([
-      this.request(`/repos/${owner}/${repo}/issues/${prNumber}/comments`),
-      this.request(`/repos/${owner}/${repo}/pulls/${prNumber}/comments`)
+      this.collectPages(`/repos/${owner}/${repo}/issues/${prNumber}/comments`),
+      this.collectPages(`/repos/${owner}/${repo}/pulls/${prNumber}/comments`)
     ]);
 
     return { issueComments, reviewComments };
   }
 
   /**
-   * プルリクエストのファイル変更を取得
+   * プルリクエストのメタデータ・ファイル・コメント・レビュースレッド・レビュアーを1回のクエリで取得
+   * カーソルを指定した場合は、指定したコレクションの続きのみ取得する
    */
-  async getFiles(owner: string, repo: string, prNumber: number) {
-    return await this.request(`/repos/${owner}/${repo}/pulls/${prNumber}/files`);
+  async getPullRequestOverview(
+    owner: string,
+    repo: string,
+    prNumber: number,
+    cursors: PullRequestOverviewCursors = {},
+    pageSize: number = 50
+  ): Promise<PullRequestOverview> {
+    const continuing = Boolean(cursors.files || cursors.comments || cursors.reviewThreads);
+    const data = await this.graphql<{ repository: { pullRequest: PullRequestOverview | null } | null }>(
+      PULL_REQUEST_OVERVIEW_QUERY,
+      {
+        owner,
+        repo,
+        number: prNumber,
+        pageSize: Math.min(Math.max(pageSize, 1), MAX_PER_PAGE),
+        filesCursor: cursors.files ?? null,
+        commentsCursor: cursors.comments ?? null,
+        threadsCursor: cursors.reviewThreads ?? null,
+        includeFiles: !continuing || Boolean(cursors.files),
+        includeComments: !continuing || Boolean(cursors.comments),
+        includeThreads: !continuing || Boolean(cursors.reviewThreads),
+      }
+    );
+
+    const pullRequest = data.repository?.pullRequest;
+    if (!pullRequest) {
+      throw new Error(`Pull request ${owner}/${repo}#${prNumber} not found`);
+    }
+    return pullRequest;
+  }
+
+  /**
+   * 複数リポジトリのオープンなプルリクエストを1回のクエリで取得
+   * 取得できなかったリポジトリは error に理由を設定し、他のリポジトリの結果は返す
+   */
+  async listOpenPullRequestsForRepositories(
+    repositories: Array<{ owner: string; repo: string }>,
+    limit: number = 10
+  ): Promise<RepositoryPullRequests[]> {
+    const variables: Record<string, unknown> = { limit: Math.min(Math.max(limit, 1), MAX_PER_PAGE) };
+    repositories.forEach(({ owner, repo }, i) => {
+      variables[`owner${i}`] = owner;
+      variables[`name${i}`] = repo;
+    });
+
+    type RepositoryResult = { pullRequests: GraphQLConnection<OpenPullRequestSummary> } | null;
+    const response = await this.graphqlRequest<Record<string, RepositoryResult>>(
+      buildOpenPullRequestsQuery(repositories.length),
+      variables
+    );
+    if (!response.data) {
+      throw this.createGraphQLError(response.errors || []);
+    }
+    const data = response.data;
+
+    return repositories.map(({ owner, repo }, i) => {
+      const result = data[`r${i}`];
+      if (!result) {
+        const errors = (response.errors || []).filter(error => error.path?.[0] === `r${i}`);
+        return {
+          owner,
+          repo,
+          pullRequests: [],
+          totalCount: 0,
+          error: errors.map(error => error.message).join('; ') || 'repository not found',
+        };
+      }
+      return {
+        owner,
+        repo,
+        pullRequests: result.pullRequests.nodes,
+        totalCount: result.pullRequests.totalCount,
+      };
+    });
+  }
+
+  /**
+   * プルリクエストのファイル変更をページ単位で取得
+   */
+  iterateFiles(owner: string, repo: string, prNumber: number): AsyncGenerator<PullRequestFile[], void, undefined> {
+    return this.paginate<PullRequestFile>(`/repos/${owner}/${repo}/pulls/${prNumber}/files`);
+  }
+
+  /**
+   * ファイル別の差分インデックスを取得
+   * head SHA ごとにキャッシュし、未構築の場合のみファイル変更を取得して構築する
+   */
+  async getDiffIndexes(owner: string, repo: string, prNumber: number, headSha: string): Promise<Map<string, DiffIndex>> {
+    const key = DiffIndexCache.key(owner, repo, prNumber, headSha);
+    const cached = this.diffIndexes.get(key);
+    if (cached) {
+      return cached;
+    }
+
+    return await this.scheduler.singleFlight(`diff-index ${key}`, async () => {
+      const indexes = new Map<string, DiffIndex>();
+      for await (const page of this.iterateFiles(owner, repo, prNumber)) {
+        for (const file of page) {
+          indexes.set(file.filename, DiffIndex.build(file.patch));
+        }
+      }
+      this.diffIndexes.set(key, indexes);
+      return indexes;
+    });
   }
 }
 
@@ -0,0 +1,120 @@
+// GraphQL クエリ定義
+
+/**
+ * プルリクエストの概要を1回で取得するクエリ
+ * 続きを取得する場合は include 変数で必要なコレクションのみに絞る
+ */
+export const PULL_REQUEST_OVERVIEW_QUERY = `
+query PullRequestOverview(
+  $owner: String!
+  $repo: String!
+  $number: Int!
+  $pageSize: Int!
+  $filesCursor: String
+  $commentsCursor: String
+  $threadsCursor: String
+  $includeFiles: Boolean!
+  $includeComments: Boolean!
+  $includeThreads: Boolean!
+) {
+  repository(owner: $owner, name: $repo) {
+    pullRequest(number: $number) {
+      number
+      title
+      body
+      state
+      isDraft
+      url
+      createdAt
+      updatedAt
+      author { login }
+      headRefName
+      headRefOid
+      baseRefName
+      additions
+      deletions
+      changedFiles
+      reviewDecision
+      reviewRequests(first: 50) {
+        nodes {
+          requestedReviewer {
+            ... on User { login }
+            ... on Bot { login }
+            ... on Mannequin { login }
+            ... on Team { slug }
+          }
+        }
+      }
+      latestReviews(first: 50) {
+        nodes { author { login } state submittedAt }
+      }
+      files(first: $pageSize, after: $filesCursor) @include(if: $includeFiles) {
+        totalCount
+        pageInfo { hasNextPage endCursor }
+        nodes { path additions deletions changeType }
+      }
+      comments(first: $pageSize, after: $commentsCursor) @include(if: $includeComments) {
+        totalCount
+        pageInfo { hasNextPage endCursor }
+        nodes { author { login } body createdAt url }
+      }
+      reviewThreads(first: $pageSize, after: $threadsCursor) @include(if: $includeThreads) {
+        totalCount
+        pageInfo { hasNextPage endCursor }
+        nodes {
+          path
+          line
+          isResolved
+          isOutdated
+          comments(first: 20) {
+            totalCount
+            nodes { author { login } body createdAt url }
+          }
+        }
+      }
+    }
+  }
+}`;
+
+/**
+ * 複数リポジトリのオープンなプルリクエストを1回で取得するクエリを作成
+ * リポジトリごとにエイリアス (r0, r1, ...) を付け、変数 owner0 / name0 ... で指定する
+ */
+export function buildOpenPullRequestsQuery(repositoryCount: number): string {
+  const variables: string[] = ['$limit: Int!'];
+  const fields: string[] = [];
+
+  for (let i = 0; i < repositoryCount; i++) {
+    variables.push(`$owner${i}: String!`, `$name${i}: String!`);
+    fields.push(`  r${i}: repository(owner: $owner${i}, name: $name${i}) { ...OpenPullRequests }`);
+  }
+
+  return `
+query OpenPullRequests(${variables.join(', ')}) {
+${fields.join('\n')}
+}
+
+fragment OpenPullRequests on Repository {
+  pullRequests(states: OPEN, first: $limit, orderBy: { field: CREATED_AT, direction: DESC }) {
+    totalCount
+    nodes {
+      number
+      title
+      url
+      createdAt
+      author { login }
+      headRefName
+      baseRefName
+      headRepositoryOwner { login }
+      reviewRequests(first: 20) {
+        nodes {
+          requestedReviewer {
+            ... on User { login }
+            ... on Team { slug }
+          }
+        }
+      }
+    }
+  }
+}`;
+}
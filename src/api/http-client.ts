@@ -0,0 +1,188 @@
+// Keep-Alive 接続プールを共有する HTTP クライアント
+
+import http from 'http';
+import https from 'https';
+import { createGunzip } from 'zlib';
+import { pipeline, Readable } from 'stream';
+import { logger } from '../utils/logger.js';
+import { readPositiveIntEnv } from '../utils/helpers.js';
+
+export interface HttpRequestOptions {
+  method?: string;
+  headers?: Record<string, string>;
+  body?: string;
+}
+
+export interface HttpResponse {
+  status: number;
+  headers: Record<string, string>;
+  body: Buffer;
+}
+
+export interface HttpStreamResponse {
+  status: number;
+  headers: Record<string, string>;
+  body: Readable;
+}
+
+// リダイレクトを追跡する上限回数
+const MAX_REDIRECTS = 5;
+const REDIRECT_STATUSES = new Set([301, 302, 303, 307, 308]);
+
+/**
+ * PAT と GitHub CLI トークンの両方で共有する HTTP クライアント
+ * 同一ホストへの接続を再利用し、同時接続数を maxSockets で制限する
+ * リネーム・移管されたリポジトリのリダイレクトを追跡し、無通信が続いた接続はタイムアウトさせる
+ */
+export class HttpClient {
+  private readonly httpsAgent: https.Agent;
+  private readonly httpAgent: http.Agent;
+
+  constructor(maxSockets: number, private readonly timeoutMs: number = 30_000) {
+    const agentOptions = { keepAlive: true, maxSockets, maxFreeSockets: maxSockets };
+    this.httpsAgent = new https.Agent(agentOptions);
+    this.httpAgent = new http.Agent(agentOptions);
+    logger.debug(`HTTP client initialized with keep-alive pool (maxSockets: ${maxSockets}, timeout: ${timeoutMs}ms)`);
+  }
+
+  /**
+   * リクエストを送信し、レスポンス本文を Buffer にまとめて返す
+   */
+  async request(url: string, options: HttpRequestOptions = {}): Promise<HttpResponse> {
+    const response = await this.stream(url, options);
+    const chunks: Buffer[] = [];
+
+    for await (const chunk of response.body) {
+      chunks.push(chunk as Buffer);
+    }
+
+    return { status: response.status, headers: response.headers, body: Buffer.concat(chunks) };
+  }
+
+  /**
+   * リクエストを送信し、レスポンス本文をストリームのまま返す
+   * gzip で圧縮されたレスポンスは展開済みのストリームになる
+   * 途中で読み込みをやめる場合は body を destroy() すると接続が解放される
+   */
+  async stream(url: string, options: HttpRequestOptions = {}): Promise<HttpStreamResponse> {
+    let target = new URL(url);
+    let current = options;
+
+    for (let redirects = 0; ; redirects++) {
+      const res = await this.send(target, current);
+      const status = res.statusCode || 0;
+      const location = res.headers.location;
+
+      if (!REDIRECT_STATUSES.has(status) || !location) {
+        return toStreamResponse(res);
+      }
+
+      // リダイレクトの本文は使わないため読み捨てて接続をプールに戻す
+      res.resume();
+      if (redirects >= MAX_REDIRECTS) {
+        throw new Error(`Too many redirects (more than ${MAX_REDIRECTS}) for ${url}`);
+      }
+
+      const next = new URL(location, target);
+      logger.debug(`Following ${status} redirect: ${target} -> ${next}`);
+      current = redirectOptions(current, status, target, next);
+      target = next;
+    }
+  }
+
+  /**
+   * 1回分のリクエストを送信してレスポンスヘッダーの到着を待つ
+   * 一定時間無通信が続いた場合は ETIMEDOUT で中断する（本文の受信中も対象）
+   */
+  private send(target: URL, options: HttpRequestOptions): Promise<http.IncomingMessage> {
+    const isHttps = target.protocol === 'https:';
+    const method = options.method || 'GET';
+    const headers: Record<string, string> = { 'Accept-Encoding': 'gzip', ...options.headers };
+
+    if (options.body !== undefined) {
+      headers['Content-Length'] = String(Buffer.byteLength(options.body));
+    }
+
+    const requestOptions: http.RequestOptions = {
+      method,
+      headers,
+      agent: isHttps ? this.httpsAgent : this.httpAgent,
+    };
+
+    return new Promise((resolve, reject) => {
+      let response: http.IncomingMessage | null = null;
+      const onResponse = (res: http.IncomingMessage) => {
+        response = res;
+        resolve(res);
+      };
+      const req = isHttps
+        ? https.request(target, requestOptions, onResponse)
+        : http.request(target, requestOptions, onResponse);
+
+      req.setTimeout(this.timeoutMs, () => {
+        const error = new Error(`Request timed out after ${this.timeoutMs}ms: ${method} ${target}`) as NodeJS.ErrnoException;
+        error.code = 'ETIMEDOUT';
+        // 本文の受信中であれば読み込み側にも同じエラーを伝える
+        response?.destroy(error);
+        req.destroy(error);
+      });
+      req.on('error', reject);
+
+      if (options.body !== undefined) {
+        req.write(options.body);
+      }
+      req.end();
+    });
+  }
+}
+
+/**
+ * レスポンスを HttpStreamResponse に変換
+ * gzip の場合は pipeline で展開し、展開側が途中で破棄されたら元のレスポンスも破棄して接続を解放する
+ */
+function toStreamResponse(res: http.IncomingMessage): HttpStreamResponse {
+  const headers: Record<string, string> = {};
+  for (const [name, value] of Object.entries(res.headers)) {
+    if (value !== undefined) {
+      headers[name.toLowerCase()] = Array.isArray(value) ? value.join(', ') : value;
+    }
+  }
+
+  let body: Readable = res;
+  if (headers['content-encoding'] === 'gzip') {
+    body = pipeline(res, createGunzip(), () => {
+      // エラーは展開側のストリームに伝わり、読み込み側で受け取る
+    });
+  }
+
+  return { status: res.statusCode || 0, headers, body };
+}
+
+/**
+ * リダイレクト先へのリクエスト内容を作成（fetch と同じ規則）
+ * - 303、および POST に対する 301/302 は本文なしの GET に変更
+ * - 別オリジンへのリダイレクトでは Authorization ヘッダーを送らない
+ */
+function redirectOptions(options: HttpRequestOptions, status: number, from: URL, to: URL): HttpRequestOptions {
+  const method = (options.method || 'GET').toUpperCase();
+  const toGet = status === 303 || ((status === 301 || status === 302) && method === 'POST');
+  const headers = { ...options.headers };
+
+  if (from.origin !== to.origin) {
+    for (const name of Object.keys(headers)) {
+      if (name.toLowerCase() === 'authorization') {
+        delete headers[name];
+      }
+    }
+  }
+
+  return toGet
+    ? { method: method === 'HEAD' ? 'HEAD' : 'GET', headers }
+    : { ...options, headers };
+}
+
+// シングルトンインスタンス
+export const httpClient = new HttpClient(
+  readPositiveIntEnv('GITHUB_MAX_SOCKETS', 10),
+  readPositiveIntEnv('GITHUB_REQUEST_TIMEOUT_SECONDS', 30) * 1000
+);
@@ -0,0 +1,356 @@
+// レート制限を考慮したリクエストスケジューラー
+
+import { Readable } from 'stream';
+import { logger } from '../utils/logger.js';
+
+export interface ScheduledResponse {
+  status: number;
+  headers: Record<string, string>;
+  data?: unknown;
+}
+
+export interface ScheduledStreamResponse extends ScheduledResponse {
+  body: Readable;
+}
+
+export interface RunOptions {
+  // GitHub のレート制限リソース名 (core / graphql など)
+  resource?: string;
+  // 5xx を再試行してよいか（副作用のある POST などは false）
+  idempotent?: boolean;
+}
+
+export interface RateLimitState {
+  limit: number | null;
+  remaining: number | null;
+  used: number | null;
+  resetAt: string | null;
+}
+
+export interface SchedulerStatus {
+  active: number;
+  queued: number;
+  maxConcurrent: number;
+  inFlight: number;
+  waitReason: string | null;
+  pausedUntil: string | null;
+  rateLimits: Record<string, RateLimitState>;
+  deduplicated: number;
+  retries: number;
+  throttled: number;
+}
+
+interface RateLimitEntry {
+  limit: number;
+  remaining: number;
+  used: number | null;
+  resetAt: number;
+}
+
+// レート制限の回復待ちの上限（これより長い場合は待たずに送信して GitHub のエラーを返す）
+const MAX_RATE_LIMIT_WAIT_MS = 60_000;
+const BASE_BACKOFF_MS = 1_000;
+const SECONDARY_LIMIT_BACKOFF_MS = 5_000;
+const RETRYABLE_NETWORK_ERRORS = new Set(['ECONNRESET', 'ETIMEDOUT', 'EPIPE', 'EAI_AGAIN']);
+
+/**
+ * GitHub API リクエストの実行を一元管理
+ * - 同一の GET を1つにまとめる (single-flight)
+ * - 同時実行数の上限
+ * - X-RateLimit-Remaining / Reset による事前の流量制御
+ * - 二次レート制限と 5xx に対するジッター付き指数バックオフ
+ */
+export class RequestScheduler {
+  private active = 0;
+  private readonly queue: Array<() => void> = [];
+  private readonly inFlight = new Map<string, Promise<unknown>>();
+  private readonly rateLimits = new Map<string, RateLimitEntry>();
+  private pausedUntil = 0;
+  private waitReason: string | null = null;
+  private stats = { deduplicated: 0, retries: 0, throttled: 0 };
+
+  constructor(
+    private readonly maxConcurrent: number = 8,
+    private readonly maxRetries: number = 3,
+    private readonly rateLimitReserve: number = 10
+  ) {}
+
+  /**
+   * 同一キーで実行中のリクエストがあれば、その結果を共有する
+   */
+  async singleFlight<T>(key: string | null, fn: () => Promise<T>): Promise<T> {
+    if (key === null) {
+      return await fn();
+    }
+
+    const existing = this.inFlight.get(key);
+    if (existing) {
+      this.stats.deduplicated++;
+      logger.debug(`Joining in-flight request: ${key}`);
+      return await (existing as Promise<T>);
+    }
+
+    const promise = fn().finally(() => {
+      this.inFlight.delete(key);
+    });
+    this.inFlight.set(key, promise);
+    return await promise;
+  }
+
+  /**
+   * 同時実行数とレート制限を考慮して1回だけ実行（再試行なし）
+   * hold が本文のストリームを返した場合は、そのストリームが終了・破棄されるまで実行枠を保持する
+   */
+  async schedule<T>(
+    fn: () => Promise<T>,
+    resource: string = 'core',
+    hold?: (result: T) => Readable | undefined
+  ): Promise<T> {
+    await this.waitForRateLimit(resource);
+    await this.acquire();
+
+    let result: T;
+    try {
+      result = await fn();
+    } catch (error) {
+      this.release();
+      throw error;
+    }
+
+    const stream = hold?.(result);
+    if (stream && !stream.destroyed) {
+      stream.once('close', () => this.release());
+    } else {
+      this.release();
+    }
+    return result;
+  }
+
+  /**
+   * リクエストを実行し、レート制限ヘッダーを記録して必要に応じて再試行
+   */
+  async run<T extends ScheduledResponse>(send: () => Promise<T>, options: RunOptions = {}): Promise<T> {
+    return await this.execute(send, options);
+  }
+
+  /**
+   * 本文をストリームで返すリクエストを実行（再試行の規則は run と同じ）
+   * 2xx の本文は読み終わるか破棄されるまで実行枠を保持し、大きな diff の同時取得も上限内に収める
+   * 2xx 以外の本文は send の中で data に読み切っておくこと
+   */
+  async runStream<T extends ScheduledStreamResponse>(send: () => Promise<T>, options: RunOptions = {}): Promise<T> {
+    return await this.execute(send, options, (response) =>
+      response.status >= 200 && response.status < 300 ? response.body : undefined
+    );
+  }
+
+  private async execute<T extends ScheduledResponse>(
+    send: () => Promise<T>,
+    options: RunOptions,
+    hold?: (response: T) => Readable | undefined
+  ): Promise<T> {
+    const resource = options.resource || 'core';
+
+    for (let attempt = 0; ; attempt++) {
+      let response: T;
+      try {
+        response = await this.schedule(send, resource, hold);
+      } catch (error) {
+        const code = (error as NodeJS.ErrnoException).code;
+        if (options.idempotent !== false && code && RETRYABLE_NETWORK_ERRORS.has(code) && attempt < this.maxRetries) {
+          const delay = this.backoff(BASE_BACKOFF_MS, attempt);
+          logger.warn(`Network error (${code}), retrying in ${delay}ms (attempt ${attempt + 1}/${this.maxRetries})`);
+          this.stats.retries++;
+          await sleep(delay);
+          continue;
+        }
+        throw error;
+      }
+
+      this.updateRateLimit(response.headers, resource);
+
+      const delay = attempt < this.maxRetries ? this.retryDelay(response, attempt, options.idempotent !== false) : null;
+      if (delay === null) {
+        return response;
+      }
+
+      const reason = isGraphQLRateLimited(response) ? `${response.status} with a GraphQL RATE_LIMITED error` : `${response.status}`;
+      logger.warn(`GitHub API returned ${reason}, retrying in ${delay}ms (attempt ${attempt + 1}/${this.maxRetries})`);
+      this.stats.retries++;
+      await sleep(delay);
+    }
+  }
+
+  /**
+   * 現在のクォータと待ち行列の状態を取得
+   */
+  getStatus(): SchedulerStatus {
+    const rateLimits: Record<string, RateLimitState> = {};
+    for (const [resource, entry] of this.rateLimits) {
+      rateLimits[resource] = {
+        limit: entry.limit,
+        remaining: entry.remaining,
+        used: entry.used,
+        resetAt: new Date(entry.resetAt).toISOString(),
+      };
+    }
+
+    return {
+      active: this.active,
+      queued: this.queue.length,
+      maxConcurrent: this.maxConcurrent,
+      inFlight: this.inFlight.size,
+      waitReason: this.waitReason,
+      pausedUntil: this.pausedUntil > Date.now() ? new Date(this.pausedUntil).toISOString() : null,
+      rateLimits,
+      ...this.stats,
+    };
+  }
+
+  /**
+   * 実行枠を確保（上限に達している場合は空くまで待機）
+   */
+  private async acquire(): Promise<void> {
+    if (this.active < this.maxConcurrent) {
+      this.active++;
+      return;
+    }
+
+    logger.debug(`Request queued (active: ${this.active}, queued: ${this.queue.length + 1})`);
+    await new Promise<void>((resolve) => this.queue.push(resolve));
+  }
+
+  /**
+   * 実行枠を解放し、待機中のリクエストに引き渡す
+   */
+  private release(): void {
+    const next = this.queue.shift();
+    if (next) {
+      next();
+    } else {
+      this.active--;
+    }
+  }
+
+  /**
+   * 二次レート制限による一時停止中、または残りクォータが予備分を下回った場合に待機
+   */
+  private async waitForRateLimit(resource: string): Promise<void> {
+    const now = Date.now();
+    let waitUntil = 0;
+    let reason: string | null = null;
+
+    if (this.pausedUntil > now) {
+      waitUntil = this.pausedUntil;
+      reason = 'backing off after secondary rate limit';
+    }
+
+    const entry = this.rateLimits.get(resource);
+    if (entry && entry.remaining <= this.rateLimitReserve && entry.resetAt > now && entry.resetAt > waitUntil) {
+      waitUntil = entry.resetAt;
+      reason = `${resource} rate limit nearly exhausted (${entry.remaining}/${entry.limit} remaining)`;
+    }
+
+    const waitMs = waitUntil - now;
+    if (waitMs <= 0) {
+      return;
+    }
+    if (waitMs > MAX_RATE_LIMIT_WAIT_MS) {
+      logger.warn(`${reason}; reset is ${Math.ceil(waitMs / 1000)}s away, sending without waiting`);
+      return;
+    }
+
+    logger.info(`Throttling request for ${waitMs}ms: ${reason}`);
+    this.stats.throttled++;
+    this.waitReason = reason;
+    try {
+      await sleep(waitMs);
+    } finally {
+      this.waitReason = null;
+    }
+  }
+
+  /**
+   * レスポンスヘッダーからレート制限の状態を記録
+   */
+  private updateRateLimit(headers: Record<string, string>, fallbackResource: string): void {
+    const remaining = parseInt(headers['x-ratelimit-remaining'] ?? '', 10);
+    const reset = parseInt(headers['x-ratelimit-reset'] ?? '', 10);
+    if (!Number.isFinite(remaining) || !Number.isFinite(reset)) {
+      return;
+    }
+
+    const limit = parseInt(headers['x-ratelimit-limit'] ?? '', 10);
+    const used = parseInt(headers['x-ratelimit-used'] ?? '', 10);
+    this.rateLimits.set(headers['x-ratelimit-resource'] || fallbackResource, {
+      limit: Number.isFinite(limit) ? limit : remaining,
+      remaining,
+      used: Number.isFinite(used) ? used : null,
+      resetAt: reset * 1000,
+    });
+  }
+
+  /**
+   * 再試行までの待機時間を決定（再試行しない場合は null）
+   * GraphQL の RATE_LIMITED は HTTP 200 で返るため、403/429 と同じ規則で扱う
+   */
+  private retryDelay(response: ScheduledResponse, attempt: number, idempotent: boolean): number | null {
+    const { status, headers } = response;
+    const retryAfter = parseInt(headers['retry-after'] ?? '', 10);
+    const graphqlRateLimited = isGraphQLRateLimited(response);
+
+    if (status === 403 || status === 429 || graphqlRateLimited) {
+      // 一次レート制限: リセットまで待機（待ち時間が長すぎる場合は再試行しない）
+      if (headers['x-ratelimit-remaining'] === '0') {
+        const reset = parseInt(headers['x-ratelimit-reset'] ?? '', 10) * 1000;
+        const waitMs = Number.isFinite(reset) ? reset - Date.now() + 1000 : NaN;
+        return waitMs > 0 && waitMs <= MAX_RATE_LIMIT_WAIT_MS ? waitMs : null;
+      }
+
+      // 二次レート制限: Retry-After に従い、無ければ指数バックオフ
+      const body = typeof response.data === 'string' ? response.data : JSON.stringify(response.data ?? '');
+      if (Number.isFinite(retryAfter) || graphqlRateLimited || /secondary rate limit|abuse/i.test(body)) {
+        const delay = Number.isFinite(retryAfter)
+          ? retryAfter * 1000
+          : this.backoff(SECONDARY_LIMIT_BACKOFF_MS, attempt);
+        if (delay > MAX_RATE_LIMIT_WAIT_MS) {
+          return null;
+        }
+        // 他のリクエストも同じ時間だけ停止させる
+        this.pausedUntil = Math.max(this.pausedUntil, Date.now() + delay);
+        return delay;
+      }
+
+      return null;
+    }
+
+    if (status >= 500 && idempotent) {
+      return Number.isFinite(retryAfter) ? retryAfter * 1000 : this.backoff(BASE_BACKOFF_MS, attempt);
+    }
+
+    return null;
+  }
+
+  /**
+   * ジッター付き指数バックオフ（base * 2^attempt の 50〜100%）
+   */
+  private backoff(base: number, attempt: number): number {
+    const delay = Math.min(base * 2 ** attempt, MAX_RATE_LIMIT_WAIT_MS);
+    return Math.round(delay / 2 + Math.random() * (delay / 2));
+  }
+}
+
+/**
+ * GraphQL レスポンスの errors に RATE_LIMITED が含まれるか判定
+ */
+function isGraphQLRateLimited(response: ScheduledResponse): boolean {
+  if (response.status < 200 || response.status >= 300) {
+    return false;
+  }
+  const errors = (response.data as { errors?: unknown } | null | undefined)?.errors;
+  return Array.isArray(errors) && errors.some((error) => (error as { type?: unknown } | null)?.type === 'RATE_LIMITED');
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
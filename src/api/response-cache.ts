@@ -0,0 +1,206 @@
+// 条件付きリクエスト (ETag / Last-Modified) 用のレスポンスキャッシュ
+
+import { readFileSync } from 'fs';
+import { mkdir, rename, writeFile } from 'fs/promises';
+import { dirname, join } from 'path';
+import { logger } from '../utils/logger.js';
+
+export interface CachedResponse {
+  path: string;
+  etag?: string;
+  lastModified?: string;
+  body: unknown;
+  storedAt: number;
+}
+
+export interface ResponseCacheStats {
+  size: number;
+  maxEntries: number;
+  misses: number;
+  // 304 でキャッシュから応答した件数
+  notModified: number;
+  // キャッシュ済みだったが内容が変わっていた（200 で更新した）件数
+  modified: number;
+  evictions: number;
+  invalidations: number;
+  persistent: boolean;
+}
+
+const CACHE_FILE_NAME = 'response-cache.json';
+const PERSIST_DELAY_MS = 1000;
+
+/**
+ * LRU方式のレスポンスキャッシュ
+ * Mapの挿入順を利用し、先頭を最も古いエントリとして扱う
+ */
+export class ResponseCache {
+  private readonly entries = new Map<string, CachedResponse>();
+  private readonly filePath: string | null;
+  private persistTimer: NodeJS.Timeout | null = null;
+  private stats = { misses: 0, notModified: 0, modified: 0, evictions: 0, invalidations: 0 };
+
+  constructor(private readonly maxEntries: number = 500, cacheDir?: string) {
+    this.filePath = cacheDir ? join(cacheDir, CACHE_FILE_NAME) : null;
+    this.load();
+  }
+
+  /**
+   * キャッシュキーを作成（メソッド + エンドポイント + Acceptヘッダー）
+   */
+  static key(method: string, endpoint: string, accept: string): string {
+    return `${method.toUpperCase()} ${endpoint} ${accept}`;
+  }
+
+  /**
+   * エントリを取得（取得したエントリは最新として扱う）
+   * 条件付きリクエストの結果は recordNotModified（304）と store（200）で数える
+   */
+  get(key: string): CachedResponse | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      this.stats.misses++;
+      return undefined;
+    }
+
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry;
+  }
+
+  /**
+   * 条件付きリクエスト用のヘッダーを作成
+   */
+  static conditionalHeaders(entry: CachedResponse | undefined): Record<string, string> {
+    const headers: Record<string, string> = {};
+    if (entry?.etag) {
+      headers['If-None-Match'] = entry.etag;
+    }
+    if (entry?.lastModified) {
+      headers['If-Modified-Since'] = entry.lastModified;
+    }
+    return headers;
+  }
+
+  /**
+   * レスポンスを保存（ETag も Last-Modified も無い場合は保存しない）
+   */
+  store(key: string, path: string, headers: Record<string, string>, body: unknown): void {
+    const etag = headers['etag'];
+    const lastModified = headers['last-modified'];
+    if (!etag && !lastModified) {
+      return;
+    }
+
+    if (this.entries.delete(key)) {
+      this.stats.modified++;
+    }
+    this.entries.set(key, { path: this.stripQuery(path), etag, lastModified, body, storedAt: Date.now() });
+
+    while (this.entries.size > this.maxEntries) {
+      const oldestKey = this.entries.keys().next().value as string;
+      this.entries.delete(oldestKey);
+      this.stats.evictions++;
+    }
+
+    this.schedulePersist();
+  }
+
+  /**
+   * 304 Not Modified によりキャッシュから応答したことを記録
+   */
+  recordNotModified(key: string): void {
+    this.stats.notModified++;
+    const entry = this.entries.get(key);
+    if (entry) {
+      entry.storedAt = Date.now();
+    }
+  }
+
+  /**
+   * 指定パスのエントリを削除（includeSubpaths が true の場合は配下のパスも削除）
+   */
+  invalidate(path: string, includeSubpaths: boolean = false): void {
+    const target = this.stripQuery(path);
+    let removed = 0;
+
+    for (const [key, entry] of this.entries) {
+      if (entry.path === target || (includeSubpaths && entry.path.startsWith(`${target}/`))) {
+        this.entries.delete(key);
+        removed++;
+      }
+    }
+
+    if (removed > 0) {
+      logger.debug(`Invalidated ${removed} cached response(s) for ${target}`);
+      this.stats.invalidations += removed;
+      this.schedulePersist();
+    }
+  }
+
+  /**
+   * キャッシュの統計情報を取得
+   */
+  getStats(): ResponseCacheStats {
+    return {
+      size: this.entries.size,
+      maxEntries: this.maxEntries,
+      ...this.stats,
+      persistent: this.filePath !== null,
+    };
+  }
+
+  private stripQuery(path: string): string {
+    const queryIndex = path.indexOf('?');
+    return queryIndex >= 0 ? path.slice(0, queryIndex) : path;
+  }
+
+  /**
+   * ディスクからキャッシュを読み込み（再起動後もキャッシュを利用するため）
+   */
+  private load(): void {
+    if (!this.filePath) {
+      return;
+    }
+
+    try {
+      const stored = JSON.parse(readFileSync(this.filePath, 'utf8')) as Array<[string, CachedResponse]>;
+      for (const [key, entry] of stored.slice(-this.maxEntries)) {
+        this.entries.set(key, entry);
+      }
+      logger.debug(`Loaded ${this.entries.size} cached responses from ${this.filePath}`);
+    } catch (error) {
+      if ((error as NodeJS.ErrnoException).code !== 'ENOENT') {
+        logger.warn(`Failed to load response cache from ${this.filePath}:`, error);
+      }
+    }
+  }
+
+  /**
+   * 書き込みをまとめるため、一定時間後にディスクへ保存
+   */
+  private schedulePersist(): void {
+    if (!this.filePath || this.persistTimer) {
+      return;
+    }
+
+    this.persistTimer = setTimeout(() => {
+      this.persistTimer = null;
+      this.persist().catch((error) => {
+        logger.warn(`Failed to persist response cache to ${this.filePath}:`, error);
+      });
+    }, PERSIST_DELAY_MS);
+    this.persistTimer.unref();
+  }
+
+  private async persist(): Promise<void> {
+    if (!this.filePath) {
+      return;
+    }
+
+    // プライベートリポジトリの PR 本文や diff を含むため、所有者のみ読み書きできるようにする
+    const tempPath = `${this.filePath}.${process.pid}.tmp`;
+    await mkdir(dirname(this.filePath), { recursive: true, mode: 0o700 });
+    await writeFile(tempPath, JSON.stringify([...this.entries]), { encoding: 'utf8', mode: 0o600 });
+    await rename(tempPath, this.filePath);
+  }
+}
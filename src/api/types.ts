@@ -42,6 +42,24 @@ export interface PullRequestReviewComment extends PullRequestComment {
   commit_id: string;
 }
 
+export type ReviewEvent = 'APPROVE' | 'REQUEST_CHANGES' | 'COMMENT';
+
+export type DiffSide = 'LEFT' | 'RIGHT';
+
+export interface ReviewCommentInput {
+  path: string;
+  body: string;
+  position?: number;
+  line?: number;
+  side?: DiffSide;
+}
+
+export interface PullRequestReview {
+  id: number;
+  state: string;
+  html_url: string;
+}
+
 export interface PullRequestFile {
   filename: string;
   status: string;
@@ -51,6 +69,109 @@ export interface PullRequestFile {
   patch?: string;
 }
 
+// GraphQL 関連の型
+export interface GraphQLError {
+  message: string;
+  type?: string;
+  path?: Array<string | number>;
+}
+
+export interface GraphQLResponse<T> {
+  data: T | null;
+  errors?: GraphQLError[];
+}
+
+export interface GraphQLConnection<T> {
+  totalCount: number;
+  pageInfo: {
+    hasNextPage: boolean;
+    endCursor: string | null;
+  };
+  nodes: T[];
+}
+
+export interface GraphQLComment {
+  author: { login: string } | null;
+  body: string;
+  createdAt: string;
+  url: string;
+}
+
+export interface PullRequestReviewThread {
+  path: string;
+  line: number | null;
+  isResolved: boolean;
+  isOutdated: boolean;
+  comments: {
+    totalCount: number;
+    nodes: GraphQLComment[];
+  };
+}
+
+export interface PullRequestOverviewFile {
+  path: string;
+  additions: number;
+  deletions: number;
+  changeType: string;
+}
+
+export interface PullRequestOverview {
+  number: number;
+  title: string;
+  body: string;
+  state: string;
+  isDraft: boolean;
+  url: string;
+  createdAt: string;
+  updatedAt: string;
+  author: { login: string } | null;
+  headRefName: string;
+  headRefOid: string;
+  baseRefName: string;
+  additions: number;
+  deletions: number;
+  changedFiles: number;
+  reviewDecision: string | null;
+  reviewRequests: {
+    nodes: Array<{ requestedReviewer: { login?: string; slug?: string } | null }>;
+  };
+  latestReviews: {
+    nodes: Array<{ author: { login: string } | null; state: string; submittedAt: string | null }>;
+  };
+  // 続きの取得時はカーソルを指定したコレクションのみ含まれる
+  files?: GraphQLConnection<PullRequestOverviewFile>;
+  comments?: GraphQLConnection<GraphQLComment>;
+  reviewThreads?: GraphQLConnection<PullRequestReviewThread>;
+}
+
+export interface PullRequestOverviewCursors {
+  files?: string;
+  comments?: string;
+  reviewThreads?: string;
+}
+
+export interface OpenPullRequestSummary {
+  number: number;
+  title: string;
+  url: string;
+  createdAt: string;
+  author: { login: string } | null;
+  headRefName: string;
+  baseRefName: string;
+  headRepositoryOwner: { login: string } | null;
+  reviewRequests: {
+    nodes: Array<{ requestedReviewer: { login?: string; slug?: string } | null }>;
+  };
+}
+
+export interface RepositoryPullRequests {
+  owner: string;
+  repo: string;
+  pullRequests: OpenPullRequestSummary[];
+  totalCount: number;
+  error?: string;
+}
+
 export interface FileChangeInfo {
   filename: string;
   status: string;
@@ -59,6 +180,8 @@ export interface FileChangeInfo {
   changes: number;
   patch?: string;
   positions: number[];
+  // コメント可能な行番号の範囲（RIGHT: 追加・コンテキスト行、LEFT: 削除行）
+  lineRanges?: { right: Array<[number, number]>; left: Array<[number, number]> };
 }
 
 export interface GitHubApiResponse<T = any> {
@@ -89,6 +212,8 @@ export interface RequestOptions {
   method?: string;
   headers?: Record<string, string>;
   body?: any;
+  // 副作用の無いリクエストとして 5xx で再試行してよいか（デフォルトは GET / HEAD のみ）
+  idempotent?: boolean;
 }
 
 export interface ApiClientConfig {
@@ -1,12 +1,97 @@
 // GitHub CLI 認証クライアント
 
 import { spawn } from 'child_process';
-import { AuthMethod } from '../api/types.js';
+import { PassThrough, Readable } from 'stream';
+import { AuthMethod, GitHubError } from '../api/types.js';
 import { GitHubAuthClient } from './github-auth.js';
 import { logger } from '../utils/logger.js';
+import { getApiBaseUrl } from '../utils/helpers.js';
+
+/**
+ * gh コマンドのエラー出力から HTTP ステータスを取り出してエラーを作成
+ * 例: "gh: Bad credentials (HTTP 401)"
+ */
+export function createCliError(message: string, stderr: string): Error & Partial<GitHubError> {
+  const error = new Error(`${message}: ${stderr}`) as Error & Partial<GitHubError>;
+  const match = stderr.match(/\(HTTP (\d{3})\)/);
+  if (match) {
+    error.status = parseInt(match[1], 10);
+  }
+  return error;
+}
+
+/**
+ * API のURLに対応する gh のホスト名を取得
+ * API 専用のホスト名（api.github.com、api.SUBDOMAIN.ghe.com）は gh のホスト名に変換する
+ */
+export function ghHostnameForApiUrl(apiUrl: string): string {
+  const host = new URL(apiUrl).host;
+  return host === 'api.github.com' ? 'github.com' : host.replace(/^api\.(?=[^.]+\.ghe\.com$)/, '');
+}
+
+/**
+ * gh に --hostname で渡すホスト名を決定（github.com の場合は null）
+ * GH_HOST が指定されていればそれを使い、無ければ GITHUB_API_URL のホストから導出する
+ * GitHub Actions は既定で GITHUB_API_URL=https://api.github.com を設定するため、github.com は渡さない
+ */
+export function resolveGhHostname(env: NodeJS.ProcessEnv = process.env): string | null {
+  const hostname = env.GH_HOST || (env.GITHUB_API_URL ? ghHostnameForApiUrl(env.GITHUB_API_URL) : '');
+  return hostname && hostname !== 'github.com' ? hostname : null;
+}
+
+/**
+ * HTTP 直接送信に使うトークンの取得先ホスト名を決定
+ * トークンは HTTP の送信先（getApiBaseUrl）のホストのものに限る
+ * gh の対象ホスト（GH_HOST）と GITHUB_API_URL のホストが異なる場合は null（gh api で送信する）
+ */
+export function resolveTokenHostname(env: NodeJS.ProcessEnv = process.env): string | null {
+  const apiHostname = ghHostnameForApiUrl(getApiBaseUrl(env));
+  return (resolveGhHostname(env) ?? 'github.com') === apiHostname ? apiHostname : null;
+}
+
+export interface CliApiResponse {
+  status: number;
+  headers: Record<string, string>;
+  body: unknown;
+}
+
+export interface CliStreamResponse {
+  status: number;
+  headers: Record<string, string>;
+  body: Readable;
+}
+
+/**
+ * GitHub CLI 認証時の API 送信方式
+ * - http: `gh auth token` で取得したトークンで直接 HTTP リクエストを送信（デフォルト）
+ * - subprocess: リクエストごとに `gh api` を起動
+ */
+export type CliTransport = 'http' | 'subprocess';
 
 export class CliClient implements GitHubAuthClient {
   readonly method = AuthMethod.CLI;
+  readonly transport: CliTransport;
+  private token: string | null = null;
+  private tokenUnavailable = false;
+  private tokenPromise: Promise<string | null> | null = null;
+
+  // github.com 以外のホストを使う場合のみ gh に渡すホスト名
+  private readonly hostname: string | null;
+  // `gh auth token` の取得先（HTTP の送信先と同じホスト）。gh の対象ホストと異なる場合は null
+  private readonly tokenHostname: string | null;
+
+  constructor(transport: CliTransport = process.env.GITHUB_CLI_TRANSPORT === 'subprocess' ? 'subprocess' : 'http') {
+    this.transport = transport;
+    this.hostname = resolveGhHostname();
+    this.tokenHostname = resolveTokenHostname();
+  }
+
+  /**
+   * github.com 以外のホスト（GH_HOST または GITHUB_API_URL）の場合は gh の対象ホストを合わせる
+   */
+  private withHostname(args: string[]): string[] {
+    return this.hostname ? [...args, '--hostname', this.hostname] : args;
+  }
 
   /**
    * GitHub CLI認証が有効かチェック
@@ -14,8 +99,14 @@ export class CliClient implements GitHubAuthClient {
   async isAuthenticated(): Promise<boolean> {
     try {
       logger.debug('Checking GitHub CLI authentication...');
+
+      // トークンが取得できれば認証済み（gh auth status の起動を省略）
+      if (await this.resolveToken()) {
+        logger.debug('GitHub CLI authentication is valid (token resolved)');
+        return true;
+      }
       
-      const result = await this.executeCommand(['auth', 'status']);
+      const result = await this.executeCommand(this.withHostname(['auth', 'status']));
       
       // `gh auth status` は認証済みの場合は exit code 0 を返す
       if (result.success) {
@@ -31,12 +122,53 @@ export class CliClient implements GitHubAuthClient {
     }
   }
 
+  /**
+   * HTTP 直接送信に使うトークンを取得（`gh auth token` は1回だけ実行）
+   * トークンは HTTP の送信先のホストを明示して取得する（gh の既定ホストが GitHub Enterprise の場合に
+   * そのトークンを api.github.com へ送らないため）
+   * subprocess モード、gh の対象ホストと送信先が異なる場合、またはトークンを取得できない場合は null を返す
+   */
+  async resolveToken(): Promise<string | null> {
+    if (this.transport !== 'http' || this.tokenUnavailable) {
+      return null;
+    }
+    if (this.token) {
+      return this.token;
+    }
+
+    if (this.tokenHostname === null) {
+      this.tokenUnavailable = true;
+      logger.warn(`GH_HOST (${process.env.GH_HOST}) does not match the GITHUB_API_URL host, falling back to gh subprocess transport`);
+      return null;
+    }
+
+    if (!this.tokenPromise) {
+      this.tokenPromise = this.executeCommand(['auth', 'token', '--hostname', this.tokenHostname]).then((result) => {
+        if (result.success && result.stdout) {
+          this.token = result.stdout;
+          logger.debug('Resolved GitHub CLI token, using HTTP transport');
+        } else {
+          this.tokenUnavailable = true;
+          logger.warn('Could not resolve token via `gh auth token`, falling back to gh subprocess transport');
+        }
+        return this.token;
+      }).finally(() => {
+        this.tokenPromise = null;
+      });
+    }
+
+    return await this.tokenPromise;
+  }
+
   /**
    * GitHub CLI認証ヘッダーを取得
-   * CLI認証の場合はヘッダーは不要（gh コマンド経由でアクセス）
+   * HTTP 送信方式の場合は `gh auth token` で取得したトークンを付与する
+   * subprocess 方式の場合は認証ヘッダーは不要（gh コマンド経由でアクセス）
    */
   async getAuthHeaders(): Promise<Record<string, string>> {
+    const token = await this.resolveToken();
     return {
+      ...(token ? { 'Authorization': `Bearer ${token}` } : {}),
       'Accept': 'application/vnd.github.v3+json',
       'Content-Type': 'application/json',
       'User-Agent': 'mcp-gh-pr-mini/1.0',
@@ -50,7 +182,7 @@ export class CliClient implements GitHubAuthClient {
   async getUserInfo(): Promise<{ login: string }> {
     logger.debug('Getting user info via GitHub CLI...');
     
-    const result = await this.executeCommand(['api', 'user']);
+    const result = await this.executeCommand(this.withHostname(['api', 'user']));
     
     if (!result.success) {
       throw new Error(`Failed to get user info via GitHub CLI: ${result.stderr}`);
@@ -76,19 +208,22 @@ export class CliClient implements GitHubAuthClient {
         stdio: ['pipe', 'pipe', 'pipe']
       });
 
-      let stdout = '';
-      let stderr = '';
+      // マルチバイト文字がチャンク境界で分割されないよう Buffer のまま収集
+      const stdoutChunks: Buffer[] = [];
+      const stderrChunks: Buffer[] = [];
 
-      process.stdout.on('data', (data) => {
-        stdout += data.toString();
+      process.stdout.on('data', (data: Buffer) => {
+        stdoutChunks.push(data);
       });
 
-      process.stderr.on('data', (data) => {
-        stderr += data.toString();
+      process.stderr.on('data', (data: Buffer) => {
+        stderrChunks.push(data);
       });
 
       process.on('close', (code) => {
         const success = code === 0;
+        const stdout = Buffer.concat(stdoutChunks).toString('utf8');
+        const stderr = Buffer.concat(stderrChunks).toString('utf8');
         
         if (!success) {
           logger.debug(`gh command failed with exit code ${code}: ${stderr}`);
@@ -112,11 +247,85 @@ export class CliClient implements GitHubAuthClient {
     });
   }
 
+  /**
+   * GitHub CLI コマンドを実行し、標準出力をストリームとして返す
+   * コマンドが失敗した場合はストリームがエラーで終了する。読み込みを途中でやめた場合はプロセスを終了する
+   */
+  streamCommand(args: string[]): Readable {
+    logger.debug(`Streaming gh command: gh ${args.join(' ')}`);
+
+    const process = spawn('gh', this.withHostname(args), {
+      stdio: ['ignore', 'pipe', 'pipe']
+    });
+    const output = new PassThrough();
+    const stderrChunks: Buffer[] = [];
+
+    process.stdout.pipe(output, { end: false });
+    process.stderr.on('data', (chunk: Buffer) => {
+      stderrChunks.push(chunk);
+    });
+
+    process.on('close', (code) => {
+      if (code === 0) {
+        output.end();
+      } else {
+        output.destroy(createCliError('GitHub CLI command failed', Buffer.concat(stderrChunks).toString('utf8').trim()));
+      }
+    });
+
+    process.on('error', (error) => {
+      output.destroy(new Error(`GitHub CLI process error: ${error.message}`));
+    });
+
+    output.on('close', () => {
+      if (process.exitCode === null) {
+        process.kill();
+      }
+    });
+
+    return output;
+  }
+
+  /**
+   * GitHub CLI で GET リクエストを実行し、本文をストリームのまま返す
+   * `--include` の出力からステータスとヘッダーを先に読み取るため、レート制限も HTTP 経由と同様に扱える
+   * 2xx 以外の場合も本文はストリームで返す（gh の非0終了によるエラーは本文の読み込み側で無視してよい）
+   */
+  async streamApiRequest(endpoint: string, headers: Record<string, string> = {}): Promise<CliStreamResponse> {
+    const args = ['api', endpoint, '--include'];
+    for (const [name, value] of Object.entries(headers)) {
+      args.push('--header', `${name}: ${value}`);
+    }
+
+    const stream = this.streamCommand(args);
+    const { head, rest } = await readResponseHead(stream);
+    const response = parseResponseHead(head);
+    if (!response) {
+      stream.destroy();
+      throw new Error('Failed to parse GitHub CLI response: missing status line');
+    }
+
+    if (rest.length > 0) {
+      stream.unshift(rest);
+    }
+    return { ...response, body: stream };
+  }
+
   /**
    * GitHub CLI で API リクエストを実行
+   * `--include` でステータスとヘッダーも取得し、条件付きリクエスト (304) にも対応する
    */
-  async apiRequest(method: string, endpoint: string, data?: any): Promise<any> {
-    const args = ['api', endpoint, '--method', method.toUpperCase()];
+  async apiRequest(
+    method: string,
+    endpoint: string,
+    data?: any,
+    headers: Record<string, string> = {}
+  ): Promise<CliApiResponse> {
+    const args = this.withHostname(['api', endpoint, '--method', method.toUpperCase(), '--include']);
+
+    for (const [name, value] of Object.entries(headers)) {
+      args.push('--header', `${name}: ${value}`);
+    }
     
     if (data) {
       args.push('--input', '-');
@@ -129,27 +338,36 @@ export class CliClient implements GitHubAuthClient {
         stdio: ['pipe', 'pipe', 'pipe']
       });
 
-      let stdout = '';
-      let stderr = '';
+      const stdoutChunks: Buffer[] = [];
+      const stderrChunks: Buffer[] = [];
 
-      process.stdout.on('data', (chunk) => {
-        stdout += chunk.toString();
+      process.stdout.on('data', (chunk: Buffer) => {
+        stdoutChunks.push(chunk);
       });
 
-      process.stderr.on('data', (chunk) => {
-        stderr += chunk.toString();
+      process.stderr.on('data', (chunk: Buffer) => {
+        stderrChunks.push(chunk);
       });
 
       process.on('close', (code) => {
-        if (code === 0) {
-          try {
-            const result = stdout ? JSON.parse(stdout) : null;
-            resolve(result);
-          } catch (error) {
-            reject(new Error(`Failed to parse GitHub CLI response: ${error}`));
-          }
+        const stdout = Buffer.concat(stdoutChunks).toString('utf8');
+        const stderr = Buffer.concat(stderrChunks).toString('utf8');
+
+        // 4xx/304 でも gh は非0で終了するため、ステータス行が取れればレスポンスとして扱う
+        let response: CliApiResponse | null;
+        try {
+          response = parseIncludedResponse(stdout);
+        } catch (error) {
+          reject(new Error(`Failed to parse GitHub CLI response: ${error}`));
+          return;
+        }
+
+        if (response) {
+          resolve(response);
+        } else if (code === 0) {
+          resolve({ status: 200, headers: {}, body: null });
         } else {
-          reject(new Error(`GitHub CLI API request failed: ${stderr}`));
+          reject(createCliError('GitHub CLI API request failed', stderr));
         }
       });
 
@@ -160,8 +378,87 @@ export class CliClient implements GitHubAuthClient {
       // データがある場合は stdin に送信
       if (data) {
         process.stdin.write(JSON.stringify(data));
-        process.stdin.end();
       }
+      process.stdin.end();
     });
   }
-}
\ No newline at end of file
+}
+
+/**
+ * `gh api --include` の出力をステータス・ヘッダー・本文に分解
+ * ステータス行が無い場合は null を返す
+ */
+function parseIncludedResponse(output: string): CliApiResponse | null {
+  const separator = output.match(/\r?\n\r?\n/);
+  const headEnd = separator?.index ?? output.length;
+  const response = parseResponseHead(output.slice(0, headEnd));
+  if (!response) {
+    return null;
+  }
+
+  const bodyText = separator ? output.slice(headEnd + separator[0].length) : '';
+  let body: unknown = null;
+  if (bodyText.trim() !== '') {
+    body = (response.headers['content-type'] || '').includes('json') ? JSON.parse(bodyText) : bodyText;
+  }
+
+  return { ...response, body };
+}
+
+/**
+ * ステータス行とヘッダー行を解析（ステータス行が無い場合は null）
+ */
+function parseResponseHead(head: string): { status: number; headers: Record<string, string> } | null {
+  const statusMatch = head.match(/^HTTP\/[\d.]+ (\d{3})/);
+  if (!statusMatch) {
+    return null;
+  }
+
+  const headers: Record<string, string> = {};
+  for (const line of head.split(/\r?\n/).slice(1)) {
+    const colon = line.indexOf(':');
+    if (colon > 0) {
+      headers[line.slice(0, colon).trim().toLowerCase()] = line.slice(colon + 1).trim();
+    }
+  }
+
+  return { status: parseInt(statusMatch[1], 10), headers };
+}
+
+/**
+ * ストリームの先頭からヘッダー部（空行まで）を読み取る
+ * 空行以降に読み込んだ分は rest として返し、ストリームは一時停止した状態で残す
+ */
+function readResponseHead(stream: Readable): Promise<{ head: string; rest: Buffer }> {
+  return new Promise((resolve, reject) => {
+    let buffered = Buffer.alloc(0);
+
+    // error リスナーは残し、読み込み側が読み始める前に gh が非0終了しても例外にしない
+    const finish = (head: string, rest: Buffer) => {
+      stream.off('data', onData);
+      stream.off('end', onEnd);
+      stream.pause();
+      resolve({ head, rest });
+    };
+    const onData = (chunk: Buffer) => {
+      buffered = Buffer.concat([buffered, chunk]);
+      const crlf = buffered.indexOf('\r\n\r\n');
+      const lf = buffered.indexOf('\n\n');
+      if (crlf >= 0 && (lf < 0 || crlf < lf)) {
+        finish(buffered.subarray(0, crlf).toString('utf8'), buffered.subarray(crlf + 4));
+      } else if (lf >= 0) {
+        finish(buffered.subarray(0, lf).toString('utf8'), buffered.subarray(lf + 2));
+      }
+    };
+    const onEnd = () => finish(buffered.toString('utf8'), Buffer.alloc(0));
+    const onError = (error: Error) => {
+      stream.off('data', onData);
+      stream.off('end', onEnd);
+      reject(error);
+    };
+
+    stream.on('data', onData);
+    stream.once('end', onEnd);
+    stream.once('error', onError);
+  });
+}
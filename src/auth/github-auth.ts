@@ -15,12 +15,22 @@ export interface GitHubAuthClient {
 export class GitHubAuth {
   private client: GitHubAuthClient | null = null;
   private config: AuthConfig | null = null;
+  private userInfo: { login: string } | null = null;
+  // 認証セッションの状態（検証時刻と世代番号）
+  private validatedAt: number | null = null;
+  private generation = 0;
+  private initPromise: Promise<void> | null = null;
+  private readonly sessionTtlMs: number;
 
   constructor() {
     // 環境変数からログレベルを設定
     if (process.env.DEBUG === 'true') {
       logger.setLevel(0); // DEBUG
     }
+
+    // セッションの有効期限（秒）。未設定または0の場合は401/403を受けるまで再検証しない
+    const ttlSeconds = parseInt(process.env.GITHUB_AUTH_TTL_SECONDS || '0', 10);
+    this.sessionTtlMs = Number.isFinite(ttlSeconds) && ttlSeconds > 0 ? ttlSeconds * 1000 : 0;
   }
 
   /**
@@ -37,8 +47,7 @@ export class GitHubAuth {
         
         if (await patClient.isAuthenticated()) {
           logger.info('PAT authentication successful');
-          this.client = patClient;
-          this.config = { method: AuthMethod.PAT, token: process.env.GITHUB_PERSONAL_ACCESS_TOKEN };
+          this.startSession(patClient, { method: AuthMethod.PAT, token: process.env.GITHUB_PERSONAL_ACCESS_TOKEN });
           return;
         } else {
           logger.warn('PAT authentication failed, token may be invalid');
@@ -51,8 +60,7 @@ export class GitHubAuth {
       
       if (await cliClient.isAuthenticated()) {
         logger.info('GitHub CLI authentication successful');
-        this.client = cliClient;
-        this.config = { method: AuthMethod.CLI };
+        this.startSession(cliClient, { method: AuthMethod.CLI });
         return;
       } else {
         logger.warn('GitHub CLI authentication failed or not configured');
@@ -66,6 +74,66 @@ export class GitHubAuth {
     }
   }
 
+  /**
+   * 検証済みの認証クライアントでセッションを開始
+   */
+  private startSession(client: GitHubAuthClient, config: AuthConfig): void {
+    this.client = client;
+    this.config = config;
+    this.userInfo = null;
+    this.validatedAt = Date.now();
+    this.generation++;
+  }
+
+  /**
+   * 有効な認証セッションを確保
+   * 検証済みで有効期限内なら何もしない。同時呼び出し時は初期化を1回にまとめる
+   */
+  async ensureSession(): Promise<void> {
+    if (this.hasValidSession()) {
+      return;
+    }
+
+    if (!this.initPromise) {
+      this.initPromise = this.initialize().finally(() => {
+        this.initPromise = null;
+      });
+    }
+    await this.initPromise;
+  }
+
+  /**
+   * 検証済みかつ有効期限内のセッションがあるか
+   */
+  hasValidSession(): boolean {
+    if (!this.client || this.validatedAt === null) {
+      return false;
+    }
+    if (this.sessionTtlMs > 0 && Date.now() - this.validatedAt >= this.sessionTtlMs) {
+      return false;
+    }
+    return true;
+  }
+
+  /**
+   * 現在のセッションの世代番号を取得
+   */
+  getSessionGeneration(): number {
+    return this.generation;
+  }
+
+  /**
+   * セッションを無効化し、次回のリクエストで再検証させる
+   * 世代番号を指定した場合、既に再検証済みのセッションは無効化しない
+   */
+  invalidateSession(generation?: number): void {
+    if (generation !== undefined && generation !== this.generation) {
+      return;
+    }
+    logger.debug('GitHub authentication session invalidated');
+    this.validatedAt = null;
+  }
+
   /**
    * 現在の認証クライアントを取得
    */
@@ -108,8 +176,12 @@ export class GitHubAuth {
    * 認証済みユーザー情報を取得
    */
   async getUserInfo(): Promise<{ login: string }> {
+    if (this.userInfo) {
+      return this.userInfo;
+    }
     const client = this.getClient();
-    return await client.getUserInfo();
+    this.userInfo = await client.getUserInfo();
+    return this.userInfo;
   }
 }
 
@@ -3,10 +3,12 @@
 import { AuthMethod } from '../api/types.js';
 import { GitHubAuthClient } from './github-auth.js';
 import { logger } from '../utils/logger.js';
+import { getApiBaseUrl } from '../utils/helpers.js';
 
 export class PatClient implements GitHubAuthClient {
   readonly method = AuthMethod.PAT;
   private token: string;
+  private login: string | null = null;
 
   constructor(token: string) {
     this.token = token;
@@ -19,13 +21,14 @@ export class PatClient implements GitHubAuthClient {
     try {
       logger.debug('Checking PAT authentication...');
       
-      const response = await fetch('https://api.github.com/user', {
+      const response = await fetch(`${getApiBaseUrl()}/user`, {
         headers: await this.getAuthHeaders()
       });
 
       if (response.ok) {
         const user = await response.json();
         logger.debug(`PAT authentication valid for user: ${user.login}`);
+        this.login = user.login;
         return true;
       } else {
         logger.debug(`PAT authentication failed with status: ${response.status}`);
@@ -54,9 +57,14 @@ export class PatClient implements GitHubAuthClient {
    * 認証済みユーザー情報を取得
    */
   async getUserInfo(): Promise<{ login: string }> {
+    // 認証チェック時に取得済みであれば再利用
+    if (this.login) {
+      return { login: this.login };
+    }
+
     logger.debug('Getting user info via PAT...');
     
-    const response = await fetch('https://api.github.com/user', {
+    const response = await fetch(`${getApiBaseUrl()}/user`, {
       headers: await this.getAuthHeaders()
     });
 
@@ -66,6 +74,7 @@ export class PatClient implements GitHubAuthClient {
 
     const user = await response.json();
     logger.debug(`Retrieved user info: ${user.login}`);
+    this.login = user.login;
     
     return { login: user.login };
   }
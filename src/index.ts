@@ -5,9 +5,11 @@ import { z } from "zod";
 
 // 新しい認証・API・ツールシステムのインポート
 import { githubAuth } from './auth/github-auth.js';
+import { githubApi } from './api/github-api.js';
 import { prTools } from './tools/pr-tools.js';
 import { commentTools } from './tools/comment-tools.js';
 import { logger } from './utils/logger.js';
+import { metrics } from './utils/metrics.js';
 
 // Create server instance
 const server = new McpServer({
@@ -19,19 +21,58 @@ const server = new McpServer({
   },
 });
 
-// Initialize GitHub authentication on server startup
+// Initialize GitHub authentication in the background after the transport is connected
 async function initializeAuth() {
   try {
-    await githubAuth.initialize();
+    await githubAuth.ensureSession();
     const config = githubAuth.getConfig();
-    const user = await githubAuth.getUserInfo();
-    logger.info(`GitHub authentication initialized using ${config.method.toUpperCase()} for user: ${user.login}`);
+    logger.info(`GitHub authentication initialized using ${config.method.toUpperCase()}`);
   } catch (error) {
-    logger.error('Failed to initialize GitHub authentication:', error);
-    throw error;
+    logger.error('Failed to initialize GitHub authentication (will retry on the next tool call):', error);
   }
 }
 
+// Register MCP Resources
+server.resource(
+  "api-status",
+  "github://api/status",
+  {
+    description: "Live GitHub API status: rate limit quota, request queue depth, wait reason, response cache and diff index cache statistics",
+    mimeType: "application/json"
+  },
+  async (uri) => ({
+    contents: [
+      {
+        uri: uri.href,
+        mimeType: "application/json",
+        text: JSON.stringify({
+          scheduler: githubApi.getSchedulerStatus(),
+          cache: githubApi.getCacheStats(),
+          diffIndex: githubApi.diffIndexes.getStats(),
+        }, null, 2),
+      },
+    ],
+  })
+);
+
+server.resource(
+  "metrics",
+  "github://server/metrics",
+  {
+    description: "Server metrics: per-tool and per-route latency spans (count, errors, p50/p99), upstream request and byte counters, memory usage",
+    mimeType: "application/json"
+  },
+  async (uri) => ({
+    contents: [
+      {
+        uri: uri.href,
+        mimeType: "application/json",
+        text: JSON.stringify(metrics.snapshot(), null, 2),
+      },
+    ],
+  })
+);
+
 // Register MCP Tools
 server.tool(
   "create_pull_request",
@@ -80,6 +121,35 @@ server.tool(
   }
 );
 
+server.tool(
+  "list_open_pull_requests_across_repos",
+  "List open pull requests in many GitHub repositories with a single GraphQL query",
+  {
+    repositories: z.array(z.string()).describe("Repositories in \"owner/repo\" form"),
+    limit: z.number().optional().describe("Maximum number of PRs to return per repository (default: 10)")
+  },
+  async (params) => {
+    return await prTools.listOpenPullRequestsAcrossRepos(params);
+  }
+);
+
+server.tool(
+  "get_pull_request_overview",
+  "Get a GitHub pull request's metadata, changed files, comments, review threads and reviewers in a single GraphQL request",
+  {
+    owner: z.string().describe("Repository owner (username or organization)"),
+    repo: z.string().describe("Repository name"),
+    pr_number: z.number().describe("Pull request number"),
+    files_cursor: z.string().optional().describe("Continue the file list from this cursor (returned when more files are available)"),
+    comments_cursor: z.string().optional().describe("Continue the conversation comments from this cursor"),
+    threads_cursor: z.string().optional().describe("Continue the review threads from this cursor"),
+    page_size: z.number().optional().describe("Number of files, comments and review threads per page (default: 50, max: 100)")
+  },
+  async (params) => {
+    return await prTools.getPullRequestOverview(params);
+  }
+);
+
 server.tool(
   "get_pull_request",
   "Get details of a specific GitHub pull request including title and description",
@@ -95,11 +165,17 @@ server.tool(
 
 server.tool(
   "get_pull_request_diff",
-  "Get the diff for a GitHub pull request",
+  "Get the diff for a GitHub pull request, paged by file. Use summary_only first on large pull requests",
   {
     owner: z.string().describe("Repository owner (username or organization)"),
     repo: z.string().describe("Repository name"),
-    pr_number: z.number().describe("Pull request number")
+    pr_number: z.number().describe("Pull request number"),
+    include: z.array(z.string()).optional().describe("Only include files matching these globs (e.g. \"src/**\", \"*.ts\")"),
+    exclude: z.array(z.string()).optional().describe("Exclude files matching these globs (e.g. \"*.lock\", \"dist/**\")"),
+    offset: z.number().optional().describe("Number of matching files to skip (default: 0)"),
+    limit: z.number().optional().describe("Maximum number of files to return (default: 50)"),
+    max_bytes_per_file: z.number().optional().describe("Truncate each file's diff after this many bytes (default: 20000)"),
+    summary_only: z.boolean().optional().describe("Return only the list of changed files with line counts and sizes")
   },
   async (params) => {
     return await prTools.getPullRequestDiff(params);
@@ -136,20 +212,44 @@ server.tool(
 
 server.tool(
   "add_review_comment",
-  "Add a review comment to a specific line in a GitHub pull request",
+  "Add a review comment to a specific line in a GitHub pull request. Specify either position or line; the target is validated against the PR diff before posting",
   {
     owner: z.string().describe("Repository owner (username or organization)"),
     repo: z.string().describe("Repository name"),
     pr_number: z.number().describe("Pull request number"),
     body: z.string().describe("Comment content"),
     path: z.string().describe("The relative path to the file to comment on"),
-    position: z.number().describe("The position in the diff where you want to add a comment")
+    position: z.number().optional().describe("The position in the diff where you want to add a comment (as returned by get_pr_changes_for_commenting)"),
+    line: z.number().optional().describe("The line number in the file to comment on (alternative to position)"),
+    side: z.enum(["LEFT", "RIGHT"]).optional().describe("Side of the diff for line: LEFT (deletions) or RIGHT (additions/context, default)")
   },
   async (params) => {
     return await commentTools.addReviewComment(params);
   }
 );
 
+server.tool(
+  "submit_pr_review",
+  "Submit many line comments as a single review on a GitHub pull request. Positions and lines are validated against the PR diff before posting",
+  {
+    owner: z.string().describe("Repository owner (username or organization)"),
+    repo: z.string().describe("Repository name"),
+    pr_number: z.number().describe("Pull request number"),
+    comments: z.array(z.object({
+      path: z.string().describe("The relative path to the file to comment on"),
+      body: z.string().describe("Comment content"),
+      position: z.number().optional().describe("The position in the diff (as returned by get_pr_changes_for_commenting)"),
+      line: z.number().optional().describe("The line number in the file to comment on (alternative to position)"),
+      side: z.enum(["LEFT", "RIGHT"]).optional().describe("Side of the diff for line: LEFT (deletions) or RIGHT (additions/context, default)")
+    })).describe("Review comments; each needs either position or line"),
+    body: z.string().optional().describe("Overall review comment (required for REQUEST_CHANGES)"),
+    event: z.enum(["APPROVE", "REQUEST_CHANGES", "COMMENT"]).optional().describe("Review action (default: COMMENT)")
+  },
+  async (params) => {
+    return await commentTools.submitReview(params);
+  }
+);
+
 server.tool(
   "get_pr_comments",
   "Get comments from a GitHub pull request",
@@ -178,13 +278,13 @@ server.tool(
 
 async function main() {
   try {
-    // Initialize authentication before starting the server
-    await initializeAuth();
-    
     const transport = new StdioServerTransport();
     await server.connect(transport);
     
     logger.info("GitHub MCP Server running on stdio with dual authentication support (PAT + GitHub CLI)");
+
+    // Tool calls made before this finishes wait on the same in-flight session
+    void initializeAuth();
   } catch (error) {
     logger.error("Fatal error in main():", error);
     process.exit(1);
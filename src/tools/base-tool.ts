@@ -1,7 +1,8 @@
 // 共通ツール基底クラス
 
 import { githubApi } from '../api/github-api.js';
-import { logger } from '../utils/logger.js';
+import { logger, LogLevel } from '../utils/logger.js';
+import { metrics } from '../utils/metrics.js';
 import { createErrorMessage } from '../utils/helpers.js';
 
 export interface ToolResult {
@@ -51,17 +52,25 @@ export abstract class BaseTool {
 
   /**
    * 操作を安全に実行してレスポンスを返す
+   * 所要時間は操作名ごとのスパンとして記録する
    */
   protected async executeOperation<T>(
     operation: string,
     fn: () => Promise<T>
   ): Promise<ToolResult> {
+    const endSpan = metrics.startSpan(`tool ${operation}`);
+    metrics.increment('tool.calls');
+
     try {
-      logger.info(`Executing ${operation}...`);
+      logger.event('tool.start', { operation }, LogLevel.DEBUG);
       const result = await fn();
-      logger.info(`${operation} completed successfully`);
+      const durationMs = endSpan();
+      logger.event('tool.end', { operation, ok: true, durationMs: Math.round(durationMs) });
       return result as ToolResult;
     } catch (error) {
+      const durationMs = endSpan(true);
+      metrics.increment('tool.errors');
+      logger.event('tool.end', { operation, ok: false, durationMs: Math.round(durationMs) }, LogLevel.WARN);
       return this.createErrorResponse(operation, error);
     }
   }
@@ -2,7 +2,16 @@
 
 import { BaseTool, ToolResult } from './base-tool.js';
 import { formatComments, AI_COMMENT_IDENTIFIER } from '../utils/helpers.js';
-import { PullRequest, PullRequestComment, PullRequestReviewComment } from '../api/types.js';
+import { DiffIndex } from '../utils/diff-index.js';
+import {
+  PullRequest,
+  PullRequestComment,
+  PullRequestReviewComment,
+  PullRequestReview,
+  ReviewCommentInput,
+  ReviewEvent,
+  DiffSide
+} from '../api/types.js';
 
 export class CommentTools extends BaseTool {
   /**
@@ -30,6 +39,7 @@ export class CommentTools extends BaseTool {
 
   /**
    * プルリクエストにレビューコメントを追加
+   * 位置または行番号はPRの差分インデックスでローカルに検証し、無効な場合は投稿しない
    */
   async addReviewComment(params: {
     owner: string;
@@ -37,7 +47,9 @@ export class CommentTools extends BaseTool {
     pr_number: number;
     body: string;
     path: string;
-    position: number;
+    position?: number;
+    line?: number;
+    side?: DiffSide;
   }): Promise<ToolResult> {
     return await this.executeOperation('add review comment to PR', async () => {
       // PRの詳細を取得してcommit_idを取得
@@ -48,7 +60,17 @@ export class CommentTools extends BaseTool {
       ) as PullRequest;
       
       const commit_id = prData.head.sha;
+      const indexes = await this.api.getDiffIndexes(params.owner, params.repo, params.pr_number, commit_id);
+      const reason = this.validateTarget(indexes, params);
+      if (reason) {
+        return this.createSuccessResponse(
+          `Review comment not added to PR #${params.pr_number}: ${reason}\nUse get_pr_changes_for_commenting to find valid positions and lines.`
+        );
+      }
 
+      const target = params.line !== undefined
+        ? { line: params.line, side: params.side || 'RIGHT' as DiffSide }
+        : { position: params.position };
       const commentData = await this.api.addReviewComment(
         params.owner,
         params.repo,
@@ -57,16 +79,137 @@ export class CommentTools extends BaseTool {
           body: AI_COMMENT_IDENTIFIER + params.body,
           commit_id,
           path: params.path,
-          position: params.position
+          ...target
         }
       ) as PullRequestReviewComment;
 
       return this.createSuccessResponse(
-        `Review comment added successfully to PR #${params.pr_number}\nFile: ${params.path} (position ${params.position})\nComment URL: ${commentData.html_url}`
+        `Review comment added successfully to PR #${params.pr_number}\nFile: ${params.path} (${this.describeResolvedTarget(indexes, params)})\nComment URL: ${commentData.html_url}`
       );
     });
   }
 
+  /**
+   * 複数の行コメントを1つのレビューとしてまとめて投稿
+   * 各コメントの位置はPRのファイル差分に対してローカルで検証し、無効なものは投稿前に除外する
+   */
+  async submitReview(params: {
+    owner: string;
+    repo: string;
+    pr_number: number;
+    comments: ReviewCommentInput[];
+    body?: string;
+    event?: ReviewEvent;
+  }): Promise<ToolResult> {
+    return await this.executeOperation('submit PR review', async () => {
+      const event = params.event || 'COMMENT';
+
+      // GitHub は本文のない REQUEST_CHANGES を 422 で拒否するため、送信前に検出する
+      if (event === 'REQUEST_CHANGES' && !params.body) {
+        throw new Error('a review body is required when requesting changes');
+      }
+
+      // head SHA を取得し、その SHA の差分インデックスで検証（構築済みなら再取得しない）
+      const prData = await this.api.getPullRequest(params.owner, params.repo, params.pr_number) as PullRequest;
+      const indexes = await this.api.getDiffIndexes(params.owner, params.repo, params.pr_number, prData.head.sha);
+
+      const accepted: ReviewCommentInput[] = [];
+      const posted: string[] = [];
+      const rejected: string[] = [];
+
+      params.comments.forEach((comment, index) => {
+        const reason = this.validateTarget(indexes, comment);
+        if (reason) {
+          rejected.push(`#${index + 1} ${comment.path} ${this.describeTarget(comment)}: ${reason}`);
+          return;
+        }
+
+        posted.push(`#${index + 1} ${comment.path} ${this.describeResolvedTarget(indexes, comment)}`);
+
+        accepted.push(comment.line !== undefined
+          ? { path: comment.path, body: AI_COMMENT_IDENTIFIER + comment.body, line: comment.line, side: comment.side || 'RIGHT' }
+          : { path: comment.path, body: AI_COMMENT_IDENTIFIER + comment.body, position: comment.position });
+      });
+
+      const rejectedSection = rejected.length > 0
+        ? `\n\nRejected comments (${rejected.length}):\n${rejected.map(line => `- ${line}`).join('\n')}`
+        : '';
+
+      // APPROVE / REQUEST_CHANGES はコメントが無くても有効なレビューとして送信する
+      if (event === 'COMMENT' && accepted.length === 0 && !params.body) {
+        return this.createSuccessResponse(
+          `No review submitted to PR #${params.pr_number}: no valid comments and no review body.${rejectedSection}`
+        );
+      }
+
+      const review = await this.api.createReview(params.owner, params.repo, params.pr_number, {
+        commit_id: prData.head.sha,
+        event,
+        body: params.body !== undefined ? AI_COMMENT_IDENTIFIER + params.body : undefined,
+        comments: accepted
+      }) as PullRequestReview;
+
+      const postedSection = posted.length > 0
+        ? `\n${posted.map(line => `- ${line}`).join('\n')}`
+        : '';
+
+      return this.createSuccessResponse(
+        `Review submitted successfully to PR #${params.pr_number} (${event})\nReview URL: ${review.html_url}\nPosted comments: ${accepted.length}${postedSection}${rejectedSection}`
+      );
+    });
+  }
+
+  /**
+   * コメント対象のファイル・位置・行番号を差分インデックスで検証
+   * 有効な場合は null、無効な場合は理由を返す
+   */
+  private validateTarget(
+    indexes: Map<string, DiffIndex>,
+    target: { path: string; position?: number; line?: number; side?: DiffSide }
+  ): string | null {
+    const index = indexes.get(target.path);
+    if (!index) {
+      return 'file is not changed in this pull request';
+    }
+    if (target.position !== undefined && target.line !== undefined) {
+      return 'specify either position or line, not both';
+    }
+    return index.validate(target);
+  }
+
+  /**
+   * 検証済みのコメント対象を、位置と行番号の両方がわかる形に整形
+   * 例: "position 7 → line 12 (RIGHT)"、"line 12 (RIGHT) → position 7"
+   */
+  private describeResolvedTarget(
+    indexes: Map<string, DiffIndex>,
+    target: { path: string; position?: number; line?: number; side?: DiffSide }
+  ): string {
+    const index = indexes.get(target.path);
+    if (!index) {
+      return this.describeTarget(target);
+    }
+
+    if (target.line !== undefined) {
+      const position = index.positionForLine(target.line, target.side || 'RIGHT');
+      return `${this.describeTarget(target)} → position ${position}`;
+    }
+
+    const resolved = index.lineForPosition(target.position as number);
+    return resolved
+      ? `${this.describeTarget(target)} → line ${resolved.line} (${resolved.side})`
+      : this.describeTarget(target);
+  }
+
+  /**
+   * コメント対象の位置または行番号を表示用に整形
+   */
+  private describeTarget(target: { position?: number; line?: number; side?: DiffSide }): string {
+    return target.line !== undefined
+      ? `line ${target.line} (${target.side || 'RIGHT'})`
+      : `position ${target.position}`;
+  }
+
   /**
    * プルリクエストのコメントを取得
    */
@@ -1,8 +1,22 @@
 // プルリクエスト関連ツール
 
 import { BaseTool, ToolResult } from './base-tool.js';
-import { formatPullRequestList, formatFileChanges, enrichFileChanges } from '../utils/helpers.js';
-import { PullRequest, PullRequestFile } from '../api/types.js';
+import {
+  formatPullRequestList,
+  formatFileChangePages,
+  formatPullRequestOverview,
+  formatRepositoryPullRequests,
+  matchesAnyGlob
+} from '../utils/helpers.js';
+import { splitDiffByFile, formatDiffSegment } from '../utils/diff-stream.js';
+import { DiffIndex, DiffIndexCache } from '../utils/diff-index.js';
+import { PullRequest } from '../api/types.js';
+
+// get_pull_request_diff のデフォルト（1回の応答サイズを抑えるため）
+const DEFAULT_DIFF_FILE_LIMIT = 50;
+const DEFAULT_DIFF_BYTES_PER_FILE = 20000;
+// 1回の GraphQL クエリで問い合わせるリポジトリ数の上限（超える場合はクエリを分割）
+const MAX_REPOSITORIES_PER_QUERY = 20;
 
 export class PullRequestTools extends BaseTool {
   /**
@@ -91,6 +105,77 @@ export class PullRequestTools extends BaseTool {
     });
   }
 
+  /**
+   * 複数リポジトリのオープンなプルリクエスト一覧を取得
+   * リポジトリごとに REST API を呼ぶ代わりに、GraphQL のエイリアスでまとめて問い合わせる
+   */
+  async listOpenPullRequestsAcrossRepos(params: {
+    repositories: string[];
+    limit?: number;
+  }): Promise<ToolResult> {
+    return await this.executeOperation('list open pull requests across repositories', async () => {
+      const repositories: Array<{ owner: string; repo: string }> = [];
+      const invalid: string[] = [];
+      for (const name of params.repositories) {
+        const match = name.trim().match(/^([^/\s]+)\/([^/\s]+)$/);
+        if (match) {
+          repositories.push({ owner: match[1], repo: match[2] });
+        } else {
+          invalid.push(name);
+        }
+      }
+
+      if (invalid.length > 0) {
+        return this.createSuccessResponse(
+          `Invalid repository names (expected "owner/repo"): ${invalid.join(', ')}`
+        );
+      }
+      if (repositories.length === 0) {
+        return this.createSuccessResponse('No repositories specified.');
+      }
+
+      const chunks: Array<Array<{ owner: string; repo: string }>> = [];
+      for (let i = 0; i < repositories.length; i += MAX_REPOSITORIES_PER_QUERY) {
+        chunks.push(repositories.slice(i, i + MAX_REPOSITORIES_PER_QUERY));
+      }
+      const results = await Promise.all(
+        chunks.map(chunk => this.api.listOpenPullRequestsForRepositories(chunk, params.limit || 10))
+      );
+
+      return this.createSuccessResponse(formatRepositoryPullRequests(results.flat()));
+    });
+  }
+
+  /**
+   * プルリクエストの概要（メタデータ・ファイル・コメント・レビュースレッド・レビュアー）を取得
+   * GraphQL の1回のクエリで取得し、件数の多いコレクションはカーソルで続きを取得する
+   */
+  async getPullRequestOverview(params: {
+    owner: string;
+    repo: string;
+    pr_number: number;
+    files_cursor?: string;
+    comments_cursor?: string;
+    threads_cursor?: string;
+    page_size?: number;
+  }): Promise<ToolResult> {
+    return await this.executeOperation('get pull request overview', async () => {
+      const overview = await this.api.getPullRequestOverview(
+        params.owner,
+        params.repo,
+        params.pr_number,
+        {
+          files: params.files_cursor,
+          comments: params.comments_cursor,
+          reviewThreads: params.threads_cursor
+        },
+        params.page_size
+      );
+
+      return this.createSuccessResponse(formatPullRequestOverview(overview, params.owner, params.repo));
+    });
+  }
+
   /**
    * プルリクエストの詳細情報を取得
    */
@@ -127,32 +212,107 @@ export class PullRequestTools extends BaseTool {
 
   /**
    * プルリクエストのdiffを取得
+   * diffはストリームとして読み込み、ファイル単位でフィルタ・ページング・切り捨てを行う
    */
   async getPullRequestDiff(params: {
     owner: string;
     repo: string;
     pr_number: number;
+    include?: string[];
+    exclude?: string[];
+    offset?: number;
+    limit?: number;
+    max_bytes_per_file?: number;
+    summary_only?: boolean;
   }): Promise<ToolResult> {
     return await this.executeOperation('get pull request diff', async () => {
-      const diffText = await this.api.getPullRequestDiff(
-        params.owner, 
-        params.repo, 
-        params.pr_number
-      );
+      const offset = Math.max(params.offset ?? 0, 0);
+      const limit = Math.max(params.limit ?? DEFAULT_DIFF_FILE_LIMIT, 1);
+      const maxBytesPerFile = Math.max(params.max_bytes_per_file ?? DEFAULT_DIFF_BYTES_PER_FILE, 1);
+      const summaryOnly = params.summary_only ?? false;
+
+      // diffのストリームとPRのメタデータを並行して取得
+      const [diffResult, prResult] = await Promise.allSettled([
+        this.api.streamPullRequestDiff(params.owner, params.repo, params.pr_number),
+        this.api.getPullRequest(params.owner, params.repo, params.pr_number) as Promise<PullRequest>
+      ]);
+      if (prResult.status === 'rejected') {
+        // 開いたストリームを閉じて接続を解放
+        if (diffResult.status === 'fulfilled') {
+          diffResult.value.destroy();
+        }
+        throw prResult.reason;
+      }
+      if (diffResult.status === 'rejected') {
+        throw diffResult.reason;
+      }
+      const diffStream = diffResult.value;
+      const prData = prResult.value;
+
+      const matches = (path: string) =>
+        (!params.include?.length || matchesAnyGlob(path, params.include)) &&
+        !(params.exclude?.length && matchesAnyGlob(path, params.exclude));
 
-      if (!diffText || diffText.trim() === "") {
+      // 一致したファイルのうち offset から limit 件だけ本文を保持する
+      let matchedCount = 0;
+      const select = (path: string) => {
+        if (summaryOnly || !matches(path)) {
+          return false;
+        }
+        const index = matchedCount++;
+        return index >= offset && index < offset + limit;
+      };
+
+      const sections: string[] = [];
+      let totalFiles = 0;
+      let hasMore = false;
+
+      try {
+        for await (const segment of splitDiffByFile(diffStream, { maxBytesPerFile, select })) {
+          totalFiles++;
+
+          if (summaryOnly) {
+            if (matches(segment.path)) {
+              sections.push(`- ${segment.path} (+${segment.additions}/-${segment.deletions}, ${segment.bytes} bytes)`);
+            }
+            continue;
+          }
+
+          if (matchedCount > offset + limit) {
+            // 次のページがあることが分かった時点で読み込みを打ち切る
+            hasMore = true;
+            break;
+          }
+          if (segment.text !== '' || segment.truncated) {
+            sections.push(formatDiffSegment(segment));
+          }
+        }
+      } finally {
+        // 途中で打ち切った場合も接続を解放する
+        diffStream.destroy();
+      }
+
+      if (totalFiles === 0) {
         return this.createSuccessResponse(`No changes found in PR #${params.pr_number}`);
       }
 
-      // PRのメタデータも取得
-      const prData = await this.api.getPullRequest(
-        params.owner, 
-        params.repo, 
-        params.pr_number
-      ) as PullRequest;
+      if (summaryOnly) {
+        return this.createSuccessResponse(
+          `Diff summary for PR #${params.pr_number}: ${prData.title}\n\nFiles (${sections.length} of ${totalFiles} match):\n${sections.join('\n')}`
+        );
+      }
+
+      if (sections.length === 0) {
+        return this.createSuccessResponse(
+          `No files in PR #${params.pr_number} match the given filters at offset ${offset}`
+        );
+      }
+
+      const range = `Files ${offset + 1}-${offset + sections.length}${hasMore ? '' : ` of ${matchedCount}`}`;
+      const nextPage = hasMore ? `\n\nMore files available: call again with offset=${offset + limit}` : '';
 
       return this.createSuccessResponse(
-        `Diff for PR #${params.pr_number}: ${prData.title}\n\n\`\`\`diff\n${diffText}\n\`\`\``
+        `Diff for PR #${params.pr_number}: ${prData.title}\n${range}\n\n\`\`\`diff\n${sections.join('\n')}\n\`\`\`${nextPage}`
       );
     });
   }
@@ -193,14 +353,26 @@ export class PullRequestTools extends BaseTool {
     pr_number: number;
   }): Promise<ToolResult> {
     return await this.executeOperation('get PR changes for commenting', async () => {
-      const files = await this.api.getFiles(
+      // head SHA が同じであれば構築済みの差分インデックスを再利用
+      const prData = await this.api.getPullRequest(
+        params.owner,
+        params.repo,
+        params.pr_number
+      ) as PullRequest;
+      const indexKey = DiffIndexCache.key(params.owner, params.repo, params.pr_number, prData.head.sha);
+      const cachedIndexes = this.api.diffIndexes.get(indexKey);
+      const indexes = cachedIndexes || new Map<string, DiffIndex>();
+
+      const pages = this.api.iterateFiles(
         params.owner, 
         params.repo, 
         params.pr_number
-      ) as PullRequestFile[];
+      );
 
-      const fileChanges = enrichFileChanges(files);
-      const formattedOutput = formatFileChanges(fileChanges, params.pr_number);
+      const formattedOutput = await formatFileChangePages(pages, params.pr_number, indexes);
+      if (!cachedIndexes) {
+        this.api.diffIndexes.set(indexKey, indexes);
+      }
       
       return this.createSuccessResponse(formattedOutput);
     });
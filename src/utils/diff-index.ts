@@ -0,0 +1,290 @@
+// パッチの位置（position）と行番号を相互に変換するインデックス
+
+import { DiffSide } from '../api/types.js';
+
+// 位置ごとの行種別
+const KIND_OTHER = 0;
+const KIND_HUNK = 1;
+const KIND_CONTEXT = 2;
+const KIND_ADDED = 3;
+const KIND_DELETED = 4;
+
+const HUNK_HEADER = /^@@ -(\d+)(?:,\d+)? \+(\d+)(?:,\d+)? @@/;
+
+export interface DiffLineTarget {
+  line: number;
+  side: DiffSide;
+}
+
+/**
+ * 1ファイル分のパッチに対するインデックス
+ * 位置は GitHub と同じく、最初のハンクヘッダーの次の行を 1 として数える
+ * 以降のハンクヘッダーも位置を1つ消費する（コメント対象にはできない）
+ * 行番号 → 位置は二分探索 (O(log n))、位置 → 行番号は配列参照で求める
+ */
+export class DiffIndex {
+  private constructor(
+    readonly hasPatch: boolean,
+    // 位置 - 1 ごとの行種別と行番号（削除行は旧ファイル、それ以外は新ファイルの行番号）
+    private readonly kinds: Uint8Array,
+    private readonly lineNumbers: Int32Array,
+    // 行番号の昇順に並んだ (行番号, 位置) の組
+    private readonly newLines: Int32Array,
+    private readonly newPositions: Int32Array,
+    private readonly oldLines: Int32Array,
+    private readonly oldPositions: Int32Array
+  ) {}
+
+  /**
+   * パッチを1回走査してインデックスを構築
+   * 行ごとの文字列は作らず、各行の先頭文字とハンクヘッダーのみ参照する
+   */
+  static build(patch: string | undefined): DiffIndex {
+    if (!patch) {
+      const empty = new Int32Array(0);
+      return new DiffIndex(false, new Uint8Array(0), empty, empty, empty, empty, empty);
+    }
+
+    const kinds: number[] = [];
+    const lineNumbers: number[] = [];
+    const newLines: number[] = [];
+    const newPositions: number[] = [];
+    const oldLines: number[] = [];
+    const oldPositions: number[] = [];
+    let inHunk = false;
+    let oldLine = 0;
+    let newLine = 0;
+    let start = 0;
+
+    while (start < patch.length) {
+      const newline = patch.indexOf('\n', start);
+      const end = newline < 0 ? patch.length : newline;
+      const position = kinds.length + 1;
+      const first = patch[start];
+
+      if (first === '@' && patch.startsWith('@@', start)) {
+        const hunk = patch.slice(start, end).match(HUNK_HEADER);
+        if (hunk) {
+          // 最初のハンクヘッダーは位置 0（位置の起点）
+          if (inHunk) {
+            kinds.push(KIND_HUNK);
+            lineNumbers.push(0);
+          }
+          inHunk = true;
+          oldLine = parseInt(hunk[1], 10);
+          newLine = parseInt(hunk[2], 10);
+        }
+      } else if (!inHunk) {
+        // 最初のハンクより前の行（diff --git などのヘッダー）は位置を持たない
+      } else if (first === '+') {
+        kinds.push(KIND_ADDED);
+        lineNumbers.push(newLine);
+        newLines.push(newLine++);
+        newPositions.push(position);
+      } else if (first === '-') {
+        kinds.push(KIND_DELETED);
+        lineNumbers.push(oldLine);
+        oldLines.push(oldLine++);
+        oldPositions.push(position);
+      } else if (first === '\\') {
+        // "\ No newline at end of file" は位置を消費するが行番号は持たない
+        kinds.push(KIND_OTHER);
+        lineNumbers.push(0);
+      } else {
+        // コンテキスト行（空行を含む）は両側に存在する
+        kinds.push(KIND_CONTEXT);
+        lineNumbers.push(newLine);
+        newLines.push(newLine++);
+        newPositions.push(position);
+        oldLines.push(oldLine++);
+        oldPositions.push(position);
+      }
+
+      if (newline < 0) {
+        break;
+      }
+      start = newline + 1;
+    }
+
+    return new DiffIndex(
+      true,
+      Uint8Array.from(kinds),
+      Int32Array.from(lineNumbers),
+      Int32Array.from(newLines),
+      Int32Array.from(newPositions),
+      Int32Array.from(oldLines),
+      Int32Array.from(oldPositions)
+    );
+  }
+
+  /**
+   * パッチの行数（有効な位置の上限）
+   */
+  get positionCount(): number {
+    return this.kinds.length;
+  }
+
+  /**
+   * 追加行の位置一覧
+   */
+  addedPositions(): number[] {
+    const positions: number[] = [];
+    this.kinds.forEach((kind, index) => {
+      if (kind === KIND_ADDED) {
+        positions.push(index + 1);
+      }
+    });
+    return positions;
+  }
+
+  /**
+   * 行番号に対応する位置を取得（差分に含まれない場合は null）
+   * LEFT は削除行とコンテキスト行、RIGHT は追加行とコンテキスト行が対象
+   */
+  positionForLine(line: number, side: DiffSide = 'RIGHT'): number | null {
+    const lines = side === 'LEFT' ? this.oldLines : this.newLines;
+    const positions = side === 'LEFT' ? this.oldPositions : this.newPositions;
+    let low = 0;
+    let high = lines.length - 1;
+
+    while (low <= high) {
+      const mid = (low + high) >>> 1;
+      if (lines[mid] === line) {
+        return positions[mid];
+      }
+      if (lines[mid] < line) {
+        low = mid + 1;
+      } else {
+        high = mid - 1;
+      }
+    }
+
+    return null;
+  }
+
+  /**
+   * 位置に対応する行番号を取得（ハンクヘッダーなど行番号を持たない位置は null）
+   */
+  lineForPosition(position: number): DiffLineTarget | null {
+    const kind = this.kinds[position - 1];
+    if (kind === KIND_DELETED) {
+      return { line: this.lineNumbers[position - 1], side: 'LEFT' };
+    }
+    if ((kind === KIND_ADDED || kind === KIND_CONTEXT) && this.lineNumbers[position - 1] > 0) {
+      return { line: this.lineNumbers[position - 1], side: 'RIGHT' };
+    }
+    return null;
+  }
+
+  /**
+   * コメント対象が差分内の有効な行を指しているか検証
+   * 有効な場合は null、無効な場合は理由を返す
+   */
+  validate(target: { position?: number; line?: number; side?: DiffSide }): string | null {
+    if (!this.hasPatch) {
+      return 'file has no textual diff (binary or too large)';
+    }
+
+    if (target.position !== undefined) {
+      if (target.position < 1 || target.position > this.kinds.length) {
+        return `position ${target.position} is outside the diff (valid range: 1-${this.kinds.length})`;
+      }
+      if (this.kinds[target.position - 1] === KIND_HUNK) {
+        return `position ${target.position} points to a hunk header`;
+      }
+      if (this.kinds[target.position - 1] === KIND_OTHER) {
+        return `position ${target.position} points to a "No newline at end of file" marker`;
+      }
+      return null;
+    }
+
+    if (target.line === undefined) {
+      return 'either position or line must be specified';
+    }
+
+    const side = target.side || 'RIGHT';
+    if (this.positionForLine(target.line, side) === null) {
+      return `line ${target.line} (${side}) is not part of the diff`;
+    }
+    return null;
+  }
+
+  /**
+   * コメント可能な行番号を連続した範囲にまとめる
+   * RIGHT は追加行とコンテキスト行、LEFT は削除行のみ
+   */
+  lineRanges(side: DiffSide): Array<[number, number]> {
+    const ranges: Array<[number, number]> = [];
+    const lines = side === 'LEFT' ? this.oldLines : this.newLines;
+    const positions = side === 'LEFT' ? this.oldPositions : this.newPositions;
+
+    for (let i = 0; i < lines.length; i++) {
+      if (side === 'LEFT' && this.kinds[positions[i] - 1] !== KIND_DELETED) {
+        continue;
+      }
+      const last = ranges[ranges.length - 1];
+      if (last && last[1] + 1 === lines[i]) {
+        last[1] = lines[i];
+      } else {
+        ranges.push([lines[i], lines[i]]);
+      }
+    }
+
+    return ranges;
+  }
+}
+
+/**
+ * プルリクエストの head SHA ごとにファイル別インデックスを保持する LRU キャッシュ
+ * head SHA が変わればキーも変わるため、明示的な無効化は不要
+ */
+export class DiffIndexCache {
+  private readonly entries = new Map<string, Map<string, DiffIndex>>();
+  private stats = { hits: 0, misses: 0, evictions: 0 };
+
+  constructor(private readonly maxEntries: number = 20) {}
+
+  /**
+   * キャッシュキーを作成（リポジトリ + PR番号 + head SHA）
+   */
+  static key(owner: string, repo: string, prNumber: number, headSha: string): string {
+    return `${owner}/${repo}#${prNumber}@${headSha}`;
+  }
+
+  /**
+   * ファイル名ごとのインデックスを取得（取得したエントリは最新として扱う）
+   */
+  get(key: string): Map<string, DiffIndex> | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      this.stats.misses++;
+      return undefined;
+    }
+
+    this.stats.hits++;
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry;
+  }
+
+  /**
+   * インデックスを保存し、上限を超えた古いエントリを削除
+   */
+  set(key: string, indexes: Map<string, DiffIndex>): void {
+    this.entries.delete(key);
+    this.entries.set(key, indexes);
+
+    while (this.entries.size > this.maxEntries) {
+      const oldestKey = this.entries.keys().next().value as string;
+      this.entries.delete(oldestKey);
+      this.stats.evictions++;
+    }
+  }
+
+  /**
+   * キャッシュの統計情報を取得
+   */
+  getStats() {
+    return { size: this.entries.size, maxEntries: this.maxEntries, ...this.stats };
+  }
+}
@@ -0,0 +1,180 @@
+// unified diff をストリームのままファイル単位に分割
+
+import { StringDecoder } from 'string_decoder';
+
+// 1行がこれを超える場合（minify されたファイルなど）は行全体を保持せず、バイト数のみ集計する
+const MAX_PENDING_LINE_CHARS = 1024 * 1024;
+
+export interface DiffFileSegment {
+  path: string;
+  // 選択されたファイルのみ本文を保持（上限を超えた分は切り捨て）
+  text: string;
+  bytes: number;
+  truncated: boolean;
+  omittedBytes: number;
+  additions: number;
+  deletions: number;
+}
+
+export interface SplitDiffOptions {
+  // ファイルごとに保持する本文の上限バイト数
+  maxBytesPerFile: number;
+  // 本文を保持するファイルを選択（false の場合は統計のみ集計）
+  select?: (path: string) => boolean;
+}
+
+interface SegmentBuilder {
+  path: string;
+  lines: string[];
+  keptBytes: number;
+  bytes: number;
+  truncated: boolean;
+  selected: boolean;
+  inHunk: boolean;
+  additions: number;
+  deletions: number;
+}
+
+/**
+ * diff ストリームを読み込みながら `diff --git` 単位のセグメントを順に返す
+ * 保持するのは処理中の1ファイル分（上限バイト数まで）と未完の1行のみ
+ */
+export async function* splitDiffByFile(
+  source: AsyncIterable<Buffer | string>,
+  options: SplitDiffOptions
+): AsyncGenerator<DiffFileSegment, void, undefined> {
+  const decoder = new StringDecoder('utf8');
+  const select = options.select || (() => true);
+  const state: { current: SegmentBuilder | null } = { current: null };
+  let partial = '';
+
+  const finish = (builder: SegmentBuilder): DiffFileSegment => ({
+    path: builder.path,
+    text: builder.lines.join('\n'),
+    bytes: builder.bytes,
+    truncated: builder.truncated,
+    omittedBytes: builder.selected ? builder.bytes - builder.keptBytes : builder.bytes,
+    additions: builder.additions,
+    deletions: builder.deletions,
+  });
+
+  const start = (header: string): SegmentBuilder => {
+    const match = header.match(/^diff --git a\/(.+) b\/(.+)$/);
+    const path = match ? match[2] : header.slice('diff --git '.length);
+    return {
+      path,
+      lines: [],
+      keptBytes: 0,
+      bytes: 0,
+      truncated: false,
+      selected: select(path),
+      inHunk: false,
+      additions: 0,
+      deletions: 0,
+    };
+  };
+
+  const countLine = (builder: SegmentBuilder, line: string) => {
+    if (line.startsWith('@@')) {
+      builder.inHunk = true;
+    } else if (builder.inHunk) {
+      if (line.startsWith('+')) {
+        builder.additions++;
+      } else if (line.startsWith('-')) {
+        builder.deletions++;
+      }
+    }
+  };
+
+  const append = (builder: SegmentBuilder, line: string) => {
+    const lineBytes = Buffer.byteLength(line, 'utf8') + 1;
+    builder.bytes += lineBytes;
+    countLine(builder, line);
+
+    if (!builder.selected || builder.truncated) {
+      return;
+    }
+    if (builder.keptBytes + lineBytes > options.maxBytesPerFile) {
+      builder.truncated = true;
+      return;
+    }
+    builder.lines.push(line);
+    builder.keptBytes += lineBytes;
+  };
+
+  const processLine = function* (rawLine: string): Generator<DiffFileSegment> {
+    const line = rawLine.endsWith('\r') ? rawLine.slice(0, -1) : rawLine;
+
+    if (line.startsWith('diff --git ')) {
+      if (state.current) {
+        yield finish(state.current);
+      }
+      state.current = start(line);
+    }
+
+    if (state.current) {
+      append(state.current, line);
+    }
+  };
+
+  // 長すぎる行はバイト数のみ加算し、本文は切り捨て扱いにする
+  const skipOverflow = (text: string) => {
+    if (state.current) {
+      state.current.bytes += Buffer.byteLength(text, 'utf8');
+      if (state.current.selected) {
+        state.current.truncated = true;
+      }
+    }
+  };
+  let skippingLongLine = false;
+
+  for await (const chunk of source) {
+    let text = typeof chunk === 'string' ? chunk : decoder.write(chunk);
+
+    if (skippingLongLine) {
+      const newline = text.indexOf('\n');
+      if (newline < 0) {
+        skipOverflow(text);
+        continue;
+      }
+      skipOverflow(text.slice(0, newline + 1));
+      text = text.slice(newline + 1);
+      skippingLongLine = false;
+    }
+
+    const lines = (partial + text).split('\n');
+    partial = lines.pop() ?? '';
+
+    for (const line of lines) {
+      yield* processLine(line);
+    }
+
+    if (partial.length > MAX_PENDING_LINE_CHARS) {
+      if (state.current) {
+        countLine(state.current, partial);
+      }
+      skipOverflow(partial);
+      partial = '';
+      skippingLongLine = true;
+    }
+  }
+
+  const rest = partial + decoder.end();
+  if (rest !== '' && !skippingLongLine) {
+    yield* processLine(rest);
+  }
+  if (state.current) {
+    yield finish(state.current);
+  }
+}
+
+/**
+ * 切り捨てられたセグメントに切り捨てマーカーを付けて整形
+ */
+export function formatDiffSegment(segment: DiffFileSegment): string {
+  if (!segment.truncated) {
+    return segment.text;
+  }
+
+  return `${segment.text}\n... [truncated: ${segment.omittedBytes} more bytes in ${segment.path}]`;
+}
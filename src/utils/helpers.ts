@@ -1,6 +1,14 @@
 // ユーティリティ関数
 
-import { FileChangeInfo, PullRequestFile } from '../api/types.js';
+import {
+  FileChangeInfo,
+  PullRequestFile,
+  GraphQLComment,
+  GraphQLConnection,
+  PullRequestOverview,
+  RepositoryPullRequests
+} from '../api/types.js';
+import { DiffIndex } from './diff-index.js';
 
 /**
  * AIコメントの識別子
@@ -8,43 +16,31 @@ import { FileChangeInfo, PullRequestFile } from '../api/types.js';
 export const AI_COMMENT_IDENTIFIER = "[AI] Generated using MCP\n\n";
 
 /**
- * パッチからコメント可能な位置を計算
+ * ファイル変更情報にコメント位置とコメント可能な行番号を追加
+ * indexes を渡した場合は構築済みのインデックスを再利用し、未構築のものを追加する
  */
-export function calculateCommentPositions(patch: string | undefined): number[] {
-  const positions: number[] = [];
-  
-  if (!patch) {
-    return positions;
-  }
-
-  let position = 0;
-  const lines = patch.split('\n');
-  
-  for (const line of lines) {
-    position++;
-    // 追加された行（+で始まる行）の位置を記録
-    // +++で始まるヘッダー行は除外
-    if (line.startsWith('+') && !line.startsWith('+++')) {
-      positions.push(position);
+export function enrichFileChanges(
+  files: PullRequestFile[],
+  indexes: Map<string, DiffIndex> = new Map()
+): FileChangeInfo[] {
+  return files.map(file => {
+    let index = indexes.get(file.filename);
+    if (!index) {
+      index = DiffIndex.build(file.patch);
+      indexes.set(file.filename, index);
     }
-  }
 
-  return positions;
-}
-
-/**
- * ファイル変更情報にコメント位置を追加
- */
-export function enrichFileChanges(files: PullRequestFile[]): FileChangeInfo[] {
-  return files.map(file => ({
-    filename: file.filename,
-    status: file.status,
-    additions: file.additions,
-    deletions: file.deletions,
-    changes: file.changes,
-    patch: file.patch,
-    positions: calculateCommentPositions(file.patch)
-  }));
+    return {
+      filename: file.filename,
+      status: file.status,
+      additions: file.additions,
+      deletions: file.deletions,
+      changes: file.changes,
+      patch: file.patch,
+      positions: index.addedPositions(),
+      lineRanges: { right: index.lineRanges('RIGHT'), left: index.lineRanges('LEFT') }
+    };
+  });
 }
 
 /**
@@ -118,21 +114,263 @@ export function formatComments(
 }
 
 /**
- * ファイル変更情報を整形
+ * GraphQL のコメントを REST API と同じ形に変換（formatComments で整形するため）
+ */
+function toRestComment(comment: GraphQLComment, extra: Record<string, unknown> = {}) {
+  return {
+    user: { login: comment.author?.login || 'ghost' },
+    created_at: comment.createdAt,
+    body: comment.body,
+    html_url: comment.url,
+    ...extra
+  };
+}
+
+/**
+ * コレクションの続きがある場合にカーソルを案内する行を作成
+ */
+function formatContinuation(label: string, param: string, connection: GraphQLConnection<unknown>): string {
+  if (!connection.pageInfo.hasNextPage) {
+    return '';
+  }
+  return `More ${label} available (${connection.nodes.length} of ${connection.totalCount} shown): call again with ${param}="${connection.pageInfo.endCursor}"`;
+}
+
+/**
+ * GraphQL で取得したプルリクエストの概要を整形
+ * コメントとレビュースレッドは formatComments と同じ形式で出力する
+ */
+export function formatPullRequestOverview(overview: PullRequestOverview, owner: string, repo: string): string {
+  const reviewers = overview.reviewRequests.nodes
+    .map(node => node.requestedReviewer?.login || (node.requestedReviewer?.slug ? `team:${node.requestedReviewer.slug}` : null))
+    .filter((name): name is string => Boolean(name));
+  const reviews = overview.latestReviews.nodes
+    .map(review => `${review.author?.login || 'ghost'} (${review.state})`);
+
+  const sections = [
+    [
+      `# PR #${overview.number}: ${overview.title}${overview.isDraft ? ' (Draft)' : ''}`,
+      ``,
+      `**Repository:** ${owner}/${repo}`,
+      `**State:** ${overview.state}${overview.reviewDecision ? ` (${overview.reviewDecision})` : ''}`,
+      `**Author:** ${overview.author?.login || 'Unknown'}`,
+      `**Base:** ${overview.baseRefName} ← **Head:** ${overview.headRefName} (${overview.headRefOid})`,
+      `**Changes:** +${overview.additions}/-${overview.deletions} in ${overview.changedFiles} files`,
+      `**Requested Reviewers:** ${reviewers.join(', ') || 'None'}`,
+      `**Reviews:** ${reviews.join(', ') || 'None'}`,
+      `**URL:** ${overview.url}`,
+      `**Created:** ${overview.createdAt}`,
+      `**Updated:** ${overview.updatedAt}`,
+      ``,
+      `## Description`,
+      ``,
+      overview.body || '(No description provided)',
+    ].join('\n')
+  ];
+
+  if (overview.files) {
+    const files = overview.files.nodes
+      .map(file => `- ${file.path} (${file.changeType.toLowerCase()}, +${file.additions}/-${file.deletions})`);
+    const continuation = formatContinuation('files', 'files_cursor', overview.files);
+    if (continuation) {
+      files.push('', continuation);
+    }
+    sections.push([`## Files (${overview.files.totalCount})`, '', ...files].join('\n'));
+  }
+
+  if (overview.comments || overview.reviewThreads) {
+    const issueComments = (overview.comments?.nodes || []).map(comment => toRestComment(comment));
+    const reviewComments = (overview.reviewThreads?.nodes || []).flatMap(thread =>
+      thread.comments.nodes.map(comment => toRestComment(comment, {
+        path: `${thread.path}${thread.isResolved ? ' [resolved]' : ''}${thread.isOutdated ? ' [outdated]' : ''}`,
+        position: thread.line,
+      }))
+    );
+    const continuations = [
+      overview.comments ? formatContinuation('comments', 'comments_cursor', overview.comments) : '',
+      overview.reviewThreads ? formatContinuation('review threads', 'threads_cursor', overview.reviewThreads) : '',
+    ].filter(Boolean);
+
+    sections.push([formatComments(issueComments, reviewComments, overview.number), ...continuations].join('\n\n'));
+  }
+
+  return sections.join('\n\n');
+}
+
+/**
+ * 複数リポジトリのオープンなプルリクエストを整形
+ * リポジトリごとに formatPullRequestList と同じ形式で出力する
  */
-export function formatFileChanges(fileChanges: FileChangeInfo[], prNumber: number): string {
-  const formattedOutput = fileChanges.map(file => {
-    return [
-      `File: ${file.filename}`,
-      `Status: ${file.status}`,
-      `Changes: +${file.additions}/-${file.deletions} (total: ${file.changes})`,
-      `Comment Positions: ${file.positions.join(', ') || 'None'}`,
-      file.patch ? `\nPatch:\n${file.patch}` : '',
-      '---'
-    ].join('\n');
+export function formatRepositoryPullRequests(results: RepositoryPullRequests[]): string {
+  return results.map(({ owner, repo, pullRequests, totalCount, error }) => {
+    if (error) {
+      return `Failed to list open pull requests in ${owner}/${repo}: ${error}`;
+    }
+
+    const restShaped = pullRequests.map(pr => ({
+      number: pr.number,
+      title: pr.title,
+      user: { login: pr.author?.login || 'ghost' },
+      created_at: pr.createdAt,
+      head: { label: `${pr.headRepositoryOwner?.login || owner}:${pr.headRefName}` },
+      base: { label: `${owner}:${pr.baseRefName}` },
+      requested_reviewers: pr.reviewRequests.nodes.map(node => ({
+        login: node.requestedReviewer?.login || node.requestedReviewer?.slug || ''
+      })),
+      html_url: pr.url,
+    }));
+    const more = totalCount > pullRequests.length
+      ? `\n(${totalCount - pullRequests.length} more open pull requests not shown)`
+      : '';
+
+    return formatPullRequestList(restShaped, owner, repo) + more;
   }).join('\n\n');
+}
+
+/**
+ * 行番号の範囲を "1-4, 21" の形式に整形
+ */
+function formatLineRanges(ranges: Array<[number, number]>): string {
+  return ranges.map(([from, to]) => (from === to ? `${from}` : `${from}-${to}`)).join(', ');
+}
 
-  return `Changes in PR #${prNumber}:\n\n${formattedOutput}`;
+/**
+ * 1ファイル分の変更情報を整形
+ */
+function formatFileChange(file: FileChangeInfo): string {
+  const lineRanges = file.lineRanges && (file.lineRanges.right.length > 0 || file.lineRanges.left.length > 0)
+    ? `RIGHT ${formatLineRanges(file.lineRanges.right) || 'None'}; LEFT (deleted) ${formatLineRanges(file.lineRanges.left) || 'None'}`
+    : 'None';
+
+  return [
+    `File: ${file.filename}`,
+    `Status: ${file.status}`,
+    `Changes: +${file.additions}/-${file.deletions} (total: ${file.changes})`,
+    `Comment Positions: ${file.positions.join(', ') || 'None'}`,
+    `Commentable Lines: ${lineRanges}`,
+    file.patch ? `\nPatch:\n${file.patch}` : '',
+    '---'
+  ].join('\n');
+}
+
+/**
+ * ページ単位で届くファイル変更情報を順次整形
+ * 全ページを配列にまとめずに、受け取ったページから整形する
+ */
+export async function formatFileChangePages(
+  pages: AsyncIterable<PullRequestFile[]>,
+  prNumber: number,
+  indexes?: Map<string, DiffIndex>
+): Promise<string> {
+  const sections: string[] = [];
+
+  for await (const page of pages) {
+    for (const file of enrichFileChanges(page, indexes)) {
+      sections.push(formatFileChange(file));
+    }
+  }
+
+  return `Changes in PR #${prNumber}:\n\n${sections.join('\n\n')}`;
+}
+
+/**
+ * Link ヘッダーを rel ごとの URL に分解
+ * 例: <https://api.github.com/...&page=2>; rel="next", <...&page=5>; rel="last"
+ */
+export function parseLinkHeader(header: string | undefined): Record<string, string> {
+  const links: Record<string, string> = {};
+
+  if (!header) {
+    return links;
+  }
+
+  for (const part of header.split(',')) {
+    const match = part.match(/<([^>]+)>\s*;\s*rel="([^"]+)"/);
+    if (match) {
+      links[match[2]] = match[1];
+    }
+  }
+
+  return links;
+}
+
+/**
+ * glob パターンを正規表現に変換
+ * `**` は任意の階層、`*` と `?` はパス区切りを含まない文字に一致する
+ */
+export function globToRegExp(pattern: string): RegExp {
+  let source = '';
+
+  for (let i = 0; i < pattern.length; i++) {
+    const char = pattern[i];
+    if (char === '*') {
+      if (pattern[i + 1] === '*') {
+        // "**/" は0個以上のディレクトリに一致
+        if (pattern[i + 2] === '/') {
+          source += '(?:.*/)?';
+          i += 2;
+        } else {
+          source += '.*';
+          i += 1;
+        }
+      } else {
+        source += '[^/]*';
+      }
+    } else if (char === '?') {
+      source += '[^/]';
+    } else {
+      source += char.replace(/[.+^${}()|[\]\\]/g, '\\$&');
+    }
+  }
+
+  return new RegExp(`^${source}$`);
+}
+
+/**
+ * パスが glob パターンのいずれかに一致するか判定
+ * `/` を含まないパターン（例: `*.lock`）はファイル名に対して照合する
+ */
+export function matchesAnyGlob(path: string, patterns: string[]): boolean {
+  const basename = path.slice(path.lastIndexOf('/') + 1);
+  return patterns.some(pattern =>
+    globToRegExp(pattern).test(pattern.includes('/') ? path : basename)
+  );
+}
+
+/**
+ * GitHub API のベースURLを取得（GITHUB_API_URL で GitHub Enterprise Server などに変更可能）
+ * GITHUB_API_URL が未設定の場合は GH_HOST（gh の対象ホスト）から導出する
+ */
+export function getApiBaseUrl(env: NodeJS.ProcessEnv = process.env): string {
+  if (env.GITHUB_API_URL) {
+    return env.GITHUB_API_URL.replace(/\/+$/, '');
+  }
+
+  const host = env.GH_HOST;
+  if (!host || host === 'github.com') {
+    return 'https://api.github.com';
+  }
+  // GHE.com (データレジデンシー) は api. サブドメイン、GitHub Enterprise Server は /api/v3
+  return /\.ghe\.com$/.test(host) ? `https://api.${host}` : `https://${host}/api/v3`;
+}
+
+/**
+ * GraphQL エンドポイントのURLを取得
+ * GitHub Enterprise Server の REST は /api/v3、GraphQL は /api/graphql のため、REST のベースURLから導出する
+ */
+export function getGraphQLUrl(env: NodeJS.ProcessEnv = process.env): string {
+  const baseUrl = getApiBaseUrl(env);
+  return /\/api\/v3$/.test(baseUrl)
+    ? baseUrl.replace(/\/api\/v3$/, '/api/graphql')
+    : `${baseUrl}/graphql`;
+}
+
+/**
+ * 正の整数を指定する環境変数を読み込み（未設定・不正な値の場合はデフォルト値）
+ */
+export function readPositiveIntEnv(name: string, defaultValue: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : defaultValue;
 }
 
 /**
@@ -7,23 +7,47 @@ export enum LogLevel {
   ERROR = 3
 }
 
+// text: 従来の1行形式、json: 1行1オブジェクトの JSON 形式
+export type LogFormat = 'text' | 'json';
+
 class Logger {
   private level: LogLevel;
+  private format: LogFormat;
 
-  constructor(level: LogLevel = LogLevel.INFO) {
+  constructor(level: LogLevel = LogLevel.INFO, format: LogFormat = 'text') {
     this.level = level;
+    this.format = format;
   }
 
   setLevel(level: LogLevel): void {
     this.level = level;
   }
 
+  setFormat(format: LogFormat): void {
+    this.format = format;
+  }
+
   private shouldLog(level: LogLevel): boolean {
     return level >= this.level;
   }
 
   private formatMessage(level: string, message: string, ...args: any[]): void {
     const timestamp = new Date().toISOString();
+
+    if (this.format === 'json') {
+      const entry: Record<string, unknown> = { time: timestamp, level: level.toLowerCase(), message };
+      if (args.length > 0) {
+        entry.args = args.map(serializeArg);
+      }
+      try {
+        console.error(JSON.stringify(entry));
+      } catch {
+        // 循環参照などで変換できない引数は文字列にする
+        console.error(JSON.stringify({ ...entry, args: args.map(String) }));
+      }
+      return;
+    }
+
     const prefix = `[${timestamp}] [${level}] mcp-gh-pr-mini:`;
     
     if (args.length > 0) {
@@ -56,11 +80,47 @@ class Logger {
       this.formatMessage('ERROR', message, ...args);
     }
   }
+
+  /**
+   * 名前付きのイベントを構造化して出力
+   * json 形式ではフィールドをそのままキーとして、text 形式では key=value として出力する
+   */
+  event(name: string, fields: Record<string, unknown> = {}, level: LogLevel = LogLevel.INFO): void {
+    if (!this.shouldLog(level)) {
+      return;
+    }
+
+    if (this.format === 'json') {
+      console.error(JSON.stringify({
+        time: new Date().toISOString(),
+        level: LogLevel[level].toLowerCase(),
+        event: name,
+        ...fields,
+      }));
+      return;
+    }
+
+    const pairs = Object.entries(fields)
+      .filter(([, value]) => value !== undefined)
+      .map(([key, value]) => `${key}=${typeof value === 'string' ? JSON.stringify(value) : String(value)}`);
+    this.formatMessage(LogLevel[level], [name, ...pairs].join(' '));
+  }
+}
+
+/**
+ * JSON 出力用にログ引数を変換（Error は message と stack のみ）
+ */
+function serializeArg(arg: unknown): unknown {
+  if (arg instanceof Error) {
+    return { name: arg.name, message: arg.message, stack: arg.stack };
+  }
+  return arg;
 }
 
 // シングルトンインスタンス
 export const logger = new Logger(
   process.env.LOG_LEVEL ? 
     parseInt(process.env.LOG_LEVEL) as LogLevel : 
-    LogLevel.INFO
+    LogLevel.INFO,
+  process.env.LOG_FORMAT === 'json' ? 'json' : 'text'
 );
\ No newline at end of file
@@ -0,0 +1,168 @@
+// 処理時間とカウンターの計測
+
+// スパンごとに保持する直近のサンプル数（パーセンタイル計算用）
+const MAX_SAMPLES = 1024;
+
+export interface SpanStats {
+  count: number;
+  errors: number;
+  totalMs: number;
+  maxMs: number;
+  p50Ms: number;
+  p99Ms: number;
+}
+
+export interface MetricsSnapshot {
+  uptimeSeconds: number;
+  memory: {
+    rssBytes: number;
+    peakRssBytes: number;
+    heapUsedBytes: number;
+  };
+  counters: Record<string, number>;
+  spans: Record<string, SpanStats>;
+}
+
+interface SpanEntry {
+  // リングバッファとして使用
+  samples: number[];
+  next: number;
+  count: number;
+  errors: number;
+  totalMs: number;
+  maxMs: number;
+}
+
+/**
+ * プロセス内のメトリクスを集計
+ * スパンは名前ごとに件数・エラー数・合計時間と直近のサンプルを保持する
+ */
+export class Metrics {
+  private readonly startedAt = Date.now();
+  private readonly counters = new Map<string, number>();
+  private readonly spans = new Map<string, SpanEntry>();
+
+  /**
+   * カウンターを加算
+   */
+  increment(name: string, value: number = 1): void {
+    this.counters.set(name, (this.counters.get(name) || 0) + value);
+  }
+
+  /**
+   * スパンを開始し、終了時に呼ぶ関数を返す（戻り値は経過ミリ秒）
+   */
+  startSpan(name: string): (error?: boolean) => number {
+    const start = process.hrtime.bigint();
+    return (error: boolean = false) => {
+      const durationMs = Number(process.hrtime.bigint() - start) / 1e6;
+      this.record(name, durationMs, error);
+      return durationMs;
+    };
+  }
+
+  /**
+   * 非同期処理の所要時間をスパンとして記録
+   */
+  async time<T>(name: string, fn: () => Promise<T>): Promise<T> {
+    const end = this.startSpan(name);
+    try {
+      const result = await fn();
+      end();
+      return result;
+    } catch (error) {
+      end(true);
+      throw error;
+    }
+  }
+
+  /**
+   * 現在の集計結果を取得
+   */
+  snapshot(): MetricsSnapshot {
+    const spans: Record<string, SpanStats> = {};
+    for (const [name, entry] of this.spans) {
+      const sorted = [...entry.samples].sort((a, b) => a - b);
+      spans[name] = {
+        count: entry.count,
+        errors: entry.errors,
+        totalMs: round(entry.totalMs),
+        maxMs: round(entry.maxMs),
+        p50Ms: round(percentile(sorted, 0.5)),
+        p99Ms: round(percentile(sorted, 0.99)),
+      };
+    }
+
+    const memory = process.memoryUsage();
+    return {
+      uptimeSeconds: Math.round((Date.now() - this.startedAt) / 1000),
+      memory: {
+        rssBytes: memory.rss,
+        // maxRSS はキロバイト単位
+        peakRssBytes: process.resourceUsage().maxRSS * 1024,
+        heapUsedBytes: memory.heapUsed,
+      },
+      counters: Object.fromEntries(this.counters),
+      spans,
+    };
+  }
+
+  /**
+   * 集計結果をすべて破棄
+   */
+  reset(): void {
+    this.counters.clear();
+    this.spans.clear();
+  }
+
+  private record(name: string, durationMs: number, error: boolean): void {
+    let entry = this.spans.get(name);
+    if (!entry) {
+      entry = { samples: [], next: 0, count: 0, errors: 0, totalMs: 0, maxMs: 0 };
+      this.spans.set(name, entry);
+    }
+
+    if (entry.samples.length < MAX_SAMPLES) {
+      entry.samples.push(durationMs);
+    } else {
+      entry.samples[entry.next] = durationMs;
+      entry.next = (entry.next + 1) % MAX_SAMPLES;
+    }
+    entry.count++;
+    entry.totalMs += durationMs;
+    entry.maxMs = Math.max(entry.maxMs, durationMs);
+    if (error) {
+      entry.errors++;
+    }
+  }
+}
+
+/**
+ * ソート済みの配列から最近傍順位法でパーセンタイルを取得
+ */
+export function percentile(sorted: number[], ratio: number): number {
+  if (sorted.length === 0) {
+    return 0;
+  }
+  const rank = Math.ceil(ratio * sorted.length) - 1;
+  return sorted[Math.min(Math.max(rank, 0), sorted.length - 1)];
+}
+
+/**
+ * API パスからオーナー名・リポジトリ名・番号を除き、集計用のルート名に変換
+ * 例: /repos/octo/app/pulls/12/files?page=2 → /repos/:owner/:repo/pulls/:number/files
+ */
+export function normalizeRoute(path: string): string {
+  const queryIndex = path.indexOf('?');
+  const pathname = queryIndex >= 0 ? path.slice(0, queryIndex) : path;
+  return pathname
+    .replace(/^\/repos\/[^/]+\/[^/]+/, '/repos/:owner/:repo')
+    .replace(/\/\d+(?=\/|$)/g, '/:number');
+}
+
+function round(value: number): number {
+  return Math.round(value * 100) / 100;
+}
+
+// シングルトンインスタンス
+export const metrics = new Metrics();
@@ -0,0 +1,299 @@
+// 認証セッションのキャッシュと 401 による再検証のユニットテスト
+
+// Mock fetch globally
+global.fetch = jest.fn() as jest.MockedFunction<typeof fetch>;
+process.env.GITHUB_PERSONAL_ACCESS_TOKEN = 'test-token-123';
+
+interface GitHubError {
+  status: number;
+  response?: unknown;
+}
+
+interface AuthClient {
+  login: string;
+}
+
+// Auth session management (extracted from source)
+// initialize() は認証方式の検出と検証を行う代わりに validate を呼び出す
+class GitHubAuth {
+  private client: AuthClient | null = null;
+  private validatedAt: number | null = null;
+  private generation = 0;
+  private initPromise: Promise<void> | null = null;
+  private readonly sessionTtlMs: number;
+
+  constructor(private readonly validate: () => Promise<AuthClient>, ttlSeconds: number = 0) {
+    this.sessionTtlMs = Number.isFinite(ttlSeconds) && ttlSeconds > 0 ? ttlSeconds * 1000 : 0;
+  }
+
+  async initialize(): Promise<void> {
+    this.startSession(await this.validate());
+  }
+
+  private startSession(client: AuthClient): void {
+    this.client = client;
+    this.validatedAt = Date.now();
+    this.generation++;
+  }
+
+  async ensureSession(): Promise<void> {
+    if (this.hasValidSession()) {
+      return;
+    }
+
+    if (!this.initPromise) {
+      this.initPromise = this.initialize().finally(() => {
+        this.initPromise = null;
+      });
+    }
+    await this.initPromise;
+  }
+
+  hasValidSession(): boolean {
+    if (!this.client || this.validatedAt === null) {
+      return false;
+    }
+    if (this.sessionTtlMs > 0 && Date.now() - this.validatedAt >= this.sessionTtlMs) {
+      return false;
+    }
+    return true;
+  }
+
+  getSessionGeneration(): number {
+    return this.generation;
+  }
+
+  invalidateSession(generation?: number): void {
+    if (generation !== undefined && generation !== this.generation) {
+      return;
+    }
+    this.validatedAt = null;
+  }
+}
+
+// Auth error retry (extracted from source)
+function isAuthError(error: unknown): boolean {
+  const status = (error as Partial<GitHubError> | undefined)?.status;
+  if (status === 401) {
+    return true;
+  }
+  if (status === 403) {
+    const message = error instanceof Error ? error.message : String(error);
+    return !/rate limit/i.test(message);
+  }
+  return false;
+}
+
+async function withAuthRetry<T>(githubAuth: GitHubAuth, fn: () => Promise<T>): Promise<T> {
+  await githubAuth.ensureSession();
+  const generation = githubAuth.getSessionGeneration();
+
+  try {
+    return await fn();
+  } catch (error) {
+    if (!isAuthError(error)) {
+      throw error;
+    }
+
+    githubAuth.invalidateSession(generation);
+    await githubAuth.ensureSession();
+    return await fn();
+  }
+}
+
+function apiError(status: number, message: string): Error & GitHubError {
+  const error = new Error(`GitHub API error! Status: ${status}, Message: ${message}`) as Error & GitHubError;
+  error.status = status;
+  return error;
+}
+
+function createAuth(ttlSeconds: number = 0) {
+  const validations = { count: 0 };
+  const auth = new GitHubAuth(async () => {
+    validations.count++;
+    return { login: 'octocat' };
+  }, ttlSeconds);
+  return { auth, validations };
+}
+
+describe('Auth session', () => {
+  describe('ensureSession', () => {
+    test('should not re-validate on later requests', async () => {
+      const { auth, validations } = createAuth();
+
+      await auth.ensureSession();
+      await auth.ensureSession();
+      await withAuthRetry(auth, async () => 'ok');
+
+      expect(validations.count).toBe(1);
+      expect(auth.getSessionGeneration()).toBe(1);
+    });
+
+    test('should share one initialize() between concurrent callers', async () => {
+      let finish: (client: AuthClient) => void = () => {};
+      let validations = 0;
+      const auth = new GitHubAuth(() => {
+        validations++;
+        return new Promise<AuthClient>((resolve) => {
+          finish = resolve;
+        });
+      });
+
+      const callers = [auth.ensureSession(), auth.ensureSession(), auth.ensureSession()];
+      finish({ login: 'octocat' });
+      await Promise.all(callers);
+
+      expect(validations).toBe(1);
+      expect(auth.hasValidSession()).toBe(true);
+    });
+
+    test('should retry initialization after a failed validation', async () => {
+      let attempts = 0;
+      const auth = new GitHubAuth(async () => {
+        attempts++;
+        if (attempts === 1) {
+          throw new Error('No valid GitHub authentication found');
+        }
+        return { login: 'octocat' };
+      });
+
+      await expect(auth.ensureSession()).rejects.toThrow('No valid GitHub authentication found');
+      await auth.ensureSession();
+
+      expect(attempts).toBe(2);
+      expect(auth.hasValidSession()).toBe(true);
+    });
+
+    test('should re-validate once the TTL has expired', async () => {
+      jest.useFakeTimers();
+      try {
+        const { auth, validations } = createAuth(60);
+
+        await auth.ensureSession();
+        jest.advanceTimersByTime(59_000);
+        await auth.ensureSession();
+        expect(validations.count).toBe(1);
+
+        jest.advanceTimersByTime(1_000);
+        expect(auth.hasValidSession()).toBe(false);
+        await auth.ensureSession();
+        expect(validations.count).toBe(2);
+        expect(auth.getSessionGeneration()).toBe(2);
+      } finally {
+        jest.useRealTimers();
+      }
+    });
+
+    test('should never expire without a TTL', async () => {
+      jest.useFakeTimers();
+      try {
+        const { auth, validations } = createAuth(0);
+
+        await auth.ensureSession();
+        jest.advanceTimersByTime(7 * 24 * 60 * 60 * 1000);
+        await auth.ensureSession();
+
+        expect(validations.count).toBe(1);
+      } finally {
+        jest.useRealTimers();
+      }
+    });
+  });
+
+  describe('invalidateSession', () => {
+    test('should ignore a stale generation after the session was refreshed', async () => {
+      const { auth, validations } = createAuth();
+      await auth.ensureSession();
+      const stale = auth.getSessionGeneration();
+
+      // 別のリクエストが先に再検証を済ませた
+      auth.invalidateSession(stale);
+      await auth.ensureSession();
+      expect(validations.count).toBe(2);
+
+      // 古い世代番号での無効化は、再検証済みのセッションを無効化しない
+      auth.invalidateSession(stale);
+      expect(auth.hasValidSession()).toBe(true);
+      await auth.ensureSession();
+      expect(validations.count).toBe(2);
+    });
+
+    test('should invalidate the current session without a generation', async () => {
+      const { auth } = createAuth();
+      await auth.ensureSession();
+
+      auth.invalidateSession();
+
+      expect(auth.hasValidSession()).toBe(false);
+    });
+  });
+
+  describe('withAuthRetry', () => {
+    test('should re-validate and retry exactly once on 401', async () => {
+      const { auth, validations } = createAuth();
+      let calls = 0;
+
+      const result = await withAuthRetry(auth, async () => {
+        calls++;
+        if (calls === 1) {
+          throw apiError(401, '{"message":"Bad credentials"}');
+        }
+        return 'ok';
+      });
+
+      expect(result).toBe('ok');
+      expect(calls).toBe(2);
+      expect(validations.count).toBe(2);
+    });
+
+    test('should give up after the retry also returns 401', async () => {
+      const { auth, validations } = createAuth();
+      let calls = 0;
+
+      await expect(withAuthRetry(auth, async () => {
+        calls++;
+        throw apiError(401, '{"message":"Bad credentials"}');
+      })).rejects.toThrow('Bad credentials');
+
+      expect(calls).toBe(2);
+      expect(validations.count).toBe(2);
+    });
+
+    test('should not treat a rate-limit 403 as an auth error', async () => {
+      const { auth, validations } = createAuth();
+      let calls = 0;
+
+      await expect(withAuthRetry(auth, async () => {
+        calls++;
+        throw apiError(403, '{"message":"API rate limit exceeded for user ID 1."}');
+      })).rejects.toThrow('rate limit');
+
+      expect(calls).toBe(1);
+      expect(validations.count).toBe(1);
+    });
+
+    test('should not retry other errors', async () => {
+      const { auth, validations } = createAuth();
+      let calls = 0;
+
+      await expect(withAuthRetry(auth, async () => {
+        calls++;
+        throw apiError(404, '{"message":"Not Found"}');
+      })).rejects.toThrow('Not Found');
+
+      expect(calls).toBe(1);
+      expect(validations.count).toBe(1);
+    });
+  });
+
+  describe('isAuthError', () => {
+    test('should classify statuses and 403 messages', () => {
+      expect(isAuthError(apiError(401, 'Bad credentials'))).toBe(true);
+      expect(isAuthError(apiError(403, 'Resource not accessible by integration'))).toBe(true);
+      expect(isAuthError(apiError(403, 'You have exceeded a secondary rate limit'))).toBe(false);
+      expect(isAuthError(apiError(500, 'Server Error'))).toBe(false);
+      expect(isAuthError(new Error('socket hang up'))).toBe(false);
+      expect(isAuthError(undefined)).toBe(false);
+    });
+  });
+});
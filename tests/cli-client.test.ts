@@ -0,0 +1,101 @@
+// GitHub CLI のホスト名決定のユニットテスト
+
+// Mock fetch globally
+global.fetch = jest.fn() as jest.MockedFunction<typeof fetch>;
+process.env.GITHUB_PERSONAL_ACCESS_TOKEN = 'test-token-123';
+
+// API base URL resolution (extracted from source)
+function getApiBaseUrl(env: NodeJS.ProcessEnv = process.env): string {
+  if (env.GITHUB_API_URL) {
+    return env.GITHUB_API_URL.replace(/\/+$/, '');
+  }
+
+  const host = env.GH_HOST;
+  if (!host || host === 'github.com') {
+    return 'https://api.github.com';
+  }
+  return /\.ghe\.com$/.test(host) ? `https://api.${host}` : `https://${host}/api/v3`;
+}
+
+function getGraphQLUrl(env: NodeJS.ProcessEnv = process.env): string {
+  const baseUrl = getApiBaseUrl(env);
+  return /\/api\/v3$/.test(baseUrl)
+    ? baseUrl.replace(/\/api\/v3$/, '/api/graphql')
+    : `${baseUrl}/graphql`;
+}
+
+// gh hostname resolution (extracted from source)
+function ghHostnameForApiUrl(apiUrl: string): string {
+  const host = new URL(apiUrl).host;
+  return host === 'api.github.com' ? 'github.com' : host.replace(/^api\.(?=[^.]+\.ghe\.com$)/, '');
+}
+
+function resolveGhHostname(env: NodeJS.ProcessEnv = process.env): string | null {
+  const hostname = env.GH_HOST || (env.GITHUB_API_URL ? ghHostnameForApiUrl(env.GITHUB_API_URL) : '');
+  return hostname && hostname !== 'github.com' ? hostname : null;
+}
+
+function resolveTokenHostname(env: NodeJS.ProcessEnv = process.env): string | null {
+  const apiHostname = ghHostnameForApiUrl(getApiBaseUrl(env));
+  return (resolveGhHostname(env) ?? 'github.com') === apiHostname ? apiHostname : null;
+}
+
+describe('GitHub CLI hostname', () => {
+  describe('resolveGhHostname', () => {
+    test('should not pass a hostname for github.com', () => {
+      expect(resolveGhHostname({})).toBeNull();
+      // GitHub Actions sets this by default
+      expect(resolveGhHostname({ GITHUB_API_URL: 'https://api.github.com' })).toBeNull();
+      expect(resolveGhHostname({ GH_HOST: 'github.com' })).toBeNull();
+    });
+
+    test('should use the API host for GitHub Enterprise Server', () => {
+      expect(resolveGhHostname({ GITHUB_API_URL: 'https://ghes.example.com/api/v3' })).toBe('ghes.example.com');
+      expect(resolveGhHostname({ GITHUB_API_URL: 'http://127.0.0.1:8080' })).toBe('127.0.0.1:8080');
+    });
+
+    test('should map API-only hosts on GHE.com to the gh hostname', () => {
+      expect(resolveGhHostname({ GITHUB_API_URL: 'https://api.octocorp.ghe.com' })).toBe('octocorp.ghe.com');
+    });
+
+    test('should prefer GH_HOST for gh itself', () => {
+      expect(resolveGhHostname({ GH_HOST: 'ghes.example.com', GITHUB_API_URL: 'https://api.github.com' })).toBe('ghes.example.com');
+    });
+  });
+
+  describe('API base URL without GITHUB_API_URL', () => {
+    test('should follow GH_HOST so the gh token and the HTTP host match', () => {
+      expect(getApiBaseUrl({ GH_HOST: 'ghes.example.com' })).toBe('https://ghes.example.com/api/v3');
+      expect(getGraphQLUrl({ GH_HOST: 'ghes.example.com' })).toBe('https://ghes.example.com/api/graphql');
+      expect(getApiBaseUrl({ GH_HOST: 'octocorp.ghe.com' })).toBe('https://api.octocorp.ghe.com');
+      expect(getGraphQLUrl({ GH_HOST: 'octocorp.ghe.com' })).toBe('https://api.octocorp.ghe.com/graphql');
+    });
+
+    test('should default to github.com', () => {
+      expect(getApiBaseUrl({})).toBe('https://api.github.com');
+      expect(getApiBaseUrl({ GH_HOST: 'github.com' })).toBe('https://api.github.com');
+      expect(getGraphQLUrl({})).toBe('https://api.github.com/graphql');
+    });
+
+    test('should keep an explicit GITHUB_API_URL', () => {
+      expect(getApiBaseUrl({ GH_HOST: 'ghes.example.com', GITHUB_API_URL: 'https://ghes.example.com/api/v3/' })).toBe('https://ghes.example.com/api/v3');
+    });
+  });
+
+  describe('resolveTokenHostname', () => {
+    test('should request the token for the host HTTP requests are sent to', () => {
+      // gh の既定ホストが GitHub Enterprise でも github.com のトークンを明示して取得する
+      expect(resolveTokenHostname({})).toBe('github.com');
+      expect(resolveTokenHostname({ GITHUB_API_URL: 'https://api.github.com' })).toBe('github.com');
+      expect(resolveTokenHostname({ GH_HOST: 'ghes.example.com' })).toBe('ghes.example.com');
+      expect(resolveTokenHostname({ GITHUB_API_URL: 'https://ghes.example.com/api/v3' })).toBe('ghes.example.com');
+      expect(resolveTokenHostname({ GH_HOST: 'ghes.example.com', GITHUB_API_URL: 'https://ghes.example.com/api/v3' })).toBe('ghes.example.com');
+      expect(resolveTokenHostname({ GH_HOST: 'octocorp.ghe.com' })).toBe('octocorp.ghe.com');
+    });
+
+    test('should fall back to gh api when GH_HOST and GITHUB_API_URL disagree', () => {
+      expect(resolveTokenHostname({ GH_HOST: 'ghes.example.com', GITHUB_API_URL: 'https://api.github.com' })).toBeNull();
+      expect(resolveTokenHostname({ GH_HOST: 'github.com', GITHUB_API_URL: 'https://ghes.example.com/api/v3' })).toBeNull();
+    });
+  });
+});
@@ -4,17 +4,25 @@
 global.fetch = jest.fn() as jest.MockedFunction<typeof fetch>;
 process.env.GITHUB_PERSONAL_ACCESS_TOKEN = 'test-token-123';
 
-// Comment position calculation logic (extracted from source)
+// Comment position calculation logic (extracted from DiffIndex.addedPositions)
+// 位置は GitHub と同じく、最初のハンクヘッダーの次の行を 1 として数える
 function calculateCommentPositions(patch: string): number[] {
   const positions: number[] = [];
   if (patch) {
-    let position = 0;
+    // 最初のハンクヘッダーが見つかるまでは -1（ヘッダー行は位置を持たない）
+    let position = -1;
     const lines = patch.split('\n');
     
     for (const line of lines) {
+      if (position < 0) {
+        if (line.startsWith('@@')) {
+          position = 0;
+        }
+        continue;
+      }
       position++;
       // 追加された行（+で始まる行）の位置を記録
-      if (line.startsWith('+') && !line.startsWith('+++')) {
+      if (line.startsWith('+')) {
         positions.push(position);
       }
     }
@@ -65,19 +73,20 @@ describe('Comment Position Calculation', () => {
     it('should find positions of added lines in simple patch', () => {
       const positions = calculateCommentPositions(samplePatches.simple);
       
-      // Position 4: +  console.log('new');
-      // Position 5: +  console.log('added line 1');
-      // Position 6: +  console.log('added line 2');
-      expect(positions).toEqual([4, 5, 6]);
+      // Position 3: +  console.log('new');
+      // Position 4: +  console.log('added line 1');
+      // Position 5: +  console.log('added line 2');
+      expect(positions).toEqual([3, 4, 5]);
     });
 
     it('should find positions across multiple hunks', () => {
       const positions = calculateCommentPositions(samplePatches.multipleHunks);
       
-      // Position 4: +  console.log('added in first hunk');
-      // Position 8: +  console.log('added in second hunk');
-      // Position 9: +  console.log('another added line');
-      expect(positions).toEqual([4, 8, 9]);
+      // Position 3: +  console.log('added in first hunk');
+      // Position 4: the second @@ header (counted, but not commentable)
+      // Position 7: +  console.log('added in second hunk');
+      // Position 8: +  console.log('another added line');
+      expect(positions).toEqual([3, 7, 8]);
     });
 
     it('should return empty array for patches with only deletions', () => {
@@ -110,8 +119,8 @@ index 1234567..abcdefg 100644
 +new line`;
 
       const positions = calculateCommentPositions(patchWithHeaders);
-      // Should not include the +++ header line, only the actual added content
-      expect(positions).toEqual([7]); // Position of "+new line"
+      // Lines above the first @@ have no position, so the +++ header is never counted
+      expect(positions).toEqual([2]); // Position of "+new line"
     });
 
     it('should handle complex real-world patch', () => {
@@ -134,7 +143,7 @@ index 1234567..abcdefg 100644
  }`;
 
       const positions = calculateCommentPositions(complexPatch);
-      expect(positions).toEqual([5, 6, 7, 15, 16]); // All added lines
+      expect(positions).toEqual([4, 5, 6, 14, 15]); // All added lines
     });
   });
 
@@ -155,14 +164,14 @@ index 1234567..abcdefg 100644
 ++`;
 
       const positions = calculateCommentPositions(singleCharPatch);
-      expect(positions).toEqual([3]); // Position of "++"
+      expect(positions).toEqual([2]); // Position of "++"
     });
 
     it('should handle patches with mixed line endings', () => {
       const mixedEndingsPatch = "@@ -1,2 +1,3 @@\r\n existing\r\n+added\r\n context";
       
       const positions = calculateCommentPositions(mixedEndingsPatch);
-      expect(positions).toEqual([3]); // Position of "+added"
+      expect(positions).toEqual([2]); // Position of "+added"
     });
   });
 
@@ -180,7 +189,7 @@ index 1234567..abcdefg 100644
       const positions = calculateCommentPositions(mockFileChange.patch);
       
       expect(positions.length).toBeGreaterThan(0);
-      expect(positions).toEqual([4, 5, 6]);
+      expect(positions).toEqual([3, 4, 5]);
       
       // All positions should be valid (positive integers)
       positions.forEach(pos => {
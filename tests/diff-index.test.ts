@@ -0,0 +1,400 @@
+// 差分インデックスのユニットテスト
+
+// Mock fetch globally
+global.fetch = jest.fn() as jest.MockedFunction<typeof fetch>;
+process.env.GITHUB_PERSONAL_ACCESS_TOKEN = 'test-token-123';
+
+type DiffSide = 'LEFT' | 'RIGHT';
+
+// Diff position index (extracted from source)
+// 位置ごとの行種別
+const KIND_OTHER = 0;
+const KIND_HUNK = 1;
+const KIND_CONTEXT = 2;
+const KIND_ADDED = 3;
+const KIND_DELETED = 4;
+
+const HUNK_HEADER = /^@@ -(\d+)(?:,\d+)? \+(\d+)(?:,\d+)? @@/;
+
+interface DiffLineTarget {
+  line: number;
+  side: DiffSide;
+}
+
+/**
+ * 1ファイル分のパッチに対するインデックス
+ * 位置は GitHub と同じく、最初のハンクヘッダーの次の行を 1 として数える
+ * 以降のハンクヘッダーも位置を1つ消費する（コメント対象にはできない）
+ * 行番号 → 位置は二分探索 (O(log n))、位置 → 行番号は配列参照で求める
+ */
+class DiffIndex {
+  private constructor(
+    readonly hasPatch: boolean,
+    // 位置 - 1 ごとの行種別と行番号（削除行は旧ファイル、それ以外は新ファイルの行番号）
+    private readonly kinds: Uint8Array,
+    private readonly lineNumbers: Int32Array,
+    // 行番号の昇順に並んだ (行番号, 位置) の組
+    private readonly newLines: Int32Array,
+    private readonly newPositions: Int32Array,
+    private readonly oldLines: Int32Array,
+    private readonly oldPositions: Int32Array
+  ) {}
+
+  /**
+   * パッチを1回走査してインデックスを構築
+   * 行ごとの文字列は作らず、各行の先頭文字とハンクヘッダーのみ参照する
+   */
+  static build(patch: string | undefined): DiffIndex {
+    if (!patch) {
+      const empty = new Int32Array(0);
+      return new DiffIndex(false, new Uint8Array(0), empty, empty, empty, empty, empty);
+    }
+
+    const kinds: number[] = [];
+    const lineNumbers: number[] = [];
+    const newLines: number[] = [];
+    const newPositions: number[] = [];
+    const oldLines: number[] = [];
+    const oldPositions: number[] = [];
+    let inHunk = false;
+    let oldLine = 0;
+    let newLine = 0;
+    let start = 0;
+
+    while (start < patch.length) {
+      const newline = patch.indexOf('\n', start);
+      const end = newline < 0 ? patch.length : newline;
+      const position = kinds.length + 1;
+      const first = patch[start];
+
+      if (first === '@' && patch.startsWith('@@', start)) {
+        const hunk = patch.slice(start, end).match(HUNK_HEADER);
+        if (hunk) {
+          // 最初のハンクヘッダーは位置 0（位置の起点）
+          if (inHunk) {
+            kinds.push(KIND_HUNK);
+            lineNumbers.push(0);
+          }
+          inHunk = true;
+          oldLine = parseInt(hunk[1], 10);
+          newLine = parseInt(hunk[2], 10);
+        }
+      } else if (!inHunk) {
+        // 最初のハンクより前の行（diff --git などのヘッダー）は位置を持たない
+      } else if (first === '+') {
+        kinds.push(KIND_ADDED);
+        lineNumbers.push(newLine);
+        newLines.push(newLine++);
+        newPositions.push(position);
+      } else if (first === '-') {
+        kinds.push(KIND_DELETED);
+        lineNumbers.push(oldLine);
+        oldLines.push(oldLine++);
+        oldPositions.push(position);
+      } else if (first === '\\') {
+        // "\ No newline at end of file" は位置を消費するが行番号は持たない
+        kinds.push(KIND_OTHER);
+        lineNumbers.push(0);
+      } else {
+        // コンテキスト行（空行を含む）は両側に存在する
+        kinds.push(KIND_CONTEXT);
+        lineNumbers.push(newLine);
+        newLines.push(newLine++);
+        newPositions.push(position);
+        oldLines.push(oldLine++);
+        oldPositions.push(position);
+      }
+
+      if (newline < 0) {
+        break;
+      }
+      start = newline + 1;
+    }
+
+    return new DiffIndex(
+      true,
+      Uint8Array.from(kinds),
+      Int32Array.from(lineNumbers),
+      Int32Array.from(newLines),
+      Int32Array.from(newPositions),
+      Int32Array.from(oldLines),
+      Int32Array.from(oldPositions)
+    );
+  }
+
+  /**
+   * パッチの行数（有効な位置の上限）
+   */
+  get positionCount(): number {
+    return this.kinds.length;
+  }
+
+  /**
+   * 追加行の位置一覧
+   */
+  addedPositions(): number[] {
+    const positions: number[] = [];
+    this.kinds.forEach((kind, index) => {
+      if (kind === KIND_ADDED) {
+        positions.push(index + 1);
+      }
+    });
+    return positions;
+  }
+
+  /**
+   * 行番号に対応する位置を取得（差分に含まれない場合は null）
+   * LEFT は削除行とコンテキスト行、RIGHT は追加行とコンテキスト行が対象
+   */
+  positionForLine(line: number, side: DiffSide = 'RIGHT'): number | null {
+    const lines = side === 'LEFT' ? this.oldLines : this.newLines;
+    const positions = side === 'LEFT' ? this.oldPositions : this.newPositions;
+    let low = 0;
+    let high = lines.length - 1;
+
+    while (low <= high) {
+      const mid = (low + high) >>> 1;
+      if (lines[mid] === line) {
+        return positions[mid];
+      }
+      if (lines[mid] < line) {
+        low = mid + 1;
+      } else {
+        high = mid - 1;
+      }
+    }
+
+    return null;
+  }
+
+  /**
+   * 位置に対応する行番号を取得（ハンクヘッダーなど行番号を持たない位置は null）
+   */
+  lineForPosition(position: number): DiffLineTarget | null {
+    const kind = this.kinds[position - 1];
+    if (kind === KIND_DELETED) {
+      return { line: this.lineNumbers[position - 1], side: 'LEFT' };
+    }
+    if ((kind === KIND_ADDED || kind === KIND_CONTEXT) && this.lineNumbers[position - 1] > 0) {
+      return { line: this.lineNumbers[position - 1], side: 'RIGHT' };
+    }
+    return null;
+  }
+
+  /**
+   * コメント対象が差分内の有効な行を指しているか検証
+   * 有効な場合は null、無効な場合は理由を返す
+   */
+  validate(target: { position?: number; line?: number; side?: DiffSide }): string | null {
+    if (!this.hasPatch) {
+      return 'file has no textual diff (binary or too large)';
+    }
+
+    if (target.position !== undefined) {
+      if (target.position < 1 || target.position > this.kinds.length) {
+        return `position ${target.position} is outside the diff (valid range: 1-${this.kinds.length})`;
+      }
+      if (this.kinds[target.position - 1] === KIND_HUNK) {
+        return `position ${target.position} points to a hunk header`;
+      }
+      if (this.kinds[target.position - 1] === KIND_OTHER) {
+        return `position ${target.position} points to a "No newline at end of file" marker`;
+      }
+      return null;
+    }
+
+    if (target.line === undefined) {
+      return 'either position or line must be specified';
+    }
+
+    const side = target.side || 'RIGHT';
+    if (this.positionForLine(target.line, side) === null) {
+      return `line ${target.line} (${side}) is not part of the diff`;
+    }
+    return null;
+  }
+
+  /**
+   * コメント可能な行番号を連続した範囲にまとめる
+   * RIGHT は追加行とコンテキスト行、LEFT は削除行のみ
+   */
+  lineRanges(side: DiffSide): Array<[number, number]> {
+    const ranges: Array<[number, number]> = [];
+    const lines = side === 'LEFT' ? this.oldLines : this.newLines;
+    const positions = side === 'LEFT' ? this.oldPositions : this.newPositions;
+
+    for (let i = 0; i < lines.length; i++) {
+      if (side === 'LEFT' && this.kinds[positions[i] - 1] !== KIND_DELETED) {
+        continue;
+      }
+      const last = ranges[ranges.length - 1];
+      if (last && last[1] + 1 === lines[i]) {
+        last[1] = lines[i];
+      } else {
+        ranges.push([lines[i], lines[i]]);
+      }
+    }
+
+    return ranges;
+  }
+}
+
+const patch = `@@ -1,3 +1,4 @@
+ function test() {
+-  console.log('old');
++  console.log('new');
++  console.log('added');
+ }
+@@ -20,2 +21,3 @@ function other() {
+   return 1;
++  // trailing
+ }`;
+
+describe('Diff position index', () => {
+  const index = DiffIndex.build(patch);
+
+  it('should number positions the way GitHub documents them', () => {
+    // GitHub: "The line just below the "@@" line is position 1, the next line is position 2,
+    // and so on. The position in the diff continues to increase through lines of whitespace
+    // and additional hunks until the beginning of a new file."
+    const documented = DiffIndex.build(`diff --git a/app.rb b/app.rb
+index 1111111..2222222 100644
+--- a/app.rb
++++ b/app.rb
+@@ -1,4 +1,5 @@
+ class App
++  VERSION = 1
+
+   def run
+ end
+@@ -10,2 +11,3 @@ class App
+   def stop
++    exit
+   end`);
+
+    expect(documented.positionCount).toBe(9);
+    expect(documented.lineForPosition(1)).toEqual({ line: 1, side: 'RIGHT' });
+    expect(documented.lineForPosition(2)).toEqual({ line: 2, side: 'RIGHT' });
+    expect(documented.lineForPosition(3)).toEqual({ line: 3, side: 'RIGHT' });
+    expect(documented.lineForPosition(6)).toBeNull();
+    expect(documented.lineForPosition(8)).toEqual({ line: 12, side: 'RIGHT' });
+    expect(documented.addedPositions()).toEqual([2, 8]);
+  });
+
+  describe('positionForLine', () => {
+    it('should map new line numbers to positions on the RIGHT side', () => {
+      expect(index.positionForLine(1)).toBe(1);
+      expect(index.positionForLine(2, 'RIGHT')).toBe(3);
+      expect(index.positionForLine(3)).toBe(4);
+      expect(index.positionForLine(4)).toBe(5);
+      expect(index.positionForLine(22)).toBe(8);
+    });
+
+    it('should map old line numbers to positions on the LEFT side', () => {
+      expect(index.positionForLine(2, 'LEFT')).toBe(2);
+      expect(index.positionForLine(20, 'LEFT')).toBe(7);
+      expect(index.positionForLine(21, 'LEFT')).toBe(9);
+    });
+
+    it('should return null for lines outside every hunk', () => {
+      expect(index.positionForLine(10)).toBeNull();
+      expect(index.positionForLine(4, 'LEFT')).toBeNull();
+      expect(index.positionForLine(0)).toBeNull();
+    });
+  });
+
+  describe('lineForPosition', () => {
+    it('should map positions back to line numbers', () => {
+      expect(index.lineForPosition(1)).toEqual({ line: 1, side: 'RIGHT' });
+      expect(index.lineForPosition(2)).toEqual({ line: 2, side: 'LEFT' });
+      expect(index.lineForPosition(3)).toEqual({ line: 2, side: 'RIGHT' });
+      expect(index.lineForPosition(8)).toEqual({ line: 22, side: 'RIGHT' });
+    });
+
+    it('should return null for hunk headers and out-of-range positions', () => {
+      expect(index.lineForPosition(6)).toBeNull();
+      expect(index.lineForPosition(0)).toBeNull();
+      expect(index.lineForPosition(10)).toBeNull();
+    });
+
+    it('should round-trip every line in the diff', () => {
+      for (let position = 1; position <= index.positionCount; position++) {
+        const target = index.lineForPosition(position);
+        if (target) {
+          expect(index.positionForLine(target.line, target.side)).toBe(position);
+        }
+      }
+    });
+  });
+
+  it('should list the positions of added lines', () => {
+    expect(index.addedPositions()).toEqual([3, 4, 8]);
+    expect(DiffIndex.build(`diff --git a/test.txt b/test.txt
+--- a/test.txt
++++ b/test.txt
+@@ -1,2 +1,3 @@
+ existing line
++new line`).addedPositions()).toEqual([2]);
+    expect(DiffIndex.build("@@ -1,2 +1,3 @@\r\n existing\r\n+added\r\n context").addedPositions()).toEqual([2]);
+  });
+
+  it('should count "no newline" markers as positions without line numbers', () => {
+    const noNewline = DiffIndex.build(`@@ -1,2 +1,2 @@
+ first
+-second
+\\ No newline at end of file
++second
+\\ No newline at end of file`);
+
+    expect(noNewline.positionForLine(2)).toBe(4);
+    expect(noNewline.lineForPosition(3)).toBeNull();
+    expect(noNewline.validate({ position: 3 })).toContain('No newline at end of file');
+  });
+
+  it('should group commentable lines into ranges', () => {
+    expect(index.lineRanges('RIGHT')).toEqual([[1, 4], [21, 23]]);
+    expect(index.lineRanges('LEFT')).toEqual([[2, 2]]);
+  });
+
+  describe('validate', () => {
+    it('should accept positions inside the diff', () => {
+      expect(index.validate({ position: 1 })).toBeNull();
+      expect(index.validate({ position: 3 })).toBeNull();
+      expect(index.validate({ position: 9 })).toBeNull();
+    });
+
+    it('should reject positions outside the diff', () => {
+      expect(index.validate({ position: 0 })).toContain('outside the diff');
+      expect(index.validate({ position: 10 })).toBe('position 10 is outside the diff (valid range: 1-9)');
+    });
+
+    it('should reject positions pointing to hunk headers', () => {
+      expect(index.validate({ position: 6 })).toContain('hunk header');
+    });
+
+    it('should accept added and context lines on the RIGHT side', () => {
+      expect(index.validate({ line: 1 })).toBeNull();
+      expect(index.validate({ line: 2, side: 'RIGHT' })).toBeNull();
+      expect(index.validate({ line: 3 })).toBeNull();
+      expect(index.validate({ line: 22 })).toBeNull();
+    });
+
+    it('should accept deleted lines on the LEFT side', () => {
+      expect(index.validate({ line: 2, side: 'LEFT' })).toBeNull();
+      expect(index.validate({ line: 20, side: 'LEFT' })).toBeNull();
+    });
+
+    it('should reject lines outside any hunk', () => {
+      expect(index.validate({ line: 10 })).toContain('not part of the diff');
+      expect(index.validate({ line: 4, side: 'LEFT' })).toContain('not part of the diff');
+    });
+
+    it('should reject files without a patch', () => {
+      expect(DiffIndex.build(undefined).validate({ line: 1 })).toContain('no textual diff');
+    });
+
+    it('should require either position or line', () => {
+      expect(index.validate({})).toContain('either position or line');
+    });
+  });
+});
@@ -0,0 +1,287 @@
+// diff ストリーム分割のユニットテスト
+
+import { StringDecoder } from 'string_decoder';
+
+// Mock fetch globally
+global.fetch = jest.fn() as jest.MockedFunction<typeof fetch>;
+process.env.GITHUB_PERSONAL_ACCESS_TOKEN = 'test-token-123';
+
+interface DiffFileSegment {
+  path: string;
+  text: string;
+  bytes: number;
+  truncated: boolean;
+  omittedBytes: number;
+  additions: number;
+  deletions: number;
+}
+
+// Diff splitting logic (extracted from source)
+// 1行がこれを超える場合（minify されたファイルなど）は行全体を保持せず、バイト数のみ集計する
+const MAX_PENDING_LINE_CHARS = 1024 * 1024;
+
+interface SplitDiffOptions {
+  // ファイルごとに保持する本文の上限バイト数
+  maxBytesPerFile: number;
+  // 本文を保持するファイルを選択（false の場合は統計のみ集計）
+  select?: (path: string) => boolean;
+}
+
+interface SegmentBuilder {
+  path: string;
+  lines: string[];
+  keptBytes: number;
+  bytes: number;
+  truncated: boolean;
+  selected: boolean;
+  inHunk: boolean;
+  additions: number;
+  deletions: number;
+}
+
+/**
+ * diff ストリームを読み込みながら `diff --git` 単位のセグメントを順に返す
+ * 保持するのは処理中の1ファイル分（上限バイト数まで）と未完の1行のみ
+ */
+async function* splitDiffByFile(
+  source: AsyncIterable<Buffer | string>,
+  options: SplitDiffOptions
+): AsyncGenerator<DiffFileSegment, void, undefined> {
+  const decoder = new StringDecoder('utf8');
+  const select = options.select || (() => true);
+  const state: { current: SegmentBuilder | null } = { current: null };
+  let partial = '';
+
+  const finish = (builder: SegmentBuilder): DiffFileSegment => ({
+    path: builder.path,
+    text: builder.lines.join('\n'),
+    bytes: builder.bytes,
+    truncated: builder.truncated,
+    omittedBytes: builder.selected ? builder.bytes - builder.keptBytes : builder.bytes,
+    additions: builder.additions,
+    deletions: builder.deletions,
+  });
+
+  const start = (header: string): SegmentBuilder => {
+    const match = header.match(/^diff --git a\/(.+) b\/(.+)$/);
+    const path = match ? match[2] : header.slice('diff --git '.length);
+    return {
+      path,
+      lines: [],
+      keptBytes: 0,
+      bytes: 0,
+      truncated: false,
+      selected: select(path),
+      inHunk: false,
+      additions: 0,
+      deletions: 0,
+    };
+  };
+
+  const countLine = (builder: SegmentBuilder, line: string) => {
+    if (line.startsWith('@@')) {
+      builder.inHunk = true;
+    } else if (builder.inHunk) {
+      if (line.startsWith('+')) {
+        builder.additions++;
+      } else if (line.startsWith('-')) {
+        builder.deletions++;
+      }
+    }
+  };
+
+  const append = (builder: SegmentBuilder, line: string) => {
+    const lineBytes = Buffer.byteLength(line, 'utf8') + 1;
+    builder.bytes += lineBytes;
+    countLine(builder, line);
+
+    if (!builder.selected || builder.truncated) {
+      return;
+    }
+    if (builder.keptBytes + lineBytes > options.maxBytesPerFile) {
+      builder.truncated = true;
+      return;
+    }
+    builder.lines.push(line);
+    builder.keptBytes += lineBytes;
+  };
+
+  const processLine = function* (rawLine: string): Generator<DiffFileSegment> {
+    const line = rawLine.endsWith('\r') ? rawLine.slice(0, -1) : rawLine;
+
+    if (line.startsWith('diff --git ')) {
+      if (state.current) {
+        yield finish(state.current);
+      }
+      state.current = start(line);
+    }
+
+    if (state.current) {
+      append(state.current, line);
+    }
+  };
+
+  // 長すぎる行はバイト数のみ加算し、本文は切り捨て扱いにする
+  const skipOverflow = (text: string) => {
+    if (state.current) {
+      state.current.bytes += Buffer.byteLength(text, 'utf8');
+      if (state.current.selected) {
+        state.current.truncated = true;
+      }
+    }
+  };
+  let skippingLongLine = false;
+
+  for await (const chunk of source) {
+    let text = typeof chunk === 'string' ? chunk : decoder.write(chunk);
+
+    if (skippingLongLine) {
+      const newline = text.indexOf('\n');
+      if (newline < 0) {
+        skipOverflow(text);
+        continue;
+      }
+      skipOverflow(text.slice(0, newline + 1));
+      text = text.slice(newline + 1);
+      skippingLongLine = false;
+    }
+
+    const lines = (partial + text).split('\n');
+    partial = lines.pop() ?? '';
+
+    for (const line of lines) {
+      yield* processLine(line);
+    }
+
+    if (partial.length > MAX_PENDING_LINE_CHARS) {
+      if (state.current) {
+        countLine(state.current, partial);
+      }
+      skipOverflow(partial);
+      partial = '';
+      skippingLongLine = true;
+    }
+  }
+
+  const rest = partial + decoder.end();
+  if (rest !== '' && !skippingLongLine) {
+    yield* processLine(rest);
+  }
+  if (state.current) {
+    yield finish(state.current);
+  }
+}
+
+async function* chunksOf(data: Buffer, size: number): AsyncGenerator<Buffer> {
+  for (let i = 0; i < data.length; i += size) {
+    yield data.subarray(i, i + size);
+  }
+}
+
+async function collect(source: AsyncIterable<Buffer | string>, maxBytesPerFile: number, select?: (path: string) => boolean) {
+  const segments: DiffFileSegment[] = [];
+  for await (const segment of splitDiffByFile(source, { maxBytesPerFile, select })) {
+    segments.push(segment);
+  }
+  return segments;
+}
+
+const sampleDiff = `diff --git a/src/app.ts b/src/app.ts
+index 1111111..2222222 100644
+--- a/src/app.ts
++++ b/src/app.ts
+@@ -1,3 +1,4 @@
+ const a = 1;
+-const b = 2;
++const b = 3;
++const c = 4;
+ export { a };
+diff --git a/package-lock.json b/package-lock.json
+index 3333333..4444444 100644
+--- a/package-lock.json
++++ b/package-lock.json
+@@ -10,2 +10,2 @@
+-  "version": "1.0.0"
++  "version": "1.0.1"
+`;
+
+describe('Diff stream splitting', () => {
+  it('should split a diff into per-file segments', async () => {
+    const segments = await collect(chunksOf(Buffer.from(sampleDiff), 7), 100000);
+
+    expect(segments.map(s => s.path)).toEqual(['src/app.ts', 'package-lock.json']);
+    expect(segments[0].text.startsWith('diff --git a/src/app.ts b/src/app.ts')).toBe(true);
+    expect(segments[0].additions).toBe(2);
+    expect(segments[0].deletions).toBe(1);
+    expect(segments[1].additions).toBe(1);
+    expect(segments[1].deletions).toBe(1);
+  });
+
+  it('should not count ---/+++ file headers as changes', async () => {
+    const segments = await collect(chunksOf(Buffer.from(sampleDiff), 1024), 100000);
+    expect(segments[1].text).toContain('+++ b/package-lock.json');
+    expect(segments[1].additions).toBe(1);
+  });
+
+  it('should truncate files over the byte cap and report omitted bytes', async () => {
+    const segments = await collect(chunksOf(Buffer.from(sampleDiff), 16), 60);
+
+    expect(segments[0].truncated).toBe(true);
+    expect(Buffer.byteLength(segments[0].text) + 1).toBeLessThanOrEqual(60);
+    expect(segments[0].omittedBytes).toBe(segments[0].bytes - Buffer.byteLength(segments[0].text) - 1);
+  });
+
+  it('should only keep text for selected files but still count stats', async () => {
+    const segments = await collect(
+      chunksOf(Buffer.from(sampleDiff), 5),
+      100000,
+      path => !path.endsWith('.json')
+    );
+
+    expect(segments[0].text).not.toBe('');
+    expect(segments[1].text).toBe('');
+    expect(segments[1].truncated).toBe(false);
+    expect(segments[1].additions).toBe(1);
+    expect(segments[1].omittedBytes).toBe(segments[1].bytes);
+  });
+
+  it('should decode multibyte characters split across chunks', async () => {
+    const diff = `diff --git a/README.md b/README.md
+@@ -1 +1 @@
+-こんにちは
++こんばんは
+`;
+    const segments = await collect(chunksOf(Buffer.from(diff), 1), 100000);
+
+    expect(segments[0].text).toContain('+こんばんは');
+    expect(segments[0].text).toContain('-こんにちは');
+  });
+
+  it('should skip an oversized line without buffering it and keep parsing the next file', async () => {
+    const minified = `diff --git a/dist/app.min.js b/dist/app.min.js
+--- a/dist/app.min.js
++++ b/dist/app.min.js
+@@ -1 +1,2 @@
+-old
++${'x'.repeat(MAX_PENDING_LINE_CHARS * 2)}
++tail
+`;
+    const segments = await collect(chunksOf(Buffer.from(minified + sampleDiff), 64 * 1024), 100000);
+
+    expect(segments.map(s => s.path)).toEqual(['dist/app.min.js', 'src/app.ts', 'package-lock.json']);
+    expect(segments[0].truncated).toBe(true);
+    expect(segments[0].bytes).toBe(Buffer.byteLength(minified));
+    expect(segments[0].additions).toBe(2);
+    expect(segments[0].deletions).toBe(1);
+    expect(segments[0].text).not.toContain('xxxx');
+    expect(segments[0].text).not.toContain('+tail');
+    expect(segments[1].text.startsWith('diff --git a/src/app.ts b/src/app.ts')).toBe(true);
+    expect(segments[1].additions).toBe(2);
+    expect(segments[2].additions).toBe(1);
+  });
+
+  it('should return no segments for an empty diff', async () => {
+    const segments = await collect(chunksOf(Buffer.from(''), 10), 100000);
+    expect(segments).toEqual([]);
+  });
+});
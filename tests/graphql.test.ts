@@ -0,0 +1,203 @@
+// GraphQL 一括取得のユニットテスト
+
+// Mock fetch globally
+global.fetch = jest.fn() as jest.MockedFunction<typeof fetch>;
+process.env.GITHUB_PERSONAL_ACCESS_TOKEN = 'test-token-123';
+
+interface GraphQLError {
+  message: string;
+  type?: string;
+  path?: Array<string | number>;
+}
+
+// Aliased multi-repository query builder (extracted from source)
+function buildOpenPullRequestsQuery(repositoryCount: number): string {
+  const variables: string[] = ['$limit: Int!'];
+  const fields: string[] = [];
+
+  for (let i = 0; i < repositoryCount; i++) {
+    variables.push(`$owner${i}: String!`, `$name${i}: String!`);
+    fields.push(`  r${i}: repository(owner: $owner${i}, name: $name${i}) { ...OpenPullRequests }`);
+  }
+
+  return `
+query OpenPullRequests(${variables.join(', ')}) {
+${fields.join('\n')}
+}
+
+fragment OpenPullRequests on Repository {
+  pullRequests(states: OPEN, first: $limit, orderBy: { field: CREATED_AT, direction: DESC }) {
+    totalCount
+    nodes {
+      number
+      title
+      url
+      createdAt
+      author { login }
+      headRefName
+      baseRefName
+      headRepositoryOwner { login }
+      reviewRequests(first: 20) {
+        nodes {
+          requestedReviewer {
+            ... on User { login }
+            ... on Team { slug }
+          }
+        }
+      }
+    }
+  }
+}`;
+}
+
+// Per-repository error mapping (extracted from source)
+function mapRepositoryResults(
+  repositories: Array<{ owner: string; repo: string }>,
+  data: Record<string, { pullRequests: { totalCount: number; nodes: unknown[] } } | null>,
+  errors: GraphQLError[] = []
+) {
+  return repositories.map(({ owner, repo }, i) => {
+    const result = data[`r${i}`];
+    if (!result) {
+      const repoErrors = errors.filter(error => error.path?.[0] === `r${i}`);
+      return {
+        owner,
+        repo,
+        pullRequests: [] as unknown[],
+        totalCount: 0,
+        error: repoErrors.map(error => error.message).join('; ') || 'repository not found',
+      };
+    }
+    return {
+      owner,
+      repo,
+      pullRequests: result.pullRequests.nodes,
+      totalCount: result.pullRequests.totalCount,
+    };
+  });
+}
+
+// GraphQL endpoint derivation (extracted from source)
+function getApiBaseUrl(env: NodeJS.ProcessEnv = process.env): string {
+  if (env.GITHUB_API_URL) {
+    return env.GITHUB_API_URL.replace(/\/+$/, '');
+  }
+
+  const host = env.GH_HOST;
+  if (!host || host === 'github.com') {
+    return 'https://api.github.com';
+  }
+  return /\.ghe\.com$/.test(host) ? `https://api.${host}` : `https://${host}/api/v3`;
+}
+
+function getGraphQLUrl(env: NodeJS.ProcessEnv = process.env): string {
+  const baseUrl = getApiBaseUrl(env);
+  return /\/api\/v3$/.test(baseUrl)
+    ? baseUrl.replace(/\/api\/v3$/, '/api/graphql')
+    : `${baseUrl}/graphql`;
+}
+
+// GraphQL rate limit detection (extracted from source)
+function isGraphQLRateLimited(response: { status: number; data?: unknown }): boolean {
+  if (response.status < 200 || response.status >= 300) {
+    return false;
+  }
+  const errors = (response.data as { errors?: unknown } | null | undefined)?.errors;
+  return Array.isArray(errors) && errors.some((error) => (error as { type?: unknown } | null)?.type === 'RATE_LIMITED');
+}
+
+describe('GraphQL bulk fetch', () => {
+  describe('buildOpenPullRequestsQuery', () => {
+    it('should declare variables and an alias for every repository', () => {
+      const query = buildOpenPullRequestsQuery(3);
+
+      expect(query).toContain('query OpenPullRequests($limit: Int!, $owner0: String!, $name0: String!');
+      expect(query).toContain('$owner2: String!, $name2: String!)');
+      expect(query).toContain('r0: repository(owner: $owner0, name: $name0) { ...OpenPullRequests }');
+      expect(query).toContain('r2: repository(owner: $owner2, name: $name2) { ...OpenPullRequests }');
+      expect(query).not.toContain('r3:');
+    });
+
+    it('should request open pull requests newest first', () => {
+      const query = buildOpenPullRequestsQuery(1);
+
+      expect(query).toContain('fragment OpenPullRequests on Repository');
+      expect(query).toContain('pullRequests(states: OPEN, first: $limit, orderBy: { field: CREATED_AT, direction: DESC })');
+    });
+  });
+
+  describe('mapRepositoryResults', () => {
+    const repositories = [
+      { owner: 'octo', repo: 'app' },
+      { owner: 'octo', repo: 'missing' },
+    ];
+
+    it('should keep results for readable repositories', () => {
+      const results = mapRepositoryResults(repositories, {
+        r0: { pullRequests: { totalCount: 12, nodes: [{ number: 1 }, { number: 2 }] } },
+        r1: { pullRequests: { totalCount: 0, nodes: [] } },
+      });
+
+      expect(results[0].totalCount).toBe(12);
+      expect(results[0].pullRequests).toHaveLength(2);
+      expect(results[1].error).toBeUndefined();
+    });
+
+    it('should attach errors to the repository they belong to', () => {
+      const results = mapRepositoryResults(
+        repositories,
+        { r0: { pullRequests: { totalCount: 1, nodes: [{ number: 1 }] } }, r1: null },
+        [{ message: "Could not resolve to a Repository with the name 'octo/missing'.", path: ['r1'] }]
+      );
+
+      expect(results[0].error).toBeUndefined();
+      expect(results[1].error).toContain('Could not resolve');
+      expect(results[1].pullRequests).toEqual([]);
+    });
+
+    it('should fall back to a generic reason when no error matches', () => {
+      const results = mapRepositoryResults(repositories, { r0: null, r1: null });
+      expect(results[0].error).toBe('repository not found');
+    });
+  });
+
+  describe('getGraphQLUrl', () => {
+    const original = process.env.GITHUB_API_URL;
+    afterEach(() => {
+      if (original === undefined) {
+        delete process.env.GITHUB_API_URL;
+      } else {
+        process.env.GITHUB_API_URL = original;
+      }
+    });
+
+    it('should use /graphql on github.com', () => {
+      delete process.env.GITHUB_API_URL;
+      expect(getGraphQLUrl({})).toBe('https://api.github.com/graphql');
+      process.env.GITHUB_API_URL = 'https://api.github.com/';
+      expect(getGraphQLUrl()).toBe('https://api.github.com/graphql');
+    });
+
+    it('should use /api/graphql on GitHub Enterprise Server', () => {
+      process.env.GITHUB_API_URL = 'https://ghes.example.com/api/v3';
+      expect(getGraphQLUrl()).toBe('https://ghes.example.com/api/graphql');
+      process.env.GITHUB_API_URL = 'https://ghes.example.com/api/v3/';
+      expect(getGraphQLUrl()).toBe('https://ghes.example.com/api/graphql');
+    });
+  });
+
+  describe('isGraphQLRateLimited', () => {
+    it('should detect RATE_LIMITED errors returned with HTTP 200', () => {
+      const errors: GraphQLError[] = [{ type: 'RATE_LIMITED', message: 'API rate limit exceeded for user ID 1.' }];
+      expect(isGraphQLRateLimited({ status: 200, data: { data: null, errors } })).toBe(true);
+    });
+
+    it('should ignore other errors and non-2xx responses', () => {
+      const errors: GraphQLError[] = [{ type: 'NOT_FOUND', message: 'Could not resolve to a Repository', path: ['r0'] }];
+      expect(isGraphQLRateLimited({ status: 200, data: { data: { r0: null }, errors } })).toBe(false);
+      expect(isGraphQLRateLimited({ status: 200, data: { data: {} } })).toBe(false);
+      expect(isGraphQLRateLimited({ status: 200, data: 'not json' })).toBe(false);
+      expect(isGraphQLRateLimited({ status: 502, data: { errors: [{ type: 'RATE_LIMITED' }] } })).toBe(false);
+    });
+  });
+});
@@ -0,0 +1,58 @@
+// HTTP クライアントのリダイレクト処理のユニットテスト
+
+// Mock fetch globally
+global.fetch = jest.fn() as jest.MockedFunction<typeof fetch>;
+process.env.GITHUB_PERSONAL_ACCESS_TOKEN = 'test-token-123';
+
+interface HttpRequestOptions {
+  method?: string;
+  headers?: Record<string, string>;
+  body?: string;
+}
+
+// Redirect request rewriting (extracted from source)
+function redirectOptions(options: HttpRequestOptions, status: number, from: URL, to: URL): HttpRequestOptions {
+  const method = (options.method || 'GET').toUpperCase();
+  const toGet = status === 303 || ((status === 301 || status === 302) && method === 'POST');
+  const headers = { ...options.headers };
+
+  if (from.origin !== to.origin) {
+    for (const name of Object.keys(headers)) {
+      if (name.toLowerCase() === 'authorization') {
+        delete headers[name];
+      }
+    }
+  }
+
+  return toGet
+    ? { method: method === 'HEAD' ? 'HEAD' : 'GET', headers }
+    : { ...options, headers };
+}
+
+describe('HTTP client redirects', () => {
+  const from = new URL('https://api.github.com/repos/octo/old-name/pulls/1');
+  const sameOrigin = new URL('https://api.github.com/repositories/42/pulls/1');
+  const otherOrigin = new URL('https://codeload.github.com/octo/app');
+  const auth = { Authorization: 'Bearer token', Accept: 'application/vnd.github.v3+json' };
+
+  test('should keep method, body and credentials for 307/308 on the same origin', () => {
+    const options = { method: 'PATCH', headers: auth, body: '{"title":"x"}' };
+    expect(redirectOptions(options, 307, from, sameOrigin)).toEqual(options);
+    expect(redirectOptions(options, 308, from, sameOrigin)).toEqual(options);
+  });
+
+  test('should keep GET for a renamed repository (301)', () => {
+    expect(redirectOptions({ headers: auth }, 301, from, sameOrigin)).toEqual({ headers: auth });
+  });
+
+  test('should switch POST to GET without a body for 301/302/303', () => {
+    const options = { method: 'POST', headers: auth, body: '{}' };
+    expect(redirectOptions(options, 302, from, sameOrigin)).toEqual({ method: 'GET', headers: auth });
+    expect(redirectOptions({ ...options, method: 'PUT' }, 303, from, sameOrigin)).toEqual({ method: 'GET', headers: auth });
+  });
+
+  test('should drop Authorization when redirected to another origin', () => {
+    const result = redirectOptions({ headers: auth }, 302, from, otherOrigin);
+    expect(result.headers).toEqual({ Accept: 'application/vnd.github.v3+json' });
+  });
+});
@@ -0,0 +1,172 @@
+// メトリクス集計のユニットテスト
+
+// Mock fetch globally
+global.fetch = jest.fn() as jest.MockedFunction<typeof fetch>;
+process.env.GITHUB_PERSONAL_ACCESS_TOKEN = 'test-token-123';
+
+// Metrics (extracted from source)
+const MAX_SAMPLES = 1024;
+
+interface SpanEntry {
+  samples: number[];
+  next: number;
+  count: number;
+  errors: number;
+  totalMs: number;
+  maxMs: number;
+}
+
+function percentile(sorted: number[], ratio: number): number {
+  if (sorted.length === 0) {
+    return 0;
+  }
+  const rank = Math.ceil(ratio * sorted.length) - 1;
+  return sorted[Math.min(Math.max(rank, 0), sorted.length - 1)];
+}
+
+function normalizeRoute(path: string): string {
+  const queryIndex = path.indexOf('?');
+  const pathname = queryIndex >= 0 ? path.slice(0, queryIndex) : path;
+  return pathname
+    .replace(/^\/repos\/[^/]+\/[^/]+/, '/repos/:owner/:repo')
+    .replace(/\/\d+(?=\/|$)/g, '/:number');
+}
+
+function round(value: number): number {
+  return Math.round(value * 100) / 100;
+}
+
+class Metrics {
+  private readonly counters = new Map<string, number>();
+  private readonly spans = new Map<string, SpanEntry>();
+
+  increment(name: string, value: number = 1): void {
+    this.counters.set(name, (this.counters.get(name) || 0) + value);
+  }
+
+  async time<T>(name: string, fn: () => Promise<T>): Promise<T> {
+    const start = process.hrtime.bigint();
+    const end = (error: boolean = false) => this.record(name, Number(process.hrtime.bigint() - start) / 1e6, error);
+    try {
+      const result = await fn();
+      end();
+      return result;
+    } catch (error) {
+      end(true);
+      throw error;
+    }
+  }
+
+  snapshot() {
+    const spans: Record<string, any> = {};
+    for (const [name, entry] of this.spans) {
+      const sorted = [...entry.samples].sort((a, b) => a - b);
+      spans[name] = {
+        count: entry.count,
+        errors: entry.errors,
+        totalMs: round(entry.totalMs),
+        maxMs: round(entry.maxMs),
+        p50Ms: round(percentile(sorted, 0.5)),
+        p99Ms: round(percentile(sorted, 0.99)),
+      };
+    }
+    return { counters: Object.fromEntries(this.counters), spans };
+  }
+
+  record(name: string, durationMs: number, error: boolean): void {
+    let entry = this.spans.get(name);
+    if (!entry) {
+      entry = { samples: [], next: 0, count: 0, errors: 0, totalMs: 0, maxMs: 0 };
+      this.spans.set(name, entry);
+    }
+
+    if (entry.samples.length < MAX_SAMPLES) {
+      entry.samples.push(durationMs);
+    } else {
+      entry.samples[entry.next] = durationMs;
+      entry.next = (entry.next + 1) % MAX_SAMPLES;
+    }
+    entry.count++;
+    entry.totalMs += durationMs;
+    entry.maxMs = Math.max(entry.maxMs, durationMs);
+    if (error) {
+      entry.errors++;
+    }
+  }
+}
+
+describe('Metrics', () => {
+  describe('percentile', () => {
+    test('should use the nearest rank', () => {
+      const sorted = Array.from({ length: 100 }, (_, i) => i + 1);
+      expect(percentile(sorted, 0.5)).toBe(50);
+      expect(percentile(sorted, 0.99)).toBe(99);
+      expect(percentile([7], 0.99)).toBe(7);
+    });
+
+    test('should return 0 for no samples', () => {
+      expect(percentile([], 0.5)).toBe(0);
+    });
+  });
+
+  describe('normalizeRoute', () => {
+    test('should replace owner, repository and numbers', () => {
+      expect(normalizeRoute('/repos/octo/app/pulls/12/files?page=2')).toBe('/repos/:owner/:repo/pulls/:number/files');
+      expect(normalizeRoute('/repos/octo/app/issues/3/comments')).toBe('/repos/:owner/:repo/issues/:number/comments');
+    });
+
+    test('should keep routes without parameters', () => {
+      expect(normalizeRoute('/user')).toBe('/user');
+      expect(normalizeRoute('/graphql')).toBe('/graphql');
+    });
+  });
+
+  describe('spans and counters', () => {
+    test('should aggregate counts, errors and percentiles', () => {
+      const metrics = new Metrics();
+      for (let i = 1; i <= 100; i++) {
+        metrics.record('tool get pull request diff', i, i % 10 === 0);
+      }
+      metrics.increment('api.requests');
+      metrics.increment('http.bytes_received', 2048);
+
+      const snapshot = metrics.snapshot();
+      expect(snapshot.counters).toEqual({ 'api.requests': 1, 'http.bytes_received': 2048 });
+      expect(snapshot.spans['tool get pull request diff']).toEqual({
+        count: 100,
+        errors: 10,
+        totalMs: 5050,
+        maxMs: 100,
+        p50Ms: 50,
+        p99Ms: 99,
+      });
+    });
+
+    test('should keep only the most recent samples for percentiles', () => {
+      const metrics = new Metrics();
+      for (let i = 0; i < MAX_SAMPLES; i++) {
+        metrics.record('slow', 1000, false);
+      }
+      for (let i = 0; i < MAX_SAMPLES; i++) {
+        metrics.record('slow', 1, false);
+      }
+
+      const span = metrics.snapshot().spans['slow'];
+      expect(span.count).toBe(MAX_SAMPLES * 2);
+      expect(span.maxMs).toBe(1000);
+      expect(span.p99Ms).toBe(1);
+    });
+
+    test('should record failed operations as errors and rethrow', async () => {
+      const metrics = new Metrics();
+      await expect(metrics.time('api GET /user', async () => {
+        throw new Error('Bad credentials');
+      })).rejects.toThrow('Bad credentials');
+      await expect(metrics.time('api GET /user', async () => 'ok')).resolves.toBe('ok');
+
+      const span = metrics.snapshot().spans['api GET /user'];
+      expect(span.count).toBe(2);
+      expect(span.errors).toBe(1);
+    });
+  });
+});
@@ -0,0 +1,126 @@
+// ページネーション処理のユニットテスト
+
+// Mock fetch globally
+global.fetch = jest.fn() as jest.MockedFunction<typeof fetch>;
+process.env.GITHUB_PERSONAL_ACCESS_TOKEN = 'test-token-123';
+
+// Link header parsing logic (extracted from source)
+function parseLinkHeader(header: string | undefined): Record<string, string> {
+  const links: Record<string, string> = {};
+
+  if (!header) {
+    return links;
+  }
+
+  for (const part of header.split(',')) {
+    const match = part.match(/<([^>]+)>\s*;\s*rel="([^"]+)"/);
+    if (match) {
+      links[match[2]] = match[1];
+    }
+  }
+
+  return links;
+}
+
+// Ordered, concurrency-limited page fetching (extracted from source)
+async function* fetchPagesInOrder<T>(
+  pageUrls: string[],
+  concurrency: number,
+  fetchPage: (url: string) => Promise<T[]>
+): AsyncGenerator<T[]> {
+  const inFlight: Array<Promise<T[]>> = [];
+  let nextIndex = 0;
+  const launch = () => {
+    const promise = fetchPage(pageUrls[nextIndex++]);
+    promise.catch(() => undefined);
+    inFlight.push(promise);
+  };
+
+  while (inFlight.length < concurrency && nextIndex < pageUrls.length) {
+    launch();
+  }
+
+  while (inFlight.length > 0) {
+    const page = await inFlight.shift()!;
+    if (nextIndex < pageUrls.length) {
+      launch();
+    }
+    yield page;
+  }
+}
+
+const sampleLinkHeader =
+  '<https://api.github.com/repositories/1/pulls/5/files?per_page=100&page=2>; rel="next", ' +
+  '<https://api.github.com/repositories/1/pulls/5/files?per_page=100&page=30>; rel="last"';
+
+describe('Pagination', () => {
+  describe('parseLinkHeader', () => {
+    it('should parse next and last links', () => {
+      const links = parseLinkHeader(sampleLinkHeader);
+
+      expect(links.next).toBe('https://api.github.com/repositories/1/pulls/5/files?per_page=100&page=2');
+      expect(links.last).toBe('https://api.github.com/repositories/1/pulls/5/files?per_page=100&page=30');
+    });
+
+    it('should return empty object for missing header', () => {
+      expect(parseLinkHeader(undefined)).toEqual({});
+      expect(parseLinkHeader('')).toEqual({});
+    });
+
+    it('should parse prev and first links on the last page', () => {
+      const links = parseLinkHeader(
+        '<https://api.github.com/x?page=1>; rel="first", <https://api.github.com/x?page=29>; rel="prev"'
+      );
+
+      expect(links.first).toBe('https://api.github.com/x?page=1');
+      expect(links.prev).toBe('https://api.github.com/x?page=29');
+      expect(links.next).toBeUndefined();
+    });
+
+    it('should allow building page URLs from the last link', () => {
+      const links = parseLinkHeader(sampleLinkHeader);
+      const lastPage = parseInt(new URL(links.last).searchParams.get('page') || '', 10);
+      const url = new URL(links.last);
+      url.searchParams.set('page', '7');
+
+      expect(lastPage).toBe(30);
+      expect(url.toString()).toBe('https://api.github.com/repositories/1/pulls/5/files?per_page=100&page=7');
+    });
+  });
+
+  describe('fetchPagesInOrder', () => {
+    it('should yield pages in order even when they resolve out of order', async () => {
+      const delays: Record<string, number> = { p2: 30, p3: 5, p4: 15 };
+      const fetchPage = (url: string) =>
+        new Promise<string[]>(resolve => setTimeout(() => resolve([url]), delays[url]));
+
+      const pages: string[][] = [];
+      for await (const page of fetchPagesInOrder(['p2', 'p3', 'p4'], 2, fetchPage)) {
+        pages.push(page);
+      }
+
+      expect(pages).toEqual([['p2'], ['p3'], ['p4']]);
+    });
+
+    it('should never exceed the concurrency limit', async () => {
+      let active = 0;
+      let maxActive = 0;
+      const fetchPage = async (url: string) => {
+        active++;
+        maxActive = Math.max(maxActive, active);
+        await new Promise(resolve => setTimeout(resolve, 5));
+        active--;
+        return [url];
+      };
+
+      const urls = Array.from({ length: 10 }, (_, i) => `p${i + 2}`);
+      const pages: string[][] = [];
+      for await (const page of fetchPagesInOrder(urls, 3, fetchPage)) {
+        pages.push(page);
+      }
+
+      expect(pages).toHaveLength(10);
+      expect(maxActive).toBeLessThanOrEqual(3);
+    });
+  });
+});
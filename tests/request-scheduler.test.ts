@@ -0,0 +1,783 @@
+// レート制限を考慮したリクエストスケジューラーのユニットテスト
+
+import { PassThrough, Readable } from 'stream';
+
+// Mock fetch globally
+global.fetch = jest.fn() as jest.MockedFunction<typeof fetch>;
+process.env.GITHUB_PERSONAL_ACCESS_TOKEN = 'test-token-123';
+
+const logger = {
+  debug: (..._args: unknown[]) => {},
+  info: (..._args: unknown[]) => {},
+  warn: (..._args: unknown[]) => {},
+};
+
+// Request scheduler (extracted from source)
+interface ScheduledResponse {
+  status: number;
+  headers: Record<string, string>;
+  data?: unknown;
+}
+
+interface ScheduledStreamResponse extends ScheduledResponse {
+  body: Readable;
+}
+
+interface RunOptions {
+  // GitHub のレート制限リソース名 (core / graphql など)
+  resource?: string;
+  // 5xx を再試行してよいか（副作用のある POST などは false）
+  idempotent?: boolean;
+}
+
+interface RateLimitState {
+  limit: number | null;
+  remaining: number | null;
+  used: number | null;
+  resetAt: string | null;
+}
+
+interface SchedulerStatus {
+  active: number;
+  queued: number;
+  maxConcurrent: number;
+  inFlight: number;
+  waitReason: string | null;
+  pausedUntil: string | null;
+  rateLimits: Record<string, RateLimitState>;
+  deduplicated: number;
+  retries: number;
+  throttled: number;
+}
+
+interface RateLimitEntry {
+  limit: number;
+  remaining: number;
+  used: number | null;
+  resetAt: number;
+}
+
+// レート制限の回復待ちの上限（これより長い場合は待たずに送信して GitHub のエラーを返す）
+const MAX_RATE_LIMIT_WAIT_MS = 60_000;
+const BASE_BACKOFF_MS = 1_000;
+const SECONDARY_LIMIT_BACKOFF_MS = 5_000;
+const RETRYABLE_NETWORK_ERRORS = new Set(['ECONNRESET', 'ETIMEDOUT', 'EPIPE', 'EAI_AGAIN']);
+
+/**
+ * GitHub API リクエストの実行を一元管理
+ * - 同一の GET を1つにまとめる (single-flight)
+ * - 同時実行数の上限
+ * - X-RateLimit-Remaining / Reset による事前の流量制御
+ * - 二次レート制限と 5xx に対するジッター付き指数バックオフ
+ */
+class RequestScheduler {
+  private active = 0;
+  private readonly queue: Array<() => void> = [];
+  private readonly inFlight = new Map<string, Promise<unknown>>();
+  private readonly rateLimits = new Map<string, RateLimitEntry>();
+  private pausedUntil = 0;
+  private waitReason: string | null = null;
+  private stats = { deduplicated: 0, retries: 0, throttled: 0 };
+
+  constructor(
+    private readonly maxConcurrent: number = 8,
+    private readonly maxRetries: number = 3,
+    private readonly rateLimitReserve: number = 10
+  ) {}
+
+  /**
+   * 同一キーで実行中のリクエストがあれば、その結果を共有する
+   */
+  async singleFlight<T>(key: string | null, fn: () => Promise<T>): Promise<T> {
+    if (key === null) {
+      return await fn();
+    }
+
+    const existing = this.inFlight.get(key);
+    if (existing) {
+      this.stats.deduplicated++;
+      logger.debug(`Joining in-flight request: ${key}`);
+      return await (existing as Promise<T>);
+    }
+
+    const promise = fn().finally(() => {
+      this.inFlight.delete(key);
+    });
+    this.inFlight.set(key, promise);
+    return await promise;
+  }
+
+  /**
+   * 同時実行数とレート制限を考慮して1回だけ実行（再試行なし）
+   * hold が本文のストリームを返した場合は、そのストリームが終了・破棄されるまで実行枠を保持する
+   */
+  async schedule<T>(
+    fn: () => Promise<T>,
+    resource: string = 'core',
+    hold?: (result: T) => Readable | undefined
+  ): Promise<T> {
+    await this.waitForRateLimit(resource);
+    await this.acquire();
+
+    let result: T;
+    try {
+      result = await fn();
+    } catch (error) {
+      this.release();
+      throw error;
+    }
+
+    const stream = hold?.(result);
+    if (stream && !stream.destroyed) {
+      stream.once('close', () => this.release());
+    } else {
+      this.release();
+    }
+    return result;
+  }
+
+  /**
+   * リクエストを実行し、レート制限ヘッダーを記録して必要に応じて再試行
+   */
+  async run<T extends ScheduledResponse>(send: () => Promise<T>, options: RunOptions = {}): Promise<T> {
+    return await this.execute(send, options);
+  }
+
+  /**
+   * 本文をストリームで返すリクエストを実行（再試行の規則は run と同じ）
+   * 2xx の本文は読み終わるか破棄されるまで実行枠を保持し、大きな diff の同時取得も上限内に収める
+   * 2xx 以外の本文は send の中で data に読み切っておくこと
+   */
+  async runStream<T extends ScheduledStreamResponse>(send: () => Promise<T>, options: RunOptions = {}): Promise<T> {
+    return await this.execute(send, options, (response) =>
+      response.status >= 200 && response.status < 300 ? response.body : undefined
+    );
+  }
+
+  private async execute<T extends ScheduledResponse>(
+    send: () => Promise<T>,
+    options: RunOptions,
+    hold?: (response: T) => Readable | undefined
+  ): Promise<T> {
+    const resource = options.resource || 'core';
+
+    for (let attempt = 0; ; attempt++) {
+      let response: T;
+      try {
+        response = await this.schedule(send, resource, hold);
+      } catch (error) {
+        const code = (error as NodeJS.ErrnoException).code;
+        if (options.idempotent !== false && code && RETRYABLE_NETWORK_ERRORS.has(code) && attempt < this.maxRetries) {
+          const delay = this.backoff(BASE_BACKOFF_MS, attempt);
+          logger.warn(`Network error (${code}), retrying in ${delay}ms (attempt ${attempt + 1}/${this.maxRetries})`);
+          this.stats.retries++;
+          await sleep(delay);
+          continue;
+        }
+        throw error;
+      }
+
+      this.updateRateLimit(response.headers, resource);
+
+      const delay = attempt < this.maxRetries ? this.retryDelay(response, attempt, options.idempotent !== false) : null;
+      if (delay === null) {
+        return response;
+      }
+
+      const reason = isGraphQLRateLimited(response) ? `${response.status} with a GraphQL RATE_LIMITED error` : `${response.status}`;
+      logger.warn(`GitHub API returned ${reason}, retrying in ${delay}ms (attempt ${attempt + 1}/${this.maxRetries})`);
+      this.stats.retries++;
+      await sleep(delay);
+    }
+  }
+
+  /**
+   * 現在のクォータと待ち行列の状態を取得
+   */
+  getStatus(): SchedulerStatus {
+    const rateLimits: Record<string, RateLimitState> = {};
+    for (const [resource, entry] of this.rateLimits) {
+      rateLimits[resource] = {
+        limit: entry.limit,
+        remaining: entry.remaining,
+        used: entry.used,
+        resetAt: new Date(entry.resetAt).toISOString(),
+      };
+    }
+
+    return {
+      active: this.active,
+      queued: this.queue.length,
+      maxConcurrent: this.maxConcurrent,
+      inFlight: this.inFlight.size,
+      waitReason: this.waitReason,
+      pausedUntil: this.pausedUntil > Date.now() ? new Date(this.pausedUntil).toISOString() : null,
+      rateLimits,
+      ...this.stats,
+    };
+  }
+
+  /**
+   * 実行枠を確保（上限に達している場合は空くまで待機）
+   */
+  private async acquire(): Promise<void> {
+    if (this.active < this.maxConcurrent) {
+      this.active++;
+      return;
+    }
+
+    logger.debug(`Request queued (active: ${this.active}, queued: ${this.queue.length + 1})`);
+    await new Promise<void>((resolve) => this.queue.push(resolve));
+  }
+
+  /**
+   * 実行枠を解放し、待機中のリクエストに引き渡す
+   */
+  private release(): void {
+    const next = this.queue.shift();
+    if (next) {
+      next();
+    } else {
+      this.active--;
+    }
+  }
+
+  /**
+   * 二次レート制限による一時停止中、または残りクォータが予備分を下回った場合に待機
+   */
+  private async waitForRateLimit(resource: string): Promise<void> {
+    const now = Date.now();
+    let waitUntil = 0;
+    let reason: string | null = null;
+
+    if (this.pausedUntil > now) {
+      waitUntil = this.pausedUntil;
+      reason = 'backing off after secondary rate limit';
+    }
+
+    const entry = this.rateLimits.get(resource);
+    if (entry && entry.remaining <= this.rateLimitReserve && entry.resetAt > now && entry.resetAt > waitUntil) {
+      waitUntil = entry.resetAt;
+      reason = `${resource} rate limit nearly exhausted (${entry.remaining}/${entry.limit} remaining)`;
+    }
+
+    const waitMs = waitUntil - now;
+    if (waitMs <= 0) {
+      return;
+    }
+    if (waitMs > MAX_RATE_LIMIT_WAIT_MS) {
+      logger.warn(`${reason}; reset is ${Math.ceil(waitMs / 1000)}s away, sending without waiting`);
+      return;
+    }
+
+    logger.info(`Throttling request for ${waitMs}ms: ${reason}`);
+    this.stats.throttled++;
+    this.waitReason = reason;
+    try {
+      await sleep(waitMs);
+    } finally {
+      this.waitReason = null;
+    }
+  }
+
+  /**
+   * レスポンスヘッダーからレート制限の状態を記録
+   */
+  private updateRateLimit(headers: Record<string, string>, fallbackResource: string): void {
+    const remaining = parseInt(headers['x-ratelimit-remaining'] ?? '', 10);
+    const reset = parseInt(headers['x-ratelimit-reset'] ?? '', 10);
+    if (!Number.isFinite(remaining) || !Number.isFinite(reset)) {
+      return;
+    }
+
+    const limit = parseInt(headers['x-ratelimit-limit'] ?? '', 10);
+    const used = parseInt(headers['x-ratelimit-used'] ?? '', 10);
+    this.rateLimits.set(headers['x-ratelimit-resource'] || fallbackResource, {
+      limit: Number.isFinite(limit) ? limit : remaining,
+      remaining,
+      used: Number.isFinite(used) ? used : null,
+      resetAt: reset * 1000,
+    });
+  }
+
+  /**
+   * 再試行までの待機時間を決定（再試行しない場合は null）
+   * GraphQL の RATE_LIMITED は HTTP 200 で返るため、403/429 と同じ規則で扱う
+   */
+  private retryDelay(response: ScheduledResponse, attempt: number, idempotent: boolean): number | null {
+    const { status, headers } = response;
+    const retryAfter = parseInt(headers['retry-after'] ?? '', 10);
+    const graphqlRateLimited = isGraphQLRateLimited(response);
+
+    if (status === 403 || status === 429 || graphqlRateLimited) {
+      // 一次レート制限: リセットまで待機（待ち時間が長すぎる場合は再試行しない）
+      if (headers['x-ratelimit-remaining'] === '0') {
+        const reset = parseInt(headers['x-ratelimit-reset'] ?? '', 10) * 1000;
+        const waitMs = Number.isFinite(reset) ? reset - Date.now() + 1000 : NaN;
+        return waitMs > 0 && waitMs <= MAX_RATE_LIMIT_WAIT_MS ? waitMs : null;
+      }
+
+      // 二次レート制限: Retry-After に従い、無ければ指数バックオフ
+      const body = typeof response.data === 'string' ? response.data : JSON.stringify(response.data ?? '');
+      if (Number.isFinite(retryAfter) || graphqlRateLimited || /secondary rate limit|abuse/i.test(body)) {
+        const delay = Number.isFinite(retryAfter)
+          ? retryAfter * 1000
+          : this.backoff(SECONDARY_LIMIT_BACKOFF_MS, attempt);
+        if (delay > MAX_RATE_LIMIT_WAIT_MS) {
+          return null;
+        }
+        // 他のリクエストも同じ時間だけ停止させる
+        this.pausedUntil = Math.max(this.pausedUntil, Date.now() + delay);
+        return delay;
+      }
+
+      return null;
+    }
+
+    if (status >= 500 && idempotent) {
+      return Number.isFinite(retryAfter) ? retryAfter * 1000 : this.backoff(BASE_BACKOFF_MS, attempt);
+    }
+
+    return null;
+  }
+
+  /**
+   * ジッター付き指数バックオフ（base * 2^attempt の 50〜100%）
+   */
+  private backoff(base: number, attempt: number): number {
+    const delay = Math.min(base * 2 ** attempt, MAX_RATE_LIMIT_WAIT_MS);
+    return Math.round(delay / 2 + Math.random() * (delay / 2));
+  }
+}
+
+/**
+ * GraphQL レスポンスの errors に RATE_LIMITED が含まれるか判定
+ */
+function isGraphQLRateLimited(response: ScheduledResponse): boolean {
+  if (response.status < 200 || response.status >= 300) {
+    return false;
+  }
+  const errors = (response.data as { errors?: unknown } | null | undefined)?.errors;
+  return Array.isArray(errors) && errors.some((error) => (error as { type?: unknown } | null)?.type === 'RATE_LIMITED');
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+const NOW = Date.parse('2026-01-01T00:00:00Z');
+
+function deferred<T>() {
+  let resolve: (value: T) => void = () => {};
+  let reject: (error: unknown) => void = () => {};
+  const promise = new Promise<T>((res, rej) => {
+    resolve = res;
+    reject = rej;
+  });
+  return { promise, resolve, reject };
+}
+
+function response(status: number, headers: Record<string, string> = {}, data?: unknown): ScheduledResponse {
+  return { status, headers, data };
+}
+
+function networkError(code: string): NodeJS.ErrnoException {
+  const error = new Error(`read ${code}`) as NodeJS.ErrnoException;
+  error.code = code;
+  return error;
+}
+
+// 呼び出しごとに responses を順に返す send
+function sequence(...responses: ScheduledResponse[]) {
+  return jest.fn(async () => responses.length > 1 ? responses.shift()! : responses[0]);
+}
+
+// マイクロタスクを流す（タイマーは進めない）
+async function flush(): Promise<void> {
+  await jest.advanceTimersByTimeAsync(0);
+}
+
+describe('RequestScheduler', () => {
+  beforeEach(() => {
+    // ストリームの close は nextTick で通知されるため、実時間のまま残す
+    jest.useFakeTimers({ doNotFake: ['nextTick', 'setImmediate'] });
+    jest.setSystemTime(NOW);
+  });
+
+  afterEach(() => {
+    jest.useRealTimers();
+  });
+
+  describe('singleFlight', () => {
+    test('should join an in-flight request with the same key', async () => {
+      const scheduler = new RequestScheduler();
+      const pending = deferred<string>();
+      const fn = jest.fn(() => pending.promise);
+
+      const first = scheduler.singleFlight('GET /repos/o/r/pulls/1', fn);
+      const second = scheduler.singleFlight('GET /repos/o/r/pulls/1', fn);
+      expect(scheduler.getStatus().inFlight).toBe(1);
+
+      pending.resolve('pr');
+      await expect(first).resolves.toBe('pr');
+      await expect(second).resolves.toBe('pr');
+      expect(fn).toHaveBeenCalledTimes(1);
+      expect(scheduler.getStatus().deduplicated).toBe(1);
+      expect(scheduler.getStatus().inFlight).toBe(0);
+    });
+
+    test('should send again once the previous request has settled', async () => {
+      const scheduler = new RequestScheduler();
+      const fn = jest.fn(async () => 'pr');
+
+      await scheduler.singleFlight('key', fn);
+      await scheduler.singleFlight('key', fn);
+
+      expect(fn).toHaveBeenCalledTimes(2);
+      expect(scheduler.getStatus().deduplicated).toBe(0);
+    });
+
+    test('should share a failure and then forget it', async () => {
+      const scheduler = new RequestScheduler();
+      const pending = deferred<string>();
+      const fn = jest.fn(() => pending.promise);
+
+      const first = scheduler.singleFlight('key', fn);
+      const second = scheduler.singleFlight('key', fn);
+      pending.reject(new Error('boom'));
+
+      await expect(first).rejects.toThrow('boom');
+      await expect(second).rejects.toThrow('boom');
+      await expect(scheduler.singleFlight('key', async () => 'retried')).resolves.toBe('retried');
+    });
+
+    test('should not share requests without a key', async () => {
+      const scheduler = new RequestScheduler();
+      const fn = jest.fn(async () => 'created');
+
+      await Promise.all([scheduler.singleFlight(null, fn), scheduler.singleFlight(null, fn)]);
+
+      expect(fn).toHaveBeenCalledTimes(2);
+    });
+  });
+
+  describe('concurrency', () => {
+    test('should cap active requests and hand the slot to the next queued request', async () => {
+      const scheduler = new RequestScheduler(2);
+      const pending = [deferred<ScheduledResponse>(), deferred<ScheduledResponse>(), deferred<ScheduledResponse>()];
+      const sends = pending.map((p) => jest.fn(() => p.promise));
+
+      const results = sends.map((send) => scheduler.run(send));
+      await flush();
+      expect(sends[0]).toHaveBeenCalledTimes(1);
+      expect(sends[1]).toHaveBeenCalledTimes(1);
+      expect(sends[2]).toHaveBeenCalledTimes(0);
+      expect(scheduler.getStatus()).toEqual(expect.objectContaining({ active: 2, queued: 1 }));
+
+      // 解放された枠は active を減らさずにそのまま待機中のリクエストへ渡る
+      pending[0].resolve(response(200));
+      await flush();
+      expect(sends[2]).toHaveBeenCalledTimes(1);
+      expect(scheduler.getStatus()).toEqual(expect.objectContaining({ active: 2, queued: 0 }));
+
+      pending[1].resolve(response(200));
+      pending[2].resolve(response(200));
+      await Promise.all(results);
+      expect(scheduler.getStatus()).toEqual(expect.objectContaining({ active: 0, queued: 0 }));
+    });
+
+    test('should release the slot when send throws', async () => {
+      const scheduler = new RequestScheduler(1);
+
+      await expect(scheduler.run(async () => {
+        throw new Error('bad request');
+      })).rejects.toThrow('bad request');
+
+      expect(scheduler.getStatus().active).toBe(0);
+      await expect(scheduler.run(async () => response(200))).resolves.toEqual(response(200));
+    });
+  });
+
+  describe('runStream', () => {
+    test('should hold the slot until the body stream closes', async () => {
+      const scheduler = new RequestScheduler(1);
+      const body = new PassThrough();
+      const next = jest.fn(async () => response(200));
+
+      const streamed = await scheduler.runStream(async () => ({ ...response(200), body }));
+      expect(streamed.body).toBe(body);
+      expect(scheduler.getStatus().active).toBe(1);
+
+      const queued = scheduler.run(next);
+      await flush();
+      expect(next).toHaveBeenCalledTimes(0);
+      expect(scheduler.getStatus().queued).toBe(1);
+
+      // 読み終わる前に破棄しても枠は解放される
+      body.destroy();
+      await new Promise<void>((resolve) => body.once('close', () => resolve()));
+      await queued;
+      expect(next).toHaveBeenCalledTimes(1);
+      expect(scheduler.getStatus().active).toBe(0);
+    });
+
+    test('should release the slot immediately for a non-2xx response', async () => {
+      const scheduler = new RequestScheduler(1);
+      const body = new PassThrough();
+
+      const result = await scheduler.runStream(async () => ({ ...response(404, {}, { message: 'Not Found' }), body }));
+
+      expect(result.status).toBe(404);
+      expect(scheduler.getStatus().active).toBe(0);
+    });
+  });
+
+  describe('retries', () => {
+    test('should wait for the reset on a primary rate limit', async () => {
+      const scheduler = new RequestScheduler();
+      const reset = String(NOW / 1000 + 10);
+      const send = sequence(response(403, { 'x-ratelimit-remaining': '0', 'x-ratelimit-reset': reset }), response(200));
+
+      const result = scheduler.run(send);
+      await jest.advanceTimersByTimeAsync(10_999);
+      expect(send).toHaveBeenCalledTimes(1);
+
+      await jest.advanceTimersByTimeAsync(1);
+      expect((await result).status).toBe(200);
+      expect(send).toHaveBeenCalledTimes(2);
+      expect(scheduler.getStatus().retries).toBe(1);
+    });
+
+    test('should not wait for a primary rate limit that resets too far away', async () => {
+      const scheduler = new RequestScheduler();
+      const reset = String(NOW / 1000 + 120);
+      const send = sequence(response(403, { 'x-ratelimit-remaining': '0', 'x-ratelimit-reset': reset }));
+
+      const result = await scheduler.run(send);
+
+      expect(result.status).toBe(403);
+      expect(send).toHaveBeenCalledTimes(1);
+    });
+
+    test('should follow Retry-After on a secondary rate limit and pause other requests', async () => {
+      const scheduler = new RequestScheduler();
+      const send = sequence(response(429, { 'retry-after': '3' }), response(200));
+      const other = jest.fn(async () => response(200));
+
+      const result = scheduler.run(send);
+      await flush();
+      expect(scheduler.getStatus().pausedUntil).toBe(new Date(NOW + 3000).toISOString());
+
+      // 停止中は別のリクエストも送信しない
+      const otherResult = scheduler.run(other);
+      await jest.advanceTimersByTimeAsync(2999);
+      expect(send).toHaveBeenCalledTimes(1);
+      expect(other).toHaveBeenCalledTimes(0);
+
+      await jest.advanceTimersByTimeAsync(1);
+      expect((await result).status).toBe(200);
+      expect((await otherResult).status).toBe(200);
+      expect(scheduler.getStatus().pausedUntil).toBeNull();
+    });
+
+    test('should back off on a secondary rate limit message without Retry-After', async () => {
+      const scheduler = new RequestScheduler();
+      const send = sequence(
+        response(403, { 'x-ratelimit-remaining': '4000' }, { message: 'You have exceeded a secondary rate limit.' }),
+        response(200)
+      );
+
+      const result = scheduler.run(send);
+      await flush();
+      expect(send).toHaveBeenCalledTimes(1);
+
+      // 5000ms * 2^0 の 50〜100%
+      await jest.advanceTimersByTimeAsync(5000);
+      expect((await result).status).toBe(200);
+      expect(send).toHaveBeenCalledTimes(2);
+    });
+
+    test('should not retry a 403 that is not a rate limit', async () => {
+      const scheduler = new RequestScheduler();
+      const send = sequence(response(403, {}, { message: 'Resource not accessible by integration' }));
+
+      const result = await scheduler.run(send);
+
+      expect(result.status).toBe(403);
+      expect(send).toHaveBeenCalledTimes(1);
+    });
+
+    test('should retry a GraphQL RATE_LIMITED error returned with 200', async () => {
+      const scheduler = new RequestScheduler();
+      const send = sequence(
+        response(200, {}, { errors: [{ type: 'RATE_LIMITED', message: 'API rate limit exceeded' }] }),
+        response(200, {}, { data: { viewer: { login: 'octocat' } } })
+      );
+
+      const result = scheduler.run(send, { resource: 'graphql' });
+      await jest.advanceTimersByTimeAsync(5000);
+
+      expect((await result).data).toEqual({ data: { viewer: { login: 'octocat' } } });
+      expect(send).toHaveBeenCalledTimes(2);
+    });
+
+    test('should retry 5xx for idempotent requests', async () => {
+      const scheduler = new RequestScheduler();
+      const send = sequence(response(502), response(200));
+
+      const result = scheduler.run(send);
+      await jest.advanceTimersByTimeAsync(1000);
+
+      expect((await result).status).toBe(200);
+      expect(send).toHaveBeenCalledTimes(2);
+    });
+
+    test('should honour Retry-After on 5xx', async () => {
+      const scheduler = new RequestScheduler();
+      const send = sequence(response(503, { 'retry-after': '2' }), response(200));
+
+      const result = scheduler.run(send);
+      await jest.advanceTimersByTimeAsync(1999);
+      expect(send).toHaveBeenCalledTimes(1);
+
+      await jest.advanceTimersByTimeAsync(1);
+      expect((await result).status).toBe(200);
+    });
+
+    test('should not retry 5xx for a non-idempotent POST', async () => {
+      const scheduler = new RequestScheduler();
+      const send = sequence(response(502), response(201));
+
+      const result = await scheduler.run(send, { idempotent: false });
+
+      expect(result.status).toBe(502);
+      expect(send).toHaveBeenCalledTimes(1);
+      expect(scheduler.getStatus().retries).toBe(0);
+    });
+
+    test('should return the last response after maxRetries', async () => {
+      const scheduler = new RequestScheduler(8, 2);
+      const send = sequence(response(500));
+
+      const result = scheduler.run(send);
+      await jest.advanceTimersByTimeAsync(1000 + 2000);
+
+      expect((await result).status).toBe(500);
+      expect(send).toHaveBeenCalledTimes(3);
+      expect(scheduler.getStatus().retries).toBe(2);
+    });
+  });
+
+  describe('waitForRateLimit', () => {
+    function quota(remaining: number, resetInSeconds: number, resource: string = 'core'): Record<string, string> {
+      return {
+        'x-ratelimit-limit': '5000',
+        'x-ratelimit-remaining': String(remaining),
+        'x-ratelimit-used': String(5000 - remaining),
+        'x-ratelimit-reset': String(NOW / 1000 + resetInSeconds),
+        'x-ratelimit-resource': resource,
+      };
+    }
+
+    test('should throttle once the remaining quota drops to the reserve', async () => {
+      const scheduler = new RequestScheduler(8, 3, 10);
+      await scheduler.run(async () => response(200, quota(10, 30)));
+      expect(scheduler.getStatus().rateLimits.core).toEqual({
+        limit: 5000,
+        remaining: 10,
+        used: 4990,
+        resetAt: new Date(NOW + 30_000).toISOString(),
+      });
+
+      const send = jest.fn(async () => response(200, quota(5000, 3600)));
+      const result = scheduler.run(send);
+      await flush();
+      expect(send).toHaveBeenCalledTimes(0);
+      expect(scheduler.getStatus().waitReason).toBe('core rate limit nearly exhausted (10/5000 remaining)');
+      expect(scheduler.getStatus().throttled).toBe(1);
+
+      await jest.advanceTimersByTimeAsync(30_000);
+      await result;
+      expect(send).toHaveBeenCalledTimes(1);
+      expect(scheduler.getStatus().waitReason).toBeNull();
+    });
+
+    test('should not throttle while the quota is above the reserve', async () => {
+      const scheduler = new RequestScheduler(8, 3, 10);
+      await scheduler.run(async () => response(200, quota(11, 30)));
+
+      const send = jest.fn(async () => response(200));
+      await scheduler.run(send);
+
+      expect(send).toHaveBeenCalledTimes(1);
+      expect(scheduler.getStatus().throttled).toBe(0);
+    });
+
+    test('should track each resource separately', async () => {
+      const scheduler = new RequestScheduler(8, 3, 10);
+      await scheduler.run(async () => response(200, quota(0, 30, 'graphql')), { resource: 'graphql' });
+
+      const send = jest.fn(async () => response(200));
+      await scheduler.run(send);
+
+      expect(send).toHaveBeenCalledTimes(1);
+      expect(scheduler.getStatus().throttled).toBe(0);
+    });
+
+    test('should send without waiting when the reset is too far away', async () => {
+      const scheduler = new RequestScheduler(8, 3, 10);
+      await scheduler.run(async () => response(200, quota(5, 600)));
+
+      const send = jest.fn(async () => response(200));
+      await scheduler.run(send);
+
+      expect(send).toHaveBeenCalledTimes(1);
+      expect(scheduler.getStatus().throttled).toBe(0);
+    });
+  });
+
+  describe('network errors', () => {
+    test('should retry retryable network errors with backoff', async () => {
+      const scheduler = new RequestScheduler();
+      const send = jest.fn()
+        .mockRejectedValueOnce(networkError('ECONNRESET'))
+        .mockRejectedValueOnce(networkError('ETIMEDOUT'))
+        .mockResolvedValueOnce(response(200));
+
+      const result = scheduler.run(send);
+      await jest.advanceTimersByTimeAsync(1000 + 2000);
+
+      expect((await result).status).toBe(200);
+      expect(send).toHaveBeenCalledTimes(3);
+      expect(scheduler.getStatus().retries).toBe(2);
+    });
+
+    test('should not retry network errors for a non-idempotent POST', async () => {
+      const scheduler = new RequestScheduler();
+      const send = jest.fn().mockRejectedValueOnce(networkError('ECONNRESET'));
+
+      await expect(scheduler.run(send, { idempotent: false })).rejects.toThrow('ECONNRESET');
+      expect(send).toHaveBeenCalledTimes(1);
+    });
+
+    test('should not retry other errors', async () => {
+      const scheduler = new RequestScheduler();
+      const send = jest.fn().mockRejectedValueOnce(networkError('ENOTFOUND'));
+
+      await expect(scheduler.run(send)).rejects.toThrow('ENOTFOUND');
+      expect(send).toHaveBeenCalledTimes(1);
+    });
+
+    test('should give up after maxRetries', async () => {
+      const scheduler = new RequestScheduler(8, 1);
+      const send = jest.fn().mockRejectedValue(networkError('ECONNRESET'));
+
+      const result = scheduler.run(send);
+      const settled = expect(result).rejects.toThrow('ECONNRESET');
+      await jest.advanceTimersByTimeAsync(1000);
+
+      await settled;
+      expect(send).toHaveBeenCalledTimes(2);
+    });
+  });
+});
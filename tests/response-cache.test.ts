@@ -0,0 +1,462 @@
+// 条件付きリクエスト用レスポンスキャッシュのユニットテスト
+
+import { mkdtempSync, readFileSync, rmSync, statSync, writeFileSync } from 'fs';
+import { mkdir, rename, writeFile } from 'fs/promises';
+import { tmpdir } from 'os';
+import { dirname, join } from 'path';
+
+// Mock fetch globally
+global.fetch = jest.fn() as jest.MockedFunction<typeof fetch>;
+process.env.GITHUB_PERSONAL_ACCESS_TOKEN = 'test-token-123';
+
+const logger = {
+  debug: (..._args: unknown[]) => {},
+  warn: (..._args: unknown[]) => {},
+};
+
+// Response cache (extracted from source)
+interface CachedResponse {
+  path: string;
+  etag?: string;
+  lastModified?: string;
+  body: unknown;
+  storedAt: number;
+}
+
+interface ResponseCacheStats {
+  size: number;
+  maxEntries: number;
+  misses: number;
+  // 304 でキャッシュから応答した件数
+  notModified: number;
+  // キャッシュ済みだったが内容が変わっていた（200 で更新した）件数
+  modified: number;
+  evictions: number;
+  invalidations: number;
+  persistent: boolean;
+}
+
+const CACHE_FILE_NAME = 'response-cache.json';
+const PERSIST_DELAY_MS = 1000;
+
+/**
+ * LRU方式のレスポンスキャッシュ
+ * Mapの挿入順を利用し、先頭を最も古いエントリとして扱う
+ */
+class ResponseCache {
+  private readonly entries = new Map<string, CachedResponse>();
+  private readonly filePath: string | null;
+  private persistTimer: NodeJS.Timeout | null = null;
+  private stats = { misses: 0, notModified: 0, modified: 0, evictions: 0, invalidations: 0 };
+
+  constructor(private readonly maxEntries: number = 500, cacheDir?: string) {
+    this.filePath = cacheDir ? join(cacheDir, CACHE_FILE_NAME) : null;
+    this.load();
+  }
+
+  /**
+   * キャッシュキーを作成（メソッド + エンドポイント + Acceptヘッダー）
+   */
+  static key(method: string, endpoint: string, accept: string): string {
+    return `${method.toUpperCase()} ${endpoint} ${accept}`;
+  }
+
+  /**
+   * エントリを取得（取得したエントリは最新として扱う）
+   * 条件付きリクエストの結果は recordNotModified（304）と store（200）で数える
+   */
+  get(key: string): CachedResponse | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      this.stats.misses++;
+      return undefined;
+    }
+
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry;
+  }
+
+  /**
+   * 条件付きリクエスト用のヘッダーを作成
+   */
+  static conditionalHeaders(entry: CachedResponse | undefined): Record<string, string> {
+    const headers: Record<string, string> = {};
+    if (entry?.etag) {
+      headers['If-None-Match'] = entry.etag;
+    }
+    if (entry?.lastModified) {
+      headers['If-Modified-Since'] = entry.lastModified;
+    }
+    return headers;
+  }
+
+  /**
+   * レスポンスを保存（ETag も Last-Modified も無い場合は保存しない）
+   */
+  store(key: string, path: string, headers: Record<string, string>, body: unknown): void {
+    const etag = headers['etag'];
+    const lastModified = headers['last-modified'];
+    if (!etag && !lastModified) {
+      return;
+    }
+
+    if (this.entries.delete(key)) {
+      this.stats.modified++;
+    }
+    this.entries.set(key, { path: this.stripQuery(path), etag, lastModified, body, storedAt: Date.now() });
+
+    while (this.entries.size > this.maxEntries) {
+      const oldestKey = this.entries.keys().next().value as string;
+      this.entries.delete(oldestKey);
+      this.stats.evictions++;
+    }
+
+    this.schedulePersist();
+  }
+
+  /**
+   * 304 Not Modified によりキャッシュから応答したことを記録
+   */
+  recordNotModified(key: string): void {
+    this.stats.notModified++;
+    const entry = this.entries.get(key);
+    if (entry) {
+      entry.storedAt = Date.now();
+    }
+  }
+
+  /**
+   * 指定パスのエントリを削除（includeSubpaths が true の場合は配下のパスも削除）
+   */
+  invalidate(path: string, includeSubpaths: boolean = false): void {
+    const target = this.stripQuery(path);
+    let removed = 0;
+
+    for (const [key, entry] of this.entries) {
+      if (entry.path === target || (includeSubpaths && entry.path.startsWith(`${target}/`))) {
+        this.entries.delete(key);
+        removed++;
+      }
+    }
+
+    if (removed > 0) {
+      logger.debug(`Invalidated ${removed} cached response(s) for ${target}`);
+      this.stats.invalidations += removed;
+      this.schedulePersist();
+    }
+  }
+
+  /**
+   * キャッシュの統計情報を取得
+   */
+  getStats(): ResponseCacheStats {
+    return {
+      size: this.entries.size,
+      maxEntries: this.maxEntries,
+      ...this.stats,
+      persistent: this.filePath !== null,
+    };
+  }
+
+  private stripQuery(path: string): string {
+    const queryIndex = path.indexOf('?');
+    return queryIndex >= 0 ? path.slice(0, queryIndex) : path;
+  }
+
+  /**
+   * ディスクからキャッシュを読み込み（再起動後もキャッシュを利用するため）
+   */
+  private load(): void {
+    if (!this.filePath) {
+      return;
+    }
+
+    try {
+      const stored = JSON.parse(readFileSync(this.filePath, 'utf8')) as Array<[string, CachedResponse]>;
+      for (const [key, entry] of stored.slice(-this.maxEntries)) {
+        this.entries.set(key, entry);
+      }
+      logger.debug(`Loaded ${this.entries.size} cached responses from ${this.filePath}`);
+    } catch (error) {
+      if ((error as NodeJS.ErrnoException).code !== 'ENOENT') {
+        logger.warn(`Failed to load response cache from ${this.filePath}:`, error);
+      }
+    }
+  }
+
+  /**
+   * 書き込みをまとめるため、一定時間後にディスクへ保存
+   */
+  private schedulePersist(): void {
+    if (!this.filePath || this.persistTimer) {
+      return;
+    }
+
+    this.persistTimer = setTimeout(() => {
+      this.persistTimer = null;
+      this.persist().catch((error) => {
+        logger.warn(`Failed to persist response cache to ${this.filePath}:`, error);
+      });
+    }, PERSIST_DELAY_MS);
+    this.persistTimer.unref();
+  }
+
+  private async persist(): Promise<void> {
+    if (!this.filePath) {
+      return;
+    }
+
+    // プライベートリポジトリの PR 本文や diff を含むため、所有者のみ読み書きできるようにする
+    const tempPath = `${this.filePath}.${process.pid}.tmp`;
+    await mkdir(dirname(this.filePath), { recursive: true, mode: 0o700 });
+    await writeFile(tempPath, JSON.stringify([...this.entries]), { encoding: 'utf8', mode: 0o600 });
+    await rename(tempPath, this.filePath);
+  }
+}
+
+// 304 handling in GitHubApi.requestOnce (extracted from source)
+interface SentResponse {
+  status: number;
+  headers: Record<string, string>;
+  data: unknown;
+}
+
+async function requestOnce(
+  cache: ResponseCache,
+  path: string,
+  send: (headers: Record<string, string>) => Promise<SentResponse>,
+  method: string = 'GET'
+): Promise<SentResponse> {
+  const cacheKey = method === 'GET' ? ResponseCache.key(method, path, 'application/vnd.github.v3+json') : null;
+  const cached = cacheKey ? cache.get(cacheKey) : undefined;
+  const response = await send(ResponseCache.conditionalHeaders(cached));
+
+  if (response.status === 304 && cacheKey && cached) {
+    cache.recordNotModified(cacheKey);
+    return { data: cached.body, status: 200, headers: response.headers };
+  }
+
+  if (response.status < 200 || response.status >= 300) {
+    throw new Error(`GitHub API error! Status: ${response.status}`);
+  }
+
+  if (cacheKey) {
+    cache.store(cacheKey, path, response.headers, response.data);
+  }
+
+  return response;
+}
+
+const ACCEPT = 'application/vnd.github.v3+json';
+const keyFor = (path: string) => ResponseCache.key('GET', path, ACCEPT);
+
+describe('Response cache', () => {
+  describe('store', () => {
+    test('should skip responses without ETag or Last-Modified', () => {
+      const cache = new ResponseCache(10);
+      cache.store(keyFor('/user'), '/user', { 'content-type': 'application/json' }, { login: 'octocat' });
+
+      expect(cache.get(keyFor('/user'))).toBeUndefined();
+      expect(cache.getStats().size).toBe(0);
+    });
+
+    test('should keep the validators and body', () => {
+      const cache = new ResponseCache(10);
+      cache.store(keyFor('/user'), '/user', { etag: 'W/"abc"', 'last-modified': 'Tue, 01 Oct 2024 00:00:00 GMT' }, { login: 'octocat' });
+
+      const entry = cache.get(keyFor('/user'));
+      expect(entry?.etag).toBe('W/"abc"');
+      expect(entry?.lastModified).toBe('Tue, 01 Oct 2024 00:00:00 GMT');
+      expect(entry?.body).toEqual({ login: 'octocat' });
+    });
+  });
+
+  describe('conditionalHeaders', () => {
+    test('should send the stored validators', () => {
+      expect(ResponseCache.conditionalHeaders({ path: '/user', etag: '"abc"', body: null, storedAt: 0 }))
+        .toEqual({ 'If-None-Match': '"abc"' });
+      expect(ResponseCache.conditionalHeaders({ path: '/user', lastModified: 'Tue, 01 Oct 2024 00:00:00 GMT', body: null, storedAt: 0 }))
+        .toEqual({ 'If-Modified-Since': 'Tue, 01 Oct 2024 00:00:00 GMT' });
+      expect(ResponseCache.conditionalHeaders({ path: '/user', etag: '"abc"', lastModified: 'Tue, 01 Oct 2024 00:00:00 GMT', body: null, storedAt: 0 }))
+        .toEqual({ 'If-None-Match': '"abc"', 'If-Modified-Since': 'Tue, 01 Oct 2024 00:00:00 GMT' });
+    });
+
+    test('should send nothing without a cached entry', () => {
+      expect(ResponseCache.conditionalHeaders(undefined)).toEqual({});
+    });
+  });
+
+  describe('LRU eviction', () => {
+    test('should evict the least recently used entry', () => {
+      const cache = new ResponseCache(2);
+      cache.store(keyFor('/a'), '/a', { etag: '"a"' }, 'a');
+      cache.store(keyFor('/b'), '/b', { etag: '"b"' }, 'b');
+      // /a を参照すると /b が最も古いエントリになる
+      cache.get(keyFor('/a'));
+      cache.store(keyFor('/c'), '/c', { etag: '"c"' }, 'c');
+
+      expect(cache.get(keyFor('/b'))).toBeUndefined();
+      expect(cache.get(keyFor('/a'))?.body).toBe('a');
+      expect(cache.get(keyFor('/c'))?.body).toBe('c');
+      expect(cache.getStats().evictions).toBe(1);
+    });
+
+    test('should refresh the position of an updated entry', () => {
+      const cache = new ResponseCache(2);
+      cache.store(keyFor('/a'), '/a', { etag: '"a1"' }, 'a1');
+      cache.store(keyFor('/b'), '/b', { etag: '"b"' }, 'b');
+      cache.store(keyFor('/a'), '/a', { etag: '"a2"' }, 'a2');
+      cache.store(keyFor('/c'), '/c', { etag: '"c"' }, 'c');
+
+      expect(cache.get(keyFor('/b'))).toBeUndefined();
+      expect(cache.get(keyFor('/a'))?.body).toBe('a2');
+    });
+  });
+
+  describe('invalidate', () => {
+    const createCache = () => {
+      const cache = new ResponseCache(10);
+      for (const path of ['/repos/o/r/pulls/1', '/repos/o/r/pulls/1/files?per_page=100&page=2', '/repos/o/r/pulls/12', '/repos/o/r/pulls?state=open']) {
+        cache.store(keyFor(path), path, { etag: `"${path}"` }, path);
+      }
+      return cache;
+    };
+
+    test('should remove only the exact path by default', () => {
+      const cache = createCache();
+      cache.invalidate('/repos/o/r/pulls/1');
+
+      expect(cache.get(keyFor('/repos/o/r/pulls/1'))).toBeUndefined();
+      expect(cache.get(keyFor('/repos/o/r/pulls/1/files?per_page=100&page=2'))).toBeDefined();
+      expect(cache.get(keyFor('/repos/o/r/pulls/12'))).toBeDefined();
+      expect(cache.getStats().invalidations).toBe(1);
+    });
+
+    test('should remove subpaths without touching sibling numbers', () => {
+      const cache = createCache();
+      cache.invalidate('/repos/o/r/pulls/1', true);
+
+      expect(cache.get(keyFor('/repos/o/r/pulls/1'))).toBeUndefined();
+      expect(cache.get(keyFor('/repos/o/r/pulls/1/files?per_page=100&page=2'))).toBeUndefined();
+      expect(cache.get(keyFor('/repos/o/r/pulls/12'))).toBeDefined();
+      expect(cache.getStats().invalidations).toBe(2);
+    });
+
+    test('should ignore query strings on both sides', () => {
+      const cache = createCache();
+      cache.invalidate('/repos/o/r/pulls?per_page=100');
+
+      expect(cache.get(keyFor('/repos/o/r/pulls?state=open'))).toBeUndefined();
+      expect(cache.getStats().size).toBe(3);
+    });
+  });
+
+  describe('requestOnce', () => {
+    test('should serve the cached body with status 200 on 304', async () => {
+      const cache = new ResponseCache(10);
+      const sent: Array<Record<string, string>> = [];
+      const responses: SentResponse[] = [
+        { status: 200, headers: { etag: '"v1"' }, data: { title: 'First' } },
+        { status: 304, headers: { etag: '"v1"', 'x-ratelimit-remaining': '4999' }, data: null },
+      ];
+      const send = async (headers: Record<string, string>) => {
+        sent.push(headers);
+        return responses.shift()!;
+      };
+
+      const first = await requestOnce(cache, '/repos/o/r/pulls/1', send);
+      const second = await requestOnce(cache, '/repos/o/r/pulls/1', send);
+
+      expect(first.data).toEqual({ title: 'First' });
+      expect(sent[0]).toEqual({});
+      expect(sent[1]).toEqual({ 'If-None-Match': '"v1"' });
+      expect(second).toEqual({ status: 200, headers: { etag: '"v1"', 'x-ratelimit-remaining': '4999' }, data: { title: 'First' } });
+      expect(cache.getStats()).toEqual(expect.objectContaining({ misses: 1, notModified: 1, modified: 0 }));
+    });
+
+    test('should replace the entry when the resource changed', async () => {
+      const cache = new ResponseCache(10);
+      const responses: SentResponse[] = [
+        { status: 200, headers: { etag: '"v1"' }, data: 'v1' },
+        { status: 200, headers: { etag: '"v2"' }, data: 'v2' },
+      ];
+      const send = async () => responses.shift()!;
+
+      await requestOnce(cache, '/repos/o/r/pulls/1', send);
+      const changed = await requestOnce(cache, '/repos/o/r/pulls/1', send);
+
+      expect(changed.data).toBe('v2');
+      expect(cache.get(keyFor('/repos/o/r/pulls/1'))?.etag).toBe('"v2"');
+      expect(cache.getStats()).toEqual(expect.objectContaining({ misses: 1, notModified: 0, modified: 1 }));
+    });
+
+    test('should not cache or send validators for POST requests', async () => {
+      const cache = new ResponseCache(10);
+      const sent: Array<Record<string, string>> = [];
+      const send = async (headers: Record<string, string>) => {
+        sent.push(headers);
+        return { status: 201, headers: { etag: '"created"' }, data: {} };
+      };
+
+      await requestOnce(cache, '/repos/o/r/pulls', send, 'POST');
+      await requestOnce(cache, '/repos/o/r/pulls', send, 'POST');
+
+      expect(sent).toEqual([{}, {}]);
+      expect(cache.getStats().size).toBe(0);
+    });
+  });
+
+  describe('persistence', () => {
+    let dir: string;
+
+    // 遅延書き込みのタイマーは進めず、persist() を直接呼び出す
+    beforeEach(() => {
+      jest.useFakeTimers();
+      dir = mkdtempSync(join(tmpdir(), 'response-cache-'));
+    });
+
+    afterEach(() => {
+      jest.useRealTimers();
+      rmSync(dir, { recursive: true, force: true });
+    });
+
+    test('should start empty when the cache file does not exist', () => {
+      const cache = new ResponseCache(10, join(dir, 'missing'));
+      expect(cache.getStats()).toEqual(expect.objectContaining({ size: 0, persistent: true }));
+    });
+
+    test('should start empty when the cache file is corrupt', () => {
+      writeFileSync(join(dir, 'response-cache.json'), '{"not": "an array"');
+      const cache = new ResponseCache(10, dir);
+      expect(cache.getStats().size).toBe(0);
+    });
+
+    test('should write an owner-only file and load it again', async () => {
+      const cacheDir = join(dir, 'nested');
+      const cache = new ResponseCache(10, cacheDir);
+      cache.store(keyFor('/user'), '/user', { etag: '"abc"' }, { login: 'octocat' });
+      await (cache as unknown as { persist(): Promise<void> }).persist();
+
+      const file = join(cacheDir, 'response-cache.json');
+      expect(statSync(file).mode & 0o777).toBe(0o600);
+      expect(statSync(cacheDir).mode & 0o777).toBe(0o700);
+      expect(JSON.parse(readFileSync(file, 'utf8'))[0][0]).toBe(keyFor('/user'));
+
+      const restored = new ResponseCache(10, cacheDir);
+      expect(restored.get(keyFor('/user'))?.body).toEqual({ login: 'octocat' });
+    });
+
+    test('should keep only the newest entries when loading', async () => {
+      const cache = new ResponseCache(10, dir);
+      for (const path of ['/a', '/b', '/c']) {
+        cache.store(keyFor(path), path, { etag: `"${path}"` }, path);
+      }
+      await (cache as unknown as { persist(): Promise<void> }).persist();
+
+      const restored = new ResponseCache(2, dir);
+      expect(restored.get(keyFor('/a'))).toBeUndefined();
+      expect(restored.get(keyFor('/c'))?.body).toBe('/c');
+    });
+  });
+});